@@ -0,0 +1,325 @@
+"""
+FinLand Amortization Engine
+Fixed-payment schedules in integer satang (1/100 baht), vectorized over months.
+
+A level payment P over n months leaves B_k = P a(n-k) + R after month k, where
+a(m) = (1 - (1+r)^-m) / r and R = B_0 - P a(n) is what rounding P to the
+satang leaves over. Anchoring on the term keeps that residual from
+compounding (the forward form (B_0 - P/r)(1+r)^k + P/r multiplies it by
+(1+r)^k, which at 100% over 600 months is ~10^21). Balances are rounded
+half-to-even to the satang each period; principal is the exact difference of
+consecutive rounded balances and interest is the rest of the payment, so every
+row reconciles (payment = interest + principal), principals add up to the loan
+and the final payment clears the balance to exactly zero.
+"""
+
+import bisect
+import math
+
+import numpy as np
+
+MAX_MONTHS = 600
+# Balances beyond this many satang (a growing, never-repaid balance) are clipped before the int64 cast
+MAX_BALANCE = 2 ** 62
+
+
+def to_satang(baht):
+    return int(np.rint(baht * 100))
+
+
+def _annuity_factor(monthly_rate, months):
+    """a(m) = (1 - (1+r)^-m) / r, or m at 0%; negative m gives -((1+r)^|m| - 1) / r"""
+    if monthly_rate <= 0:
+        return months
+    expm1 = np.expm1 if isinstance(months, np.ndarray) else math.expm1   # scalars in the segment walk
+    return -expm1(-months * math.log1p(monthly_rate)) / monthly_rate
+
+
+def annuity_payment(principal, monthly_rate, term_months):
+    """Level monthly payment in satang that repays `principal` satang over the term"""
+    return int(np.rint(principal / _annuity_factor(monthly_rate, term_months)))
+
+
+class Schedule:
+    """Monthly int64 satang columns: payment, interest, principal, remaining"""
+
+    def __init__(self, payment, interest, principal, remaining):
+        self.payment, self.interest, self.principal, self.remaining = payment, interest, principal, remaining
+
+    @property
+    def months(self):
+        return len(self.payment)
+
+    @property
+    def total_paid(self):
+        return int(self.payment.sum()) / 100
+
+    @property
+    def total_interest(self):
+        return int(self.interest.sum()) / 100
+
+    def columns(self):
+        """Baht columns keyed by responses.SCHEDULE_FIELDS"""
+        return {
+            "month": list(range(1, self.months + 1)),
+            "payment": (self.payment / 100).tolist(),
+            "interest": (self.interest / 100).tolist(),
+            "principal": (self.principal / 100).tolist(),
+            "remaining": (self.remaining / 100).tolist(),
+        }
+
+
+def _run_balances(payment, monthly_rate, anchor, residual, growing, j):
+    """Balance j months into a run paying `payment` a month: B_j = P a(anchor - j) + residual + growing (1+r)^j.
+
+    `anchor` is the month the payments alone would clear (the term for a level
+    payment), `residual` the payment rounding that is carried without interest,
+    and `growing` the part of the balance the payment doesn't cover (anchor 0
+    and growing = B_0 gives the forward form B_0 (1+r)^j - P ((1+r)^j - 1) / r).
+    """
+    balance = residual + growing * (1 + monthly_rate) ** j
+    if payment:
+        balance = balance + payment * _annuity_factor(monthly_rate, anchor - j)
+    return balance
+
+
+def _payoff_month(payment, monthly_rate, anchor, residual, growing):
+    """First month (1-based) whose _run_balances rounds to <= 0 satang, or None"""
+    if payment <= 0:
+        return None
+    if monthly_rate <= 0:
+        return max(1, math.floor(anchor + (residual + growing - 0.5) / payment) + 1)
+    level = payment / monthly_rate
+    rate_log = math.log1p(monthly_rate)
+    # B_j = level + residual - c (1+r)^j with c = level (1+r)^-anchor - growing
+    if growing == 0:
+        if level + residual <= 0.5:
+            return 1
+        months = anchor + math.log1p((residual - 0.5) / level) / rate_log
+    else:
+        c = level * math.exp(-anchor * rate_log) - growing
+        if c <= 0:
+            return None
+        if level + residual <= 0.5:
+            return 1
+        months = (math.log(level + residual - 0.5) - math.log(c)) / rate_log
+    return max(1, math.floor(months) + 1)
+
+
+def fixed_payment_schedule(principal, monthly_rate, payment, term_months=None, max_months=MAX_MONTHS):
+    """Pay `payment` satang a month until the balance is cleared (or for `term_months`).
+
+    With a term, `payment` is the level payment for it (annuity_payment) and
+    balances are anchored on the term. The month that clears the balance pays
+    only what is left plus its interest; with a term, the last month also
+    settles the rounding of the level payment. Without a term the schedule
+    stops at `max_months` even if not paid off.
+    """
+    if principal <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return Schedule(empty, empty, empty, empty)
+
+    if term_months is not None:
+        horizon = term_months
+        run = (term_months, principal - payment * _annuity_factor(monthly_rate, term_months), 0.0)
+    else:
+        horizon = max_months
+        run = (0, 0.0, float(principal))
+    # Months after payoff are never used (and their balances run away): stop one
+    # month past the closed-form payoff month, in case its float log is a month short
+    payoff = _payoff_month(payment, monthly_rate, *run)
+    if payoff is not None:
+        horizon = min(horizon, payoff + 1)
+    exact = _run_balances(payment, monthly_rate, *run, np.arange(1, horizon + 1, dtype=np.float64))
+    balances = np.rint(np.clip(exact, 0, MAX_BALANCE)).astype(np.int64)
+    cleared = np.flatnonzero(balances <= 0)
+    months = int(cleared[0]) + 1 if len(cleared) else horizon
+    # A term loan always closes in its last month, absorbing payment rounding
+    closes = len(cleared) > 0 or term_months is not None
+    balances = balances[:months]
+
+    opening = np.empty(months, dtype=np.int64)
+    opening[0] = principal
+    opening[1:] = balances[:-1]
+    remaining = balances.copy()
+    if closes:
+        remaining[-1] = 0
+
+    principal_paid = opening - remaining
+    payments = np.full(months, payment, dtype=np.int64)
+    interest = payments - principal_paid
+    if closes:
+        interest[-1] = int(np.rint(opening[-1] * monthly_rate))
+        payments[-1] = principal_paid[-1] + interest[-1]
+    return Schedule(payments, interest, principal_paid, remaining)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CALCULATORS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def credit_card_schedule(balance, apr, monthly_payment):
+    """Credit card payoff at a fixed monthly payment (baht in, satang schedule out)"""
+    return fixed_payment_schedule(to_satang(balance), apr / 100 / 12, to_satang(monthly_payment))
+
+
+def student_loan_schedule(loan_amount, interest_rate, term_months):
+    """Level-payment loan over `term_months`; returns (payment satang, schedule)"""
+    principal = to_satang(loan_amount)
+    monthly_rate = interest_rate / 100 / 12
+    payment = annuity_payment(principal, monthly_rate, term_months)
+    return payment, fixed_payment_schedule(principal, monthly_rate, payment, term_months=term_months)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EVENTS (rate changes, extra payments, payment holidays)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+EVENT_TYPES = ('rate_change', 'extra_payment', 'payment_holiday')
+
+
+def _segments(principal, annual_rate, term_months, events):
+    """Walk events in closed form; returns ([(start, months, rate, payment, extra, *run)], paid_off).
+
+    Segments are runs of months with one rate and payment; only event months
+    are visited, never the months in between. `run` is the segment's
+    (anchor, residual, growing) for _run_balances, anchored on the end of the
+    term: a recast payment leaves nothing growing, while a rate change or
+    extra payment that keeps the payment moves the difference it makes into
+    the growing part.
+    """
+    starts, extras = {}, {}
+    for event in events:
+        bucket = extras if event['type'] == 'extra_payment' else starts
+        bucket.setdefault(event['month'], []).append(event)
+    start_months, extra_months = sorted(starts), sorted(extras)
+
+    rate = annual_rate / 100 / 12
+    balance = float(principal)
+    payment = annuity_payment(principal, rate, term_months)
+    # Balance at the cursor = run_payment a(anchor) at run_rate + residual + growing
+    run_payment, run_rate = payment, rate
+    residual, growing = principal - payment * _annuity_factor(rate, term_months), 0.0
+    holiday_until, capitalize, recast = None, True, False
+    segments = []
+    cursor = 1
+    while cursor <= term_months:
+        for event in starts.get(cursor, ()):
+            if event['type'] == 'rate_change':
+                rate = event['rate'] / 100 / 12
+                recast = recast or event.get('recast', True)
+            else:
+                holiday_until = cursor + event['months'] - 1
+                capitalize = event.get('capitalize', True)
+        in_holiday = holiday_until is not None and cursor <= holiday_until
+        if holiday_until is not None and cursor == holiday_until + 1:
+            recast = True
+
+        anchor = term_months - cursor + 1
+        seg_payment = 0 if in_holiday else payment
+        seg_rate = rate if (capitalize or not in_holiday) else 0.0
+        if recast and not in_holiday:
+            seg_payment = payment = annuity_payment(min(balance, MAX_BALANCE), rate, anchor)
+            residual, growing = balance - payment * _annuity_factor(rate, anchor), 0.0
+            recast = False
+        elif segments or (seg_rate, seg_payment) != (run_rate, run_payment):
+            # An event left the payment unlevelled: what it doesn't cover, rounding included, accrues
+            growing += residual + run_payment * _annuity_factor(run_rate, anchor) \
+                - seg_payment * _annuity_factor(seg_rate, anchor)
+            residual = 0.0
+
+        end = term_months
+        if in_holiday:
+            end = min(end, holiday_until)
+        i = bisect.bisect_right(start_months, cursor)
+        if i < len(start_months):
+            end = min(end, start_months[i] - 1)
+        i = bisect.bisect_left(extra_months, cursor)
+        if i < len(extra_months):
+            end = min(end, extra_months[i])
+
+        months = end - cursor + 1
+        run = (anchor, residual, growing)
+        payoff = _payoff_month(seg_payment, seg_rate, *run)
+        if payoff is not None and payoff <= months:
+            segments.append((cursor, payoff, seg_rate, seg_payment, 0, *run))
+            return segments, True
+
+        closing = float(_run_balances(seg_payment, seg_rate, *run, months))
+        owed = max(0, math.ceil(min(closing, MAX_BALANCE)))
+        extra = min(sum(event['amount'] for event in extras.get(end, ())), owed)
+        segments.append((cursor, months, seg_rate, seg_payment, extra, *run))
+        balance = closing - extra
+        if balance < 0.5:
+            return segments, True
+        growing = growing * (1 + seg_rate) ** months - extra
+        run_payment, run_rate = seg_payment, seg_rate
+        if extra and any(event.get('recast', False) for event in extras[end]):
+            recast = True
+        cursor = end + 1
+    return segments, False
+
+
+def event_schedule(principal, annual_rate, term_months, events=()):
+    """Level-payment loan with events, all in satang; returns (Schedule, segment summaries).
+
+    Events are dicts with a 1-based `month` and a `type`:
+      rate_change      `rate` (annual %) from that month; payment is recast
+                       over the remaining term unless `recast` is false
+      extra_payment    `amount` satang paid on top of that month's payment;
+                       shortens the term, or lowers the payment with `recast`
+      payment_holiday  no payments for `months` months from that month;
+                       interest is capitalized unless `capitalize` is false,
+                       and the payment is recast over the remaining term after
+
+    The schedule is evaluated in one vectorized pass over all months from the
+    per-segment closed form, anchored on the term and rounded to the satang
+    like fixed_payment_schedule.
+    """
+    if principal <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return Schedule(empty, empty, empty, empty), []
+
+    segments, paid_off = _segments(principal, annual_rate, term_months, events)
+    start, length, rate, payment, extra, anchor, residual, growing = (np.array(column) for column in zip(*segments))
+    months = int(length.sum())
+
+    segment_of = np.repeat(np.arange(len(segments)), length)
+    j = np.arange(1, months + 1) - np.repeat(start - 1, length)
+    r = rate[segment_of]
+    # _run_balances for every month at once: P a(anchor - j) + residual + growing (1+r)^j
+    left = anchor[segment_of] - j
+    factor = np.where(r > 0, -np.expm1(-left * np.log1p(r)) / np.where(r > 0, r, 1), left)
+    exact = payment[segment_of] * factor + residual[segment_of] + growing[segment_of] * (1 + r) ** j
+
+    last = np.cumsum(length) - 1
+    exact[last] -= extra
+    balances = np.rint(np.clip(exact, 0, MAX_BALANCE)).astype(np.int64)
+    balances[-1] = 0  # paid off, or the term's last month settles what is left
+
+    opening_col = np.empty(months, dtype=np.int64)
+    opening_col[0] = principal
+    opening_col[1:] = balances[:-1]
+    payments = payment[segment_of].astype(np.int64)
+    payments[last] += extra.astype(np.int64)
+    principal_paid = opening_col - balances
+    interest = payments - principal_paid
+    interest[-1] = int(np.rint(opening_col[-1] * r[-1]))
+    payments[-1] = principal_paid[-1] + interest[-1]
+
+    schedule = Schedule(payments, interest, principal_paid, balances)
+    first = np.concatenate(([0], last[:-1] + 1))
+    summaries = [{
+        "start_month": seg_start,
+        "end_month": seg_start + seg_length - 1,
+        "annual_rate": round(seg_rate * 1200, 6),
+        "payment": seg_payment / 100,
+        "extra_payment": seg_extra / 100,
+        "opening_balance": seg_opening / 100,
+        "closing_balance": seg_closing / 100,
+        "interest": seg_interest / 100,
+    } for seg_start, seg_length, seg_rate, seg_payment, seg_extra, seg_opening, seg_closing, seg_interest in zip(
+        start.tolist(), length.tolist(), rate.tolist(), payment.tolist(), extra.tolist(),
+        opening_col[first].tolist(), balances[last].tolist(), np.add.reduceat(interest, first).tolist()
+    )]
+    return schedule, summaries
@@ -3,22 +3,34 @@ FinLand Backend API - Clean Version
 Financial Calculator & AI Advisor
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from dotenv import load_dotenv
-import joblib
-import math
+import gc
+import json
 import os
-import re
-import html
-import numpy as np
+import sys
+import hashlib
+import hmac
+import threading
+import time
+from llm import get_gemini_client
+from inference import InferenceBusy, InferencePool, predict_with_intervals
+from metrics import Gauge, get_metrics, process_memory
+from profiler import profiler
+from request_log import event, get_request_log
+from schemas import Choice, Flag, ListOf, Number, Schema, Text, Variant, join_path
+from chat_cache import AnswerCache, context_bucket
+from responses import SCHEDULE_FIELDS, FastJSONProvider, compress_response, format_schedule, matching_etag, schedule_csv
+import ratelimit_store  # noqa: F401 - registers the shm:// limiter storage
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
@@ -41,21 +53,88 @@ CORS(app,
      supports_credentials=False,
      max_age=86400)
 
+app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', '1') != '0'  # 0 for load tests only
+
+# Counters shared by every worker on the host (shm://), across hosts (redis://) or one process (memory://);
+# sliding windows avoid the burst a fixed window allows at each reset
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://",
-    strategy="fixed-window"
+    storage_uri=os.getenv('RATELIMIT_STORAGE_URI', 'shm://finland-ratelimit' if os.name == 'posix' else 'memory://'),
+    strategy=os.getenv('RATELIMIT_STRATEGY', 'sliding-window-counter')
+)
+
+# Repeated AI chat questions reuse a previous Gemini answer (paraphrases only when
+# CHAT_CACHE_SIMILARITY is set)
+chat_cache = AnswerCache(
+    max_entries=int(os.getenv('CHAT_CACHE_SIZE', 1000)),
+    ttl=float(os.getenv('CHAT_CACHE_TTL', 21600)),
+    similarity=float(os.getenv('CHAT_CACHE_SIMILARITY', 0))
 )
 
+# Calculator responses are pure functions of their inputs; bump the version
+# whenever the math changes so cached ETags stop matching
+CALCULATOR_VERSION = "2"  # 2: integer-satang schedules (amortization.py)
+CALCULATOR_MAX_AGE = int(os.getenv('CALCULATOR_MAX_AGE', 86400))
+
+# Responses at least this large are gzip/brotli compressed when accepted
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+SCHEDULE_FORMATS = ('rows', 'columnar')
+
+# Prometheus metrics (METRICS_ENABLED=0 turns recording into no-ops);
+# set METRICS_TOKEN to require `Authorization: Bearer <token>` on /api/metrics
+metrics = get_metrics()
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+model_load_seconds = metrics.register(Gauge(
+    'finland_model_load_seconds', 'Time taken to download and load the advisor model'))
+metrics.register(Gauge(
+    'finland_chat_cache', 'AI chat answer cache counters', ('stat',),
+    callback=lambda: {(k,): v for k, v in chat_cache.stats().items()}))
+metrics.register(Gauge(
+    'finland_llm_breaker_open', 'Gemini model circuit breaker open (1) or closed (0)', ('model',),
+    callback=lambda: {(model,): int(state != 'closed') for model, state in _llm_breaker_states().items()}))
+
+metrics.register(Gauge(
+    'finland_process_memory_bytes', 'Worker resident memory: shared (copy-on-write) vs private', ('kind',),
+    callback=lambda: {(kind,): value for kind, value in process_memory().items()}))
+
+metrics.register(Gauge(
+    'finland_inference_queue_depth', 'Rows queued or being scored in the inference process pool',
+    callback=lambda: {(): _inference_pool.depth()} if _inference_pool else {}))
+metrics.register(Gauge(
+    'finland_inference_rejected', 'Analyses rejected because the inference queue was full or scoring timed out',
+    callback=lambda: {(): _inference_pool.rejected} if _inference_pool else {}))
+
+metrics.register(Gauge(
+    'finland_input_drift_psi', 'Population stability index of served ai-analyze inputs vs training', ('feature',),
+    callback=lambda: {(name,): score['psi'] for name, score in _drift_monitor.scores()['features'].items()}
+    if _drift_monitor else {}))
+
+# Structured request log (route, timings, model, cache hit, error class) queued
+# per request and written in batches by a background thread; REQUEST_LOG=0 disables
+request_log = get_request_log()
+metrics.register(Gauge(
+    'finland_request_log_events', 'Request log events queued, written, dropped (queue full) or failed', ('stat',),
+    callback=lambda: {(k,): v for k, v in request_log.stats().items()} if request_log else {}))
+
+def _llm_breaker_states():
+    gemini = get_gemini_client()
+    return gemini.status() if gemini else {}
+
+# On-demand sampling profiler: /api/debug/profile needs PROFILER_TOKEN;
+# PROFILER_SIGNAL=USR2 also profiles a worker on `kill -USR2 <pid>`
+PROFILER_TOKEN = os.getenv('PROFILER_TOKEN', '')
+if os.getenv('PROFILER_SIGNAL'):
+    profiler.install_signal_handler(os.getenv('PROFILER_SIGNAL'))
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MIDDLEWARE
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.after_request
-def add_security_headers(response):
-    response.headers['Content-Security-Policy'] = (
+# Also applied by the ASGI entry point (asgi.py) to its native routes
+SECURITY_HEADERS = {
+    'Content-Security-Policy': (
         "default-src 'self'; "
         "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
         "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
@@ -63,59 +142,113 @@ def add_security_headers(response):
         "img-src 'self' data: https:; "
         "connect-src 'self' https://finland-ilb5.onrender.com https://generativelanguage.googleapis.com; "
         "frame-ancestors 'none';"
+    ),
+    'X-Frame-Options': 'DENY',
+    'X-Content-Type-Options': 'nosniff',
+    'X-XSS-Protection': '1; mode=block',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+    'Permissions-Policy': 'geolocation=(), microphone=(), camera=()',
+}
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.log_fields = {}
+    g.stage_timings = {}
+
+def _record_stage_timing(stage, seconds):
+    if has_request_context() and 'stage_timings' in g:
+        g.stage_timings[stage] = round(seconds * 1000, 3)
+
+if request_log is not None:
+    metrics.stage_listener = _record_stage_timing
+
+def log_fields(**fields):
+    """Add fields to this request's log event"""
+    if 'log_fields' in g:
+        g.log_fields.update(fields)
+
+def log_exception(error):
+    """Record an exception on this request's log event; the traceback is
+    formatted by the log's writer thread, not here"""
+    log_fields(error_class=type(error).__name__, error=str(error), traceback=error)
+
+def request_event(status, **fields):
+    """Log event for the current request"""
+    return event(
+        route=request.url_rule.rule if request.url_rule else 'unmatched',
+        method=request.method,
+        status=status,
+        duration_ms=round((time.perf_counter() - g.request_start) * 1000, 3),
+        timings=g.stage_timings,
+        **{"cache_hit": status == 304, **g.log_fields, **fields},
     )
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-    response.headers['Permissions-Policy'] = 'geolocation=(), microphone=(), camera=()'
+
+@app.after_request
+def record_request_metrics(response):
+    if metrics.enabled and 'request_start' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe_request(route, request.method, response.status_code,
+                                time.perf_counter() - g.request_start)
+    return response
+
+@app.after_request
+def log_request(response):
+    # Streamed responses log themselves when the stream ends
+    if request_log is not None and 'request_start' in g and not g.get('log_deferred'):
+        request_log.emit(request_event(response.status_code))
+    return response
+
+@app.after_request
+def add_security_headers(response):
+    response.headers.update(SECURITY_HEADERS)
+    return response
+
+@app.after_request
+def compress_api_response(response):
+    if request.path.startswith('/api/'):
+        return compress_response(response, COMPRESS_MIN_SIZE)
     return response
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # UTILITIES
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def sanitize_string(value):
-    """Sanitize string input to prevent XSS attacks"""
-    if not isinstance(value, str):
-        return None
-    value = re.sub(r'<[^>]*>', '', value)
-    value = html.escape(value)
-    value = re.sub(r'javascript:', '', value, flags=re.IGNORECASE)
-    value = re.sub(r'on\w+\s*=', '', value, flags=re.IGNORECASE)
-    return value
-
-def sanitize_number(value, min_val=0, max_val=float('inf')):
-    """Sanitize and validate numeric input"""
-    try:
-        num = float(value)
-        if math.isnan(num) or math.isinf(num):
-            return None
-        if num < min_val or num > max_val:
-            return None
-        return num
-    except (ValueError, TypeError):
-        return None
+def request_data():
+    """JSON body for POST, query string for the cacheable GET variants"""
+    if request.method == 'GET':
+        return request.args.to_dict()
+    return request.get_json(silent=True)
 
-def validate_input(data, required_fields):
-    """Validate required fields exist and are valid numbers"""
-    if not data:
-        return "No data provided"
-    
-    for field in required_fields:
-        if field not in data:
-            return f"Missing required field: {field}"
-        
-        value = sanitize_number(data[field], min_val=0, max_val=1e12)
-        if value is None:
-            return f"Field '{field}' must be a valid positive number (max 1 trillion)"
-        
-        if field in ['apr', 'interest_rate', 'int_rate'] and value > 100:
-            return f"Interest rate '{field}' cannot exceed 100%"
-        if field in ['term', 'term_months'] and value > 600:
-            return f"Term cannot exceed 600 months (50 years)"
-    
-    return None
+def bearer_token_matches(token):
+    """Constant-time check of `Authorization: Bearer <token>` (bytes: headers may be non-ASCII)"""
+    supplied = request.headers.get('Authorization', '').encode('utf-8')
+    return hmac.compare_digest(supplied, f"Bearer {token}".encode('utf-8'))
+
+def error_body(errors):
+    """Every field error at once; `error` repeats the first for clients that show one message"""
+    return {"error": next(iter(errors.values())), "errors": errors}
+
+def invalid_request(errors):
+    return jsonify(error_body(errors)), 400
+
+def calculation_etag(route, **params):
+    """Strong ETag from the canonicalized inputs of a pure calculation"""
+    canonical = json.dumps([CALCULATOR_VERSION, route, sorted(params.items())], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+def not_modified(etag):
+    """304 for a client (or CDN) that already holds this result (`etag` as it holds it)"""
+    response = Response(status=304)
+    return cacheable(response, etag)
+
+def cacheable(response, etag):
+    """Mark a calculator response as cacheable by browsers and CDNs"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={CALCULATOR_MAX_AGE}'
+    # compress_response only sees 200s; a 304 must vary the same way for caches
+    response.vary.add('Accept-Encoding')
+    return response
 
 def calculate_monthly_payment(principal, annual_rate, term_months):
     """Calculate monthly payment for a loan"""
@@ -143,16 +276,26 @@ def calculate_payoff_months(balance, monthly_rate, monthly_payment):
 
 _financial_advisor = None
 _advisor_loaded = False
+_advisor_lock = threading.Lock()
 
 def get_financial_advisor():
     """Lazy load Financial Advisor model"""
     global _financial_advisor, _advisor_loaded
-    
     if _advisor_loaded:
         return _financial_advisor
     
-    _advisor_loaded = True
-    model_path = 'financial_advisor_model.pkl'
+    # Concurrent first requests (or the warm-up thread) wait for one load
+    with _advisor_lock:
+        if not _advisor_loaded:
+            _financial_advisor = _load_financial_advisor()
+            # Only now: the unlocked check above returns _financial_advisor as soon as this is set
+            _advisor_loaded = True
+    return _financial_advisor
+
+def _load_financial_advisor():
+    """The model package from MODEL_PATH (downloaded from MODEL_URL if missing), or None"""
+    model_path = os.getenv('MODEL_PATH', 'financial_advisor_model.pkl')
+    load_start = time.perf_counter()
     
     # Try download if not exists
     if not os.path.exists(model_path):
@@ -175,13 +318,253 @@ def get_financial_advisor():
     
     try:
         print("🧠 Loading Financial Advisor...")
-        _financial_advisor = joblib.load(model_path)
-        print(f"✅ Loaded! ({_financial_advisor.get('training_samples', 0):,} samples)")
-        return _financial_advisor
+        import joblib  # pulls in numpy/sklearn: keep it off the calculator-only boot path
+        advisor = joblib.load(model_path)
+        model_load_seconds.set(time.perf_counter() - load_start)
+        print(f"✅ Loaded! ({advisor.get('training_samples', 0):,} samples)")
+        return advisor
     except Exception as e:
         print(f"❌ Load error: {e}")
         return None
 
+# INFERENCE_WORKERS=N scores ai-analyze in N processes (0: in the request thread)
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 0))
+_inference_pool = None
+_inference_lock = threading.Lock()
+
+def get_inference_pool():
+    """Lazy start the inference process pool (None when disabled or no model)"""
+    global _inference_pool
+    
+    if _inference_pool is not None or INFERENCE_WORKERS <= 0:
+        return _inference_pool
+    
+    advisor = get_financial_advisor()
+    model_path = os.getenv('MODEL_PATH', 'financial_advisor_model.pkl')
+    if advisor is None or not os.path.exists(model_path):
+        return None
+    
+    with _inference_lock:
+        if _inference_pool is None:
+            _inference_pool = InferencePool(
+                model_path,
+                advisor=advisor,
+                workers=INFERENCE_WORKERS,
+                max_queue=int(os.getenv('INFERENCE_MAX_QUEUE', 64)),
+                batch_size=int(os.getenv('INFERENCE_BATCH_SIZE', 32)),
+                batch_wait=float(os.getenv('INFERENCE_BATCH_WAIT_MS', 2)) / 1000,
+            )
+            print(f"⚙️ Inference pool: {INFERENCE_WORKERS} processes")
+    return _inference_pool
+
+# Prediction intervals: central share of the trees' predictions (ai-analyze `interval_level`)
+PREDICTION_INTERVAL_LEVEL = float(os.getenv('PREDICTION_INTERVAL_LEVEL', 0.8))
+_regression_forest = None
+_regression_forest_lock = threading.Lock()
+
+def get_regression_forest():
+    """Lazy pack the regression forests for per-tree predictions (None without a model)"""
+    global _regression_forest
+    
+    if _regression_forest is not None:
+        return _regression_forest
+    
+    advisor = get_financial_advisor()
+    if advisor is None:
+        return None
+    
+    with _regression_forest_lock:
+        if _regression_forest is None:
+            from forest import RegressionForest
+            _regression_forest = RegressionForest(advisor['regression_model'])
+    return _regression_forest
+
+_forest_explainer = None
+
+def get_forest_explainer():
+    """Path-contribution explainer from the model package (built here for older packages)"""
+    global _forest_explainer
+    
+    if _forest_explainer is not None:
+        return _forest_explainer
+    
+    advisor = get_financial_advisor()
+    if advisor is None:
+        return None
+    
+    with _regression_forest_lock:
+        if _forest_explainer is None:
+            explainer = advisor.get('explainer')
+            if explainer is None:
+                from forest import ForestExplainer, advisor_forests
+                explainer = ForestExplainer(advisor_forests(advisor), advisor['scaler'].n_features_in_)
+            _forest_explainer = explainer
+    return _forest_explainer
+
+# Input drift: served ai-analyze features vs the training sketch in the model package
+DRIFT_MONITORING = os.getenv('DRIFT_MONITORING', '1') != '0'
+_drift_monitor = None
+
+def get_drift_monitor():
+    """Lazy drift monitor (None when disabled or the model package has no reference sketch)"""
+    global _drift_monitor
+    
+    if _drift_monitor is not None or not DRIFT_MONITORING:
+        return _drift_monitor
+    
+    advisor = get_financial_advisor()
+    if advisor is None or advisor.get('reference_sketch') is None:
+        return None
+    
+    with _regression_forest_lock:
+        if _drift_monitor is None:
+            from drift import DriftMonitor
+            _drift_monitor = DriftMonitor(advisor['reference_sketch'], exclude=SERVING_BUILT_FEATURES)
+    return _drift_monitor
+
+def warm_up():
+    """Load the advisor model and Gemini SDK before the first request needs them"""
+    start = time.perf_counter()
+    import amortization  # noqa: F401 - NumPy for the calculators
+    get_financial_advisor()
+    get_regression_forest()
+    get_forest_explainer()
+    get_drift_monitor()
+    get_inference_pool()
+    get_gemini_client()
+    print(f"🔥 Warm-up done in {time.perf_counter() - start:.1f}s")
+
+def preload_for_fork():
+    """Load the model in the gunicorn master and freeze it before workers fork.
+    
+    gc.freeze() moves every object to a permanent generation the collector
+    never walks, so workers don't dirty (copy) the shared pages by collecting.
+    """
+    get_financial_advisor()
+    gc.collect()
+    gc.freeze()
+    print(f"🧊 Preloaded and froze {gc.get_freeze_count():,} objects for copy-on-write sharing")
+
+# WARMUP=background (default) loads heavy modules after boot without delaying
+# it, eager loads them at import, off leaves them to the first request
+# (never in __mp_main__: inference pool processes re-import `python app.py`)
+WARMUP = os.getenv('WARMUP', 'background') if __name__ != '__mp_main__' else 'off'
+if WARMUP == 'eager':
+    warm_up()
+elif WARMUP == 'background':
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REQUEST SCHEMAS (compiled once here, see schemas.py)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+AMOUNT = Number(0, 1e12, required=True)
+RATE = Number(0, 100, required=True)
+TERM = Number(1, 600, required=True, cast=int)
+SCHEDULE_FORMAT = Choice(SCHEDULE_FORMATS, default='rows')
+
+PROFILE_REQUEST = Schema({
+    'seconds': Number(0.1, 60, default=10.0),
+    'interval': Number(0.001, 1, default=0.005),
+    'match': Text(200, sanitize=False),
+})
+
+CREDIT_CARD_REQUEST = Schema({
+    'balance': AMOUNT,
+    'apr': RATE,
+    'monthly_payment': AMOUNT,
+    'schedule_format': SCHEDULE_FORMAT,
+})
+
+STUDENT_LOAN_REQUEST = Schema({
+    'loan_amount': AMOUNT,
+    'interest_rate': RATE,
+    'term_months': TERM,
+    'schedule_format': SCHEDULE_FORMAT,
+})
+
+LOAN_EVENT_LIMIT = 120
+EVENT_MONTH = Number(1, 600, required=True, cast=int, whole=True)
+LOAN_EVENT = Variant('type', {
+    'rate_change': Schema({'month': EVENT_MONTH, 'rate': RATE, 'recast': Flag(True)}),
+    'extra_payment': Schema({'month': EVENT_MONTH, 'amount': AMOUNT, 'recast': Flag(False)}),
+    'payment_holiday': Schema({'month': EVENT_MONTH, 'months': Number(1, 600, required=True, cast=int, whole=True),
+                               'capitalize': Flag(True)}),
+})
+LOAN_EVENTS = ListOf(LOAN_EVENT, 0, LOAN_EVENT_LIMIT)
+
+LOAN_SCHEDULE_REQUEST = Schema({
+    'loan_amount': AMOUNT,
+    'interest_rate': RATE,
+    'term_months': TERM,
+    'events': LOAN_EVENTS,
+    'schedule_format': SCHEDULE_FORMAT,
+    'include_schedule': Flag(True),
+})
+
+# refinance.optimize scores all 2^debts - 1 subsets against every offer
+MAX_DEBTS = 12
+MAX_OFFERS = 50
+REFINANCE_REQUEST = Schema({
+    'debts': ListOf(Schema({
+        'balance': AMOUNT,
+        'apr': RATE,
+        'monthly_payment': Number(0, 1e12),
+        'term_months': Number(1, 600, cast=int),
+    }), 1, MAX_DEBTS, required=True),
+    'offers': ListOf(Schema({
+        'name': Text(80, truncate=True, stringify=True),
+        'rate': RATE,
+        'term_months': TERM,
+        'fee': Number(0, 1e12),
+        'fee_percent': Number(0, 100),
+        'min_amount': Number(0, 1e12),
+        'max_amount': Number(0, 1e12),
+    }), 1, MAX_OFFERS, required=True),
+    'top': Number(1, 20, default=5, cast=int, lenient=True),
+})
+
+EXPORT_LOAN_LIMIT = int(os.getenv('EXPORT_LOAN_LIMIT', 1000))
+EXPORT_ID = Text(64, truncate=True, stringify=True)
+EXPORT_LOAN = Variant('type', {
+    'credit-card': Schema({'balance': AMOUNT, 'apr': RATE, 'monthly_payment': AMOUNT, 'id': EXPORT_ID}),
+    'student-loan': Schema({'loan_amount': AMOUNT, 'interest_rate': RATE, 'term_months': TERM, 'id': EXPORT_ID}),
+    'loan-schedule': Schema({'loan_amount': AMOUNT, 'interest_rate': RATE, 'term_months': TERM,
+                             'events': LOAN_EVENTS, 'id': EXPORT_ID}),
+})
+EXPORT_REQUEST = Schema({'loans': ListOf(EXPORT_LOAN, 1, EXPORT_LOAN_LIMIT, required=True)})
+
+ANALYZE_REQUEST = Schema({
+    'loan_amount': Number(0, 1e12, default=0.0),
+    'interest_rate': Number(0, 100, default=0.0),
+    'term_months': Number(1, 600, default=60.0),
+    'monthly_income': Number(0, 1e12, default=0.0),
+    'monthly_payment': Number(0, 1e12, default=0.0),
+    'monthly_expenses': Number(0, 1e12, default=0.0),
+    'emergency_months': Number(0, 600, default=0.0),
+    'age': Number(0, 120, default=30, cast=int),
+    'job_stability': Number(0, 100, default=70.0),
+    'payment_history': Number(0, 100, default=80.0),
+    'account_age': Number(0, 1200, default=36, cast=int),
+    'current_savings': Number(0, 1e12, default=0.0),
+    'intervals': Flag(True),
+    'interval_level': Number(0.5, 0.99, default=PREDICTION_INTERVAL_LEVEL),
+    'explain': Flag(False),
+    'explain_top': Number(1, 10, default=3, cast=int),
+    'surrogate': Flag(False),
+})
+
+# Chat context numbers are best-effort: bad values fall back to 0
+CHAT_CONTEXT_AMOUNT = Number(0, 1e12, default=0, lenient=True)
+CHAT_REQUEST = Schema({
+    'question': Text(2000, required=True),
+    'balance': CHAT_CONTEXT_AMOUNT,
+    'apr': Number(0, 100, default=0, lenient=True),
+    'payment': CHAT_CONTEXT_AMOUNT,
+    'monthly_income': CHAT_CONTEXT_AMOUNT,
+    'stream': Flag(False),
+})
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # API ROUTES
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -198,18 +581,63 @@ def health():
     })
 
 
-@app.route('/api/calculate/credit-card', methods=['POST'])
+@app.route('/api/metrics', methods=['GET'])
+@limiter.exempt
+def prometheus_metrics():
+    """Prometheus scrape endpoint (this worker's metrics)"""
+    if METRICS_TOKEN and not bearer_token_matches(METRICS_TOKEN):
+        return jsonify({"error": "Unauthorized"}), 401
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics disabled"}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/drift', methods=['GET'])
+@limiter.exempt
+def input_drift():
+    """Drift of served ai-analyze inputs from the training data (this worker, since startup)"""
+    if METRICS_TOKEN and not bearer_token_matches(METRICS_TOKEN):
+        return jsonify({"error": "Unauthorized"}), 401
+    monitor = get_drift_monitor()
+    if monitor is None:
+        return jsonify({"error": "Drift monitoring unavailable (disabled, or no reference sketch in the model)"}), 404
+    return jsonify({"success": True, **monitor.scores()}), 200, {'Cache-Control': 'no-store'}
+
+
+@app.route('/api/debug/profile', methods=['GET'])
+@limiter.limit("2 per minute")
+def debug_profile():
+    """Sample this worker's stacks for N seconds; returns collapsed stacks"""
+    if not PROFILER_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not bearer_token_matches(PROFILER_TOKEN):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    params, errors = PROFILE_REQUEST.validate(request.args.to_dict())
+    if errors:
+        return invalid_request(errors)
+    
+    stacks = profiler.profile(params['seconds'], params['interval'], match=params['match'])
+    if stacks is None:
+        return jsonify({"error": "A profile is already running"}), 409
+    return Response(stacks, mimetype='text/plain', headers={'Cache-Control': 'no-store'})
+
+
+@app.route('/api/calculate/credit-card', methods=['GET', 'POST'])
 @limiter.limit("60 per minute")
 def calculate_credit_card():
     try:
-        data = request.json
-        error = validate_input(data, ['balance', 'apr', 'monthly_payment'])
-        if error:
-            return jsonify({"error": error}), 400
-
-        balance = float(data['balance'])
-        apr = float(data['apr'])
-        monthly_payment = float(data['monthly_payment'])
+        params, errors = CREDIT_CARD_REQUEST.validate(request_data())
+        if errors:
+            return invalid_request(errors)
+        balance, apr, monthly_payment = params['balance'], params['apr'], params['monthly_payment']
+        schedule_format = params['schedule_format']
+        
+        etag = calculation_etag('credit-card', balance=balance, apr=apr, monthly_payment=monthly_payment,
+                                schedule_format=schedule_format)
+        held = matching_etag(etag)
+        if held:
+            return not_modified(held)
         
         if monthly_payment <= 0:
             return jsonify({"error": "ยอดจ่ายต่อเดือนต้องมากกว่า 0"}), 400
@@ -232,89 +660,233 @@ def calculate_credit_card():
                 "recommendation": f"💡 จ่ายอย่างน้อย {minimum_payment:,.0f} บาท/เดือน"
             }), 400
         
-        # Calculate payoff schedule
-        total_paid = 0
-        total_interest = 0
-        months = 0
-        schedule = []
-        current_balance = balance
-        
-        while current_balance > 0 and months < 600:
-            months += 1
-            interest = current_balance * monthly_rate
-            principal = min(monthly_payment - interest, current_balance)
-            current_balance -= principal
-            total_paid += (interest + principal)
-            total_interest += interest
-            
-            schedule.append({
-                "month": months,
-                "payment": round(interest + principal, 2),
-                "interest": round(interest, 2),
-                "principal": round(principal, 2),
-                "remaining": round(max(0, current_balance), 2)
-            })
+        # Calculate payoff schedule (integer satang, see amortization.py)
+        with metrics.stage('credit_card.schedule'):
+            from amortization import credit_card_schedule  # NumPy: lazy for boot
+            payoff = credit_card_schedule(balance, apr, monthly_payment)
         
-        return jsonify({
-            "success": True,
-            "months": months,
-            "total_paid": round(total_paid, 2),
-            "total_interest": round(total_interest, 2),
-            "schedule": schedule
-        })
+        with metrics.stage('credit_card.serialize'):
+            schedule = format_schedule(payoff.columns(), schedule_format)
+            
+            return cacheable(jsonify({
+                "success": True,
+                "months": payoff.months,
+                "total_paid": payoff.total_paid,
+                "total_interest": payoff.total_interest,
+                "schedule_format": schedule_format,
+                "schedule": schedule
+            }), etag)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/calculate/student-loan', methods=['POST'])
+@app.route('/api/calculate/student-loan', methods=['GET', 'POST'])
 @limiter.limit("60 per minute")
 def calculate_student_loan():
     try:
-        data = request.json
-        error = validate_input(data, ['loan_amount', 'interest_rate', 'term_months'])
-        if error:
-            return jsonify({"error": error}), 400
-
-        loan_amount = float(data['loan_amount'])
-        interest_rate = float(data['interest_rate'])
-        term_months = int(data['term_months'])
+        params, errors = STUDENT_LOAN_REQUEST.validate(request_data())
+        if errors:
+            return invalid_request(errors)
+        loan_amount, interest_rate, term_months = params['loan_amount'], params['interest_rate'], params['term_months']
+        schedule_format = params['schedule_format']
         
-        monthly_payment = calculate_monthly_payment(loan_amount, interest_rate, term_months)
-        monthly_rate = interest_rate / 100 / 12
+        etag = calculation_etag('student-loan', loan_amount=loan_amount, interest_rate=interest_rate,
+                                term_months=term_months, schedule_format=schedule_format)
+        held = matching_etag(etag)
+        if held:
+            return not_modified(held)
+        
+        # Level payment in satang; the last payment clears the loan to exactly 0
+        with metrics.stage('student_loan.schedule'):
+            from amortization import student_loan_schedule  # NumPy: lazy for boot
+            monthly_payment, loan = student_loan_schedule(loan_amount, interest_rate, term_months)
         
-        total_paid = 0
-        total_interest = 0
-        schedule = []
-        current_balance = loan_amount
-        
-        for month in range(1, term_months + 1):
-            interest = current_balance * monthly_rate
-            principal = monthly_payment - interest
-            current_balance -= principal
-            total_paid += monthly_payment
-            total_interest += interest
+        with metrics.stage('student_loan.serialize'):
+            schedule = format_schedule(loan.columns(), schedule_format)
             
-            schedule.append({
-                "month": month,
-                "payment": round(monthly_payment, 2),
-                "interest": round(interest, 2),
-                "principal": round(principal, 2),
-                "remaining": round(max(0, current_balance), 2)
-            })
+            return cacheable(jsonify({
+                "success": True,
+                "monthly_payment": monthly_payment / 100,
+                "total_paid": loan.total_paid,
+                "total_interest": loan.total_interest,
+                "schedule_format": schedule_format,
+                "schedule": schedule
+            }), etag)
         
-        return jsonify({
-            "success": True,
-            "monthly_payment": round(monthly_payment, 2),
-            "total_paid": round(total_paid, 2),
-            "total_interest": round(total_interest, 2),
-            "schedule": schedule
-        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/calculate/loan-schedule', methods=['POST'])
+@limiter.limit("60 per minute")
+def calculate_loan_schedule():
+    """Loan schedule with rate changes, extra payments and payment holidays"""
+    try:
+        params, errors = LOAN_SCHEDULE_REQUEST.validate(request_data())
+        if not errors:
+            check_loan_events(params, 'events', errors)
+        if errors:
+            return invalid_request(errors)
+        loan_amount, interest_rate, term_months = params['loan_amount'], params['interest_rate'], params['term_months']
+        events = params['events']
+        schedule_format, include_schedule = params['schedule_format'], params['include_schedule']
+        
+        etag = calculation_etag('loan-schedule', loan_amount=loan_amount, interest_rate=interest_rate,
+                                term_months=term_months, events=events, schedule_format=schedule_format,
+                                include_schedule=include_schedule)
+        held = matching_etag(etag)
+        if held:
+            return not_modified(held)
+        
+        with metrics.stage('loan_schedule.schedule'):
+            from amortization import event_schedule, to_satang  # NumPy: lazy for boot
+            loan, segments = event_schedule(to_satang(loan_amount), interest_rate, term_months, events)
+        
+        with metrics.stage('loan_schedule.serialize'):
+            result = {
+                "success": True,
+                "months": loan.months,
+                "monthly_payment": next((s["payment"] for s in segments if s["payment"] > 0), 0),
+                "total_paid": loan.total_paid,
+                "total_interest": loan.total_interest,
+                "segments": segments,
+            }
+            if include_schedule:
+                result["schedule_format"] = schedule_format
+                result["schedule"] = format_schedule(loan.columns(), schedule_format)
+            return cacheable(jsonify(result), etag)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def check_loan_events(loan, path, errors):
+    """Months against the loan's term; events become amortization.event_schedule's form
+    (amounts in satang, in month order)"""
+    term_months = loan['term_months']
+    for i, event in enumerate(loan['events']):
+        for field in ('month', 'months'):
+            if event.get(field, 0) > term_months:
+                errors[f"{path}[{i}].{field}"] = f"{path}[{i}].{field} must be at most the term ({term_months} months)"
+        if 'amount' in event:
+            event['amount'] = int(round(event['amount'] * 100))
+    loan['events'].sort(key=lambda event: event['month'])
+
+
+@app.route('/api/calculate/refinance', methods=['POST'])
+@limiter.limit("30 per minute")
+def calculate_refinance():
+    """Cheapest ways to consolidate debts with the given refinance offers"""
+    try:
+        params, errors = REFINANCE_REQUEST.validate(request_data())
+        if not errors:
+            debts, offers = refinance_plans(params, errors)
+        if errors:
+            return invalid_request(errors)
+        top = params['top']
+        
+        etag = calculation_etag('refinance', debts=debts, offers=offers, top=top)
+        held = matching_etag(etag)
+        if held:
+            return not_modified(held)
+        
+        with metrics.stage('refinance.optimize'):
+            from refinance import optimize  # NumPy: lazy for boot
+            try:
+                result = optimize(debts, offers, top=top)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        return cacheable(jsonify({"success": True, **result}), etag)
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def refinance_plans(params, errors):
+    """Validated debts and offers in refinance.optimize's form: a debt is paid
+    by monthly_payment or term_months; unset offer options are left out"""
+    debts = []
+    for i, debt in enumerate(params['debts']):
+        if debt['monthly_payment']:
+            del debt['term_months']
+        elif debt['term_months'] is not None:
+            del debt['monthly_payment']
+        else:
+            errors[f"debts[{i}]"] = f"debts[{i}] needs a monthly_payment or term_months"
+        debts.append(debt)
+    
+    offers = []
+    for i, offer in enumerate(params['offers']):
+        offer['name'] = offer['name'] or f"offer-{i}"
+        offers.append({field: value for field, value in offer.items() if value is not None})
+    return debts, offers
+
+
+@app.route('/api/export/schedule.csv', methods=['GET', 'POST'])
+@limiter.limit("30 per minute")
+def export_schedule_csv():
+    """Payment schedule as a streamed CSV download; {"loans": [...]} exports many at once"""
+    try:
+        data = request_data()
+        bulk = isinstance(data, dict) and 'loans' in data
+        
+        # Validate everything up front: once streaming starts the status is 200
+        if bulk:
+            params, errors = EXPORT_REQUEST.validate(data)
+            loans = params['loans'] if not errors else []
+        else:
+            loan, errors = EXPORT_LOAN.validate(data)
+            loans = [loan] if not errors else []
+        for i, loan in enumerate(loans):
+            check_export_loan(loan, f"loans[{i}]" if bulk else '', errors)
+            loan['id'] = loan['id'] or str(i)
+            if not bulk:
+                del loan['id']
+        if errors:
+            return invalid_request(errors)
+        
+        etag = calculation_etag('export-schedule', loans=loans, bulk=bulk)
+        held = matching_etag(etag)
+        if held:
+            return not_modified(held)
+        
+        header = (['loan', 'type'] if bulk else []) + list(SCHEDULE_FIELDS)
+        # No Content-Length: the body goes out with chunked transfer encoding
+        response = Response(schedule_csv(header, _export_schedules(loans, bulk)), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename="finland-schedule.csv"'
+        return cacheable(response, etag)
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def check_export_loan(loan, path, errors):
+    """Checks across an export loan's fields (the schema has checked each one)"""
+    if loan['type'] == 'credit-card':
+        if loan['monthly_payment'] <= 0 or loan['monthly_payment'] < loan['balance'] * loan['apr'] / 100 / 12 * 1.01:
+            field = join_path(path, 'monthly_payment')
+            errors[field] = f"{field} is too low to pay off the balance"
+    elif loan['type'] == 'loan-schedule':
+        check_loan_events(loan, join_path(path, 'events'), errors)
+
+
+def _export_schedules(loans, bulk):
+    """(prefix cells, Schedule) per loan, computed only as the CSV stream reaches it"""
+    from amortization import credit_card_schedule, event_schedule, student_loan_schedule, to_satang  # NumPy: lazy for boot
+    
+    for loan in loans:
+        if loan['type'] == 'credit-card':
+            schedule = credit_card_schedule(loan['balance'], loan['apr'], loan['monthly_payment'])
+        elif loan['type'] == 'student-loan':
+            _, schedule = student_loan_schedule(loan['loan_amount'], loan['interest_rate'], loan['term_months'])
+        else:
+            schedule, _ = event_schedule(to_satang(loan['loan_amount']), loan['interest_rate'],
+                                         loan['term_months'], loan['events'])
+        yield ([loan['id'], loan['type']] if bulk else []), schedule
+
+
 @app.route('/api/ai-analyze', methods=['POST'])
 @limiter.limit("30 per minute")
 def ai_analyze():
@@ -325,27 +897,25 @@ def ai_analyze():
         return jsonify({"error": "Financial Advisor model not loaded", "fallback": True}), 500
     
     try:
-        data = request.json
-        
-        # Extract inputs
-        loan_amount = float(data.get('loan_amount', 0))
-        interest_rate = float(data.get('interest_rate', 0))
-        term_months = float(data.get('term_months', 60))
-        monthly_income = float(data.get('monthly_income', 0))
-        monthly_payment = float(data.get('monthly_payment', 0))
-        monthly_expenses = float(data.get('monthly_expenses', 0) or monthly_income * 0.5)
-        emergency_months = float(data.get('emergency_months', 0))
-        age = int(data.get('age', 30))
-        job_stability = float(data.get('job_stability', 70))
-        payment_history = float(data.get('payment_history', 80))
-        account_age = int(data.get('account_age', 36))
-        current_savings = float(data.get('current_savings', 0))
-        
-        # Validate
-        if loan_amount <= 0:
-            return jsonify({"error": "กรุณาระบุยอดหนี้"}), 400
-        if monthly_income <= 0:
-            return jsonify({"error": "กรุณาระบุรายได้ต่อเดือน"}), 400
+        data, errors = ANALYZE_REQUEST.validate(request_data())
+        if not errors:
+            if data['loan_amount'] <= 0:
+                errors['loan_amount'] = "กรุณาระบุยอดหนี้"
+            if data['monthly_income'] <= 0:
+                errors['monthly_income'] = "กรุณาระบุรายได้ต่อเดือน"
+        if errors:
+            return invalid_request(errors)
+        
+        loan_amount, interest_rate, term_months = data['loan_amount'], data['interest_rate'], data['term_months']
+        monthly_income, monthly_payment = data['monthly_income'], data['monthly_payment']
+        monthly_expenses = data['monthly_expenses'] or monthly_income * 0.5
+        emergency_months, age, current_savings = data['emergency_months'], data['age'], data['current_savings']
+        job_stability, payment_history, account_age = data['job_stability'], data['payment_history'], data['account_age']
+        
+        # Prediction intervals unless the client opts out with "intervals": false;
+        # top feature contributions per output with "explain": true
+        interval_level = data['interval_level'] if data['intervals'] else None
+        explain_top = data['explain_top'] if data['explain'] else 0
         
         # Calculate payment if not provided
         if monthly_payment <= 0:
@@ -357,31 +927,79 @@ def ai_analyze():
         total_interest = (monthly_payment * term_months) - loan_amount
         
         # Build feature vector
-        features = _build_features(
-            loan_amount, interest_rate, term_months, monthly_income, monthly_payment,
-            dti_ratio, monthly_expenses, emergency_months, age, job_stability,
-            payment_history, account_age, current_savings
+        with metrics.stage('ai_analyze.features'):
+            features = _build_features(
+                loan_amount, interest_rate, term_months, monthly_income, monthly_payment,
+                dti_ratio, monthly_expenses, emergency_months, age, job_stability,
+                payment_history, account_age, current_savings
+            )
+        
+        drift = get_drift_monitor()
+        if drift is not None:
+            drift.update(features)
+        
+        # Lookup-grid surrogate with "surrogate": true (forests outside its grid). Explanations
+        # add up to the forests' predictions, so "explain": true always scores on the forests
+        outputs, source = None, 'surrogate'
+        surrogate = advisor.get('surrogate') if data['surrogate'] and not explain_top else None
+        if surrogate is not None:
+            with metrics.stage('ai_analyze.surrogate'):
+                outputs, covered = surrogate.predict(features)
+                # Outputs the grid is not accurate enough for come from their own forests
+                outputs = surrogate.complete(advisor, features, outputs, covered) if covered[0] else None
+        
+        # Get predictions (in the inference pool when enabled)
+        features_scaled, bounds = None, None
+        pool = get_inference_pool()
+        if outputs is None and pool is not None:
+            source = 'pool'
+            with metrics.stage('ai_analyze.predict'):
+                outputs, *bounds = pool.predict(features, interval_level)
+        elif outputs is None:
+            source = 'forest'
+            with metrics.stage('ai_analyze.scale'):
+                scaler = advisor['scaler']
+                features_scaled = scaler.transform(features)
+            
+            # One packed traversal gives the regression trees' mean and, when asked, their spread
+            with metrics.stage('ai_analyze.predict'):
+                outputs, *bounds = predict_with_intervals(
+                    advisor, get_regression_forest(), features_scaled, [interval_level])
+        
+        log_fields(model_version=advisor.get('version'), prediction_source=source)
+        reg_pred, strategy_code, action_code, urgency_level, support_type, better_than_avg = (
+            output[0] for output in outputs
         )
         
-        # Get predictions
-        scaler = advisor['scaler']
-        features_scaled = scaler.transform(features)
+        if features_scaled is None and ((interval_level is not None and bounds is None) or explain_top):
+            features_scaled = advisor['scaler'].transform(features)
+        
+        # Spread of the individual trees' predictions
+        intervals = None
+        if interval_level is not None:
+            with metrics.stage('ai_analyze.intervals'):
+                if bounds is None:
+                    _, *bounds = get_regression_forest().predict_interval(features_scaled, interval_level)
+                low, high = bounds
+                intervals = _prediction_intervals(low[0], high[0], interval_level)
         
-        reg_pred = advisor['regression_model'].predict(features_scaled)[0]
-        strategy_code = advisor['strategy_model'].predict(features_scaled)[0]
-        action_code = advisor['action_model'].predict(features_scaled)[0]
-        urgency_level = advisor['urgency_model'].predict(features_scaled)[0]
-        support_type = advisor['support_model'].predict(features_scaled)[0]
-        better_than_avg = advisor['better_model'].predict(features_scaled)[0]
+        explanations = None
+        if explain_top:
+            with metrics.stage('ai_analyze.explain'):
+                codes = (strategy_code, action_code, urgency_level, support_type, better_than_avg)
+                explanations = _explanations(get_forest_explainer(), features_scaled, features[0], codes,
+                                             explain_top, advisor.get('feature_columns'))
         
         # Generate insights
-        severity, risk_score = _calculate_risk(dti_ratio, interest_rate)
-        tips, actions = _generate_tips(dti_ratio, interest_rate, monthly_interest, term_months, total_interest)
+        with metrics.stage('ai_analyze.tips'):
+            severity, risk_score = _calculate_risk(dti_ratio, interest_rate)
+            tips, actions = _generate_tips(dti_ratio, interest_rate, monthly_interest, term_months, total_interest)
         
         # Calculate smart payment boost
-        smart_boost, time_saved, money_saved = _calculate_smart_boost(
-            loan_amount, monthly_rate, monthly_payment, monthly_income, term_months
-        )
+        with metrics.stage('ai_analyze.smart_boost'):
+            smart_boost, time_saved, money_saved = _calculate_smart_boost(
+                loan_amount, monthly_rate, monthly_payment, monthly_income, term_months
+            )
         
         if smart_boost > 0 and time_saved > 0:
             tips.append(f"💡 จ่ายเพิ่ม {smart_boost:,.0f}/เดือน เร็วขึ้น {time_saved} เดือน ประหยัด {money_saved:,.0f} บาท")
@@ -397,7 +1015,7 @@ def ai_analyze():
         else:
             tips.append("❤️‍🩹 สุขภาพการเงินน่าเป็นห่วง")
         
-        return jsonify({
+        result = {
             "success": True,
             "version": "4.0.0",
             "insights": {
@@ -450,16 +1068,77 @@ def ai_analyze():
                 "dti_ratio": round(dti_ratio, 1),
                 "age": age
             }
-        })
+        }
+        if intervals is not None:
+            result["prediction_intervals"] = intervals
+        if explanations is not None:
+            result["explanations"] = explanations
+        if data['surrogate']:
+            result["prediction_source"] = "surrogate" if source == 'surrogate' else "forest"
+        return jsonify(result)
+        
+    except InferenceBusy as e:
+        log_fields(error_class=type(e).__name__)
+        return jsonify({"error": str(e), "fallback": True}), 503, {'Retry-After': '1'}
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        log_exception(e)
         return jsonify({"error": str(e), "fallback": True}), 500
 
 
+def _prediction_intervals(low, high, level):
+    """{output: [low, high]} for the regression outputs, clipped and rounded like the point values"""
+    from scoring import REGRESSION_OUTPUTS
+    
+    intervals = {"level": level}
+    for name, (index, low_clip, high_clip, decimals) in REGRESSION_OUTPUTS.items():
+        bounds = [max(low_clip, float(bound)) for bound in (low[index], high[index])]
+        if high_clip is not None:
+            bounds = [min(high_clip, bound) for bound in bounds]
+        intervals[name] = [round(bound, decimals) if decimals else round(bound) for bound in bounds]
+    return intervals
+
+
+def _explanations(explainer, features_scaled, features, codes, top, feature_names=None):
+    """{output: {base, contributions}} with the `top` features that moved each output most.
+    
+    Regression outputs are explained in their own units, labels as the
+    probability of the predicted class (base + all contributions = prediction).
+    """
+    from scoring import LABEL_OUTPUTS, REGRESSION_OUTPUTS
+    
+    bias, contributions = explainer.explain(features_scaled)
+    contributions = contributions[0]
+    n_regression = len(explainer.outputs) - len(codes)
+    explained = [(name, index, 0) for name, (index, *_) in REGRESSION_OUTPUTS.items()]
+    for i, (name, code) in enumerate(zip([name for name, *_ in LABEL_OUTPUTS] + ['better_than_average'], codes)):
+        column = int(explainer.classes[n_regression + i].searchsorted(code))
+        explained.append((name, n_regression + i, column))
+    
+    explanations = {}
+    for name, output, column in explained:
+        values = contributions[output, :, column]
+        ranked = (-abs(values)).argsort(kind='stable')[:top]
+        explanations[name] = {
+            "base": round(float(bias[output, column]), 3),
+            "contributions": [{
+                "feature": feature_names[f] if feature_names else f"feature_{f}",
+                "value": round(float(features[f]), 2),
+                "contribution": round(float(values[f]), 3),
+            } for f in ranked if values[f] != 0],
+        }
+    return explanations
+
+
+# Features _build_features fills differently from training: min_payment (6) is the
+# payment itself and payment_to_min_ratio (19) is always 1.0. Drift monitoring
+# skips them; against the training reference they would always read as drifted.
+SERVING_BUILT_FEATURES = (6, 19)
+
 def _build_features(loan, rate, term, income, payment, dti, expenses, emergency, age, job_stab, pay_hist, acc_age, savings):
     """Build feature vector for ML model"""
+    import numpy as np  # already loaded with the model; lazy for calculator-only boots
+    
     effective_rate = ((1 + rate/100/12)**12 - 1) * 100
     payment_flexibility = income - payment - expenses
     debt_to_annual = loan / (income * 12) if income > 0 else 10
@@ -590,31 +1269,64 @@ def _calculate_smart_boost(loan, monthly_rate, payment, income, term_months):
 def ai_chat():
     """AI Chat using Google Gemini"""
     try:
-        gemini_key = os.environ.get('GEMINI_API_KEY')
-        if not gemini_key:
+        gemini = get_gemini_client()
+        if gemini is None:
             return jsonify({"error": "Gemini API not configured", "fallback": True}), 400
         
-        data = request.json
-        question = sanitize_string(data.get('question', ''))
-        balance = sanitize_number(data.get('balance'), 0, 1e12) or 0
-        apr = sanitize_number(data.get('apr'), 0, 100) or 0
-        payment = sanitize_number(data.get('payment'), 0, 1e12) or 0
-        monthly_income = sanitize_number(data.get('monthly_income'), 0, 1e12) or 0
+        chat, errors = parse_chat_request(request.get_json(silent=True))
+        if errors:
+            return invalid_request(errors)
         
-        if not question:
-            return jsonify({"error": "Question is required"}), 400
+        cached = chat_cache.get(chat['question'], chat['bucket'])
+        log_fields(cache_hit=cached is not None)
         
-        import google.generativeai as genai
-        genai.configure(api_key=gemini_key)
+        # Streaming mode: forward tokens as Server-Sent Events
+        if chat['stream'] or 'text/event-stream' in request.headers.get('Accept', ''):
+            g.log_deferred = True
+            return Response(
+                stream_with_context(_chat_event_stream(gemini, chat, cached)),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
         
-        # Calculate metrics
-        monthly_rate = apr / 100 / 12
-        monthly_interest = balance * monthly_rate
-        dti_ratio = (payment / monthly_income * 100) if monthly_income > 0 else 0
-        months_to_payoff = calculate_payoff_months(balance, monthly_rate, payment)
+        if cached:
+            answer, used_model = cached
+        else:
+            # Try models (cached client, per-attempt timeout, circuit breaker)
+            with metrics.stage('ai_chat.generate'):
+                answer, used_model = gemini.generate(chat['prompt'])
+            chat_cache.put(chat['question'], chat['bucket'], answer, used_model)
+        log_fields(model_version=used_model)
         
-        # Build prompt
-        prompt = f"""คุณเป็นที่ปรึกษาการเงินชื่อ "AI ที่ปรึกษาหนี้ FinLand"
+        return jsonify({
+            "success": True,
+            "answer": answer,
+            "model": used_model,
+            "cached": cached is not None,
+            "context": chat['context']
+        })
+        
+    except Exception as e:
+        log_exception(e)
+        return jsonify({"error": f"AI error: {str(e)}", "fallback": True}), 500
+
+
+def parse_chat_request(data):
+    """Validate an ai-chat body; returns (chat, None) or (None, {field: error})"""
+    data, errors = CHAT_REQUEST.validate(data or {})
+    if errors:
+        return None, errors
+    question, balance, apr = data['question'], data['balance'], data['apr']
+    payment, monthly_income = data['payment'], data['monthly_income']
+    
+    # Calculate metrics
+    monthly_rate = apr / 100 / 12
+    monthly_interest = balance * monthly_rate
+    dti_ratio = (payment / monthly_income * 100) if monthly_income > 0 else 0
+    months_to_payoff = calculate_payoff_months(balance, monthly_rate, payment)
+    
+    # Build prompt
+    prompt = f"""คุณเป็นที่ปรึกษาการเงินชื่อ "AI ที่ปรึกษาหนี้ FinLand"
 
 📊 ข้อมูลของผู้ใช้:
 - ยอดหนี้: {balance:,.0f} บาท
@@ -633,42 +1345,61 @@ def ai_chat():
 4. ใช้ emoji
 5. ถ้า DTI > 40% ให้เตือน 🚨"""
 
-        # Try models
-        models = ['gemini-2.0-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
-        answer = None
-        used_model = None
-        
-        for model_name in models:
-            try:
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                answer = response.text
-                used_model = model_name
-                break
-            except Exception:
-                continue
-        
-        if not answer:
-            raise Exception("All Gemini models failed")
-        
-        return jsonify({
-            "success": True,
-            "answer": answer,
-            "model": used_model,
-            "context": {
-                "balance": balance,
-                "apr": apr,
-                "payment": payment,
-                "monthly_interest": round(monthly_interest, 2),
-                "months_to_payoff": months_to_payoff,
-                "dti_ratio": round(dti_ratio, 2)
-            }
-        })
-        
+    return {
+        "question": question,
+        "prompt": prompt,
+        "stream": data['stream'],
+        "bucket": context_bucket(balance, apr, payment, monthly_income, dti_ratio),
+        "context": {
+            "balance": balance,
+            "apr": apr,
+            "payment": payment,
+            "monthly_interest": round(monthly_interest, 2),
+            "months_to_payoff": months_to_payoff,
+            "dti_ratio": round(dti_ratio, 2)
+        }
+    }, None
+
+
+def _sse(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+
+
+def _chat_event_stream(gemini, chat, cached):
+    """Events: `context` first, `token` per chunk, then `done` (or `error`)"""
+    try:
+        yield from _chat_events(gemini, chat, cached)
+    finally:
+        # Logged once the stream ends, so the duration covers the whole answer
+        if request_log is not None:
+            request_log.emit(request_event(200, stream=True))
+
+
+def _chat_events(gemini, chat, cached):
+    yield _sse('context', chat['context'])
+    
+    if cached:
+        answer, used_model = cached
+        log_fields(model_version=used_model)
+        yield _sse('token', {"text": answer})
+        yield _sse('done', {"success": True, "model": used_model, "cached": True})
+        return
+    
+    used_model = None
+    chunks = []
+    try:
+        for used_model, text in gemini.stream(chat['prompt']):
+            chunks.append(text)
+            yield _sse('token', {"text": text})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": f"AI error: {str(e)}", "fallback": True}), 500
+        log_exception(e)
+        yield _sse('error', {"error": f"AI error: {str(e)}", "fallback": True})
+        return
+    finally:
+        log_fields(model_version=used_model)
+    chat_cache.put(chat['question'], chat['bucket'], ''.join(chunks), used_model)
+    yield _sse('done', {"success": True, "model": used_model, "cached": False})
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -679,7 +1410,12 @@ if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     env = os.getenv('FLASK_ENV', 'development')
     
-    if env == 'production':
+    if env == 'production' and os.getenv('SERVER') == 'gunicorn':
+        # Preforking workers sharing one preloaded model (see gunicorn.conf.py)
+        print(f"🚀 Production server (gunicorn) on port {port}")
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'])
+    elif env == 'production':
         from waitress import serve
         print(f"🚀 Production server on port {port}")
         serve(app, host='0.0.0.0', port=port)
@@ -0,0 +1,229 @@
+"""
+FinLand ASGI Entry Point
+AI chat runs natively on the event loop with an async Gemini client, so slow
+LLM round-trips hold no threads; every other route is the Flask app, run in
+a bounded thread pool (ASGI_THREADS) that chat traffic cannot exhaust.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 2
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from a2wsgi import WSGIMiddleware
+from limits import parse
+
+import app as flask_app
+from llm import get_async_gemini_client
+from request_log import event
+
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 8))
+CHAT_PATH = '/api/ai-chat'
+CHAT_LIMIT = parse('20/minute')        # same counters as the Flask route's limit
+CHAT_MAX_BODY = 64 * 1024
+
+wsgi = WSGIMiddleware(flask_app.app, workers=ASGI_THREADS)
+metrics = flask_app.metrics
+_json = flask_app.app.json
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RESPONSES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _headers(scope, content_type, extra=None):
+    headers = dict(flask_app.SECURITY_HEADERS)
+    headers['Content-Type'] = content_type
+    headers['Vary'] = 'Origin'
+    origin = _header(scope, b'origin')
+    if origin in flask_app.ALLOWED_ORIGINS:
+        headers['Access-Control-Allow-Origin'] = origin
+    headers.update(extra or {})
+    return [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]
+
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+async def _send_json(scope, send, status, payload):
+    body = _json.dumps(payload).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': _headers(scope, 'application/json') + [(b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+    return status
+
+
+async def _read_body(receive):
+    """Request body, or None if it exceeds CHAT_MAX_BODY"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        size += len(message.get('body', b''))
+        if size > CHAT_MAX_BODY:
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# AI CHAT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _rate_limited(scope):
+    limiter = flask_app.limiter
+    if not (limiter.enabled and flask_app.app.config['RATELIMIT_ENABLED']):
+        return False
+    client = scope.get('client') or ('127.0.0.1', 0)
+    return not limiter.limiter.hit(CHAT_LIMIT, client[0], 'ai_chat')
+
+
+async def ai_chat(scope, receive, send, log):
+    """Async twin of app.ai_chat: same body, answers, cache and SSE events.
+    Request log fields (cache hit, model, error) are added to `log`."""
+    if _rate_limited(scope):
+        return await _send_json(scope, send, 429, {"error": "Rate limit exceeded: 20 per 1 minute"})
+
+    gemini = get_async_gemini_client()
+    if gemini is None:
+        return await _send_json(scope, send, 400, {"error": "Gemini API not configured", "fallback": True})
+
+    body = await _read_body(receive)
+    if body is None:
+        return await _send_json(scope, send, 413, {"error": "Request body too large"})
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        return await _send_json(scope, send, 400, {"error": "Invalid JSON body"})
+    if not isinstance(data, dict):
+        return await _send_json(scope, send, 400, {"error": "Invalid JSON body"})
+
+    chat, errors = flask_app.parse_chat_request(data)
+    if errors:
+        return await _send_json(scope, send, 400, flask_app.error_body(errors))
+
+    cached = flask_app.chat_cache.get(chat['question'], chat['bucket'])
+    log['cache_hit'] = cached is not None
+
+    if chat['stream'] or 'text/event-stream' in _header(scope, b'accept'):
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': _headers(scope, 'text/event-stream',
+                                        {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})})
+        log['stream'] = True
+        await _stream_until_disconnect(_chat_events(gemini, chat, cached, log), receive, send)
+        return 200
+
+    try:
+        if cached:
+            answer, used_model = cached
+        else:
+            with metrics.stage('ai_chat.generate'):
+                answer, used_model = await gemini.generate(chat['prompt'])
+            flask_app.chat_cache.put(chat['question'], chat['bucket'], answer, used_model)
+    except Exception as e:
+        log.update(error_class=type(e).__name__, error=str(e), traceback=e)
+        return await _send_json(scope, send, 500, {"error": f"AI error: {str(e)}", "fallback": True})
+
+    log['model_version'] = used_model
+    return await _send_json(scope, send, 200, {
+        "success": True,
+        "answer": answer,
+        "model": used_model,
+        "cached": cached is not None,
+        "context": chat['context']
+    })
+
+
+async def _chat_events(gemini, chat, cached, log):
+    """Same event sequence as app._chat_event_stream"""
+    yield flask_app._sse('context', chat['context'])
+
+    if cached:
+        answer, used_model = cached
+        log['model_version'] = used_model
+        yield flask_app._sse('token', {"text": answer})
+        yield flask_app._sse('done', {"success": True, "model": used_model, "cached": True})
+        return
+
+    used_model = None
+    chunks = []
+    try:
+        async for used_model, text in gemini.stream(chat['prompt']):
+            chunks.append(text)
+            yield flask_app._sse('token', {"text": text})
+    except Exception as e:
+        log.update(error_class=type(e).__name__, error=str(e), traceback=e)
+        yield flask_app._sse('error', {"error": f"AI error: {str(e)}", "fallback": True})
+        return
+    finally:
+        log['model_version'] = used_model
+    flask_app.chat_cache.put(chat['question'], chat['bucket'], ''.join(chunks), used_model)
+    yield flask_app._sse('done', {"success": True, "model": used_model, "cached": False})
+
+
+async def _stream_until_disconnect(events, receive, send):
+    """Forward events; stop the upstream Gemini stream if the client goes away"""
+    async def forward():
+        async for event in events:
+            await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    streaming = asyncio.ensure_future(forward())
+    watching = asyncio.ensure_future(disconnected())
+    try:
+        await asyncio.wait({streaming, watching}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watching.cancel()
+        if not streaming.done():
+            streaming.cancel()
+        await asyncio.gather(streaming, return_exceptions=True)
+        await events.aclose()
+    if not streaming.cancelled():
+        streaming.result()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# APPLICATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            gemini = get_async_gemini_client()
+            if gemini is not None:
+                await gemini.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] == 'http' and scope['path'] == CHAT_PATH and scope['method'] == 'POST':
+        start = time.perf_counter()
+        log = {}
+        status = await ai_chat(scope, receive, send, log)
+        seconds = time.perf_counter() - start
+        metrics.observe_request(CHAT_PATH, 'POST', status, seconds)
+        if flask_app.request_log is not None:
+            flask_app.request_log.emit(event(route=CHAT_PATH, method='POST', status=status,
+                                             duration_ms=round(seconds * 1000, 3), timings={},
+                                             **{"cache_hit": False, **log}))
+        return
+    # Preflight, calculators, model routes, metrics: the Flask app in the thread pool
+    return await wsgi(scope, receive, send)
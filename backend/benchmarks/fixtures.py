@@ -0,0 +1,51 @@
+"""
+Benchmark Fixtures
+A small advisor model package with the same structure as
+financial_advisor_model.pkl, trained in seconds on synthetic data.
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.preprocessing import RobustScaler
+
+N_FEATURES = 30
+N_REGRESSION_TARGETS = 16
+
+LABELS = {
+    'strategy_labels': {i: f"strategy-{i}" for i in range(6)},
+    'action_labels': {i: f"action-{i}" for i in range(8)},
+    'urgency_labels': {i: f"urgency-{i}" for i in range(5)},
+    'support_labels': {i: f"support-{i}" for i in range(6)},
+}
+
+
+def build_small_advisor(n_samples=2000, n_estimators=15, max_depth=8, seed=42):
+    """Model package dict accepted by app.ai_analyze (same estimator types and depth)"""
+    rng = np.random.default_rng(seed)
+    X = rng.lognormal(mean=2.0, sigma=1.5, size=(n_samples, N_FEATURES))
+    y_reg = X[:, :N_REGRESSION_TARGETS] * rng.uniform(0.5, 2.0, N_REGRESSION_TARGETS)
+
+    scaler = RobustScaler().fit(X)
+    X_scaled = scaler.transform(X)
+
+    params = {'n_estimators': n_estimators, 'max_depth': max_depth, 'random_state': seed, 'n_jobs': 1}
+    reg_model = MultiOutputRegressor(RandomForestRegressor(min_samples_split=50, **params))
+    reg_model.fit(X_scaled, y_reg)
+
+    def classifier(n_classes, column):
+        y = np.digitize(X[:, column], np.quantile(X[:, column], np.linspace(0, 1, n_classes + 1)[1:-1]))
+        return RandomForestClassifier(**params).fit(X_scaled, y)
+
+    return {
+        'regression_model': reg_model,
+        'strategy_model': classifier(6, 1),
+        'action_model': classifier(8, 5),
+        'urgency_model': classifier(5, 6),
+        'support_model': classifier(6, 7),
+        'better_model': classifier(2, 13),
+        'scaler': scaler,
+        'version': 'benchmark',
+        'training_samples': n_samples,
+        **LABELS,
+    }
@@ -0,0 +1,230 @@
+"""
+Backend Hot-Path Benchmarks
+Times the calculator helpers, the ai_analyze pipeline (with a small model
+trained on the fly; in the request thread and through a 2-process inference
+pool), both schedule endpoints at 12/120/600 months, the
+events engine on a 360-month mortgage and the cold `import app`.
+Results are written as JSON; with --baseline the run fails (exit 1) when a
+benchmark's best run is slower than the baseline's by more than --threshold.
+Baselines are machine-specific, so record one on the machine that compares.
+
+Usage:
+    python benchmarks/hot_paths.py --save-baseline       # on main
+    python benchmarks/hot_paths.py --baseline benchmarks/baseline.json
+    python benchmarks/hot_paths.py --filter schedule --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ.setdefault('RATELIMIT_STORAGE_URI', 'memory://')
+os.environ.setdefault('WARMUP', 'off')
+# Request logging stays on (it is part of every request), just not into the repo
+os.environ.setdefault('REQUEST_LOG', os.path.join(tempfile.gettempdir(), 'finland-bench-requests.jsonl'))
+
+import app as backend  # noqa: E402
+from benchmarks.fixtures import build_small_advisor  # noqa: E402
+from benchmarks.import_time import measure_import  # noqa: E402
+
+DEFAULT_RESULTS = os.path.join(BACKEND, 'benchmarks', 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(BACKEND, 'benchmarks', 'baseline.json')
+SCHEDULE_MONTHS = (12, 120, 600)
+
+ANALYZE_INPUT = {
+    "loan_amount": 250000, "interest_rate": 16, "term_months": 48, "monthly_income": 32000,
+    "monthly_expenses": 15000, "emergency_months": 2, "age": 29, "current_savings": 40000
+}
+
+
+# 360-month mortgage: 2-year holiday, yearly step-up rates, lump sums every 18 months
+LOAN_EVENTS_INPUT = {
+    "loan_amount": 3000000, "interest_rate": 2.9, "term_months": 360, "schedule_format": "columnar",
+    "events": [{"month": 1, "type": "payment_holiday", "months": 24}]
+    + [{"month": m, "type": "rate_change", "rate": 2.9 + m / 120} for m in range(25, 361, 12)]
+    + [{"month": m, "type": "extra_payment", "amount": 50000} for m in range(30, 361, 18)]
+}
+
+# 10 debts x 50 offers: 1,023 debt subsets per offer
+REFINANCE_INPUT = {
+    "debts": [{"balance": 20000 + 15000 * i, "apr": (6, 16, 18, 25, 28)[i % 5], "term_months": 12 + 6 * i}
+              for i in range(10)],
+    "offers": [{"name": f"offer-{i}", "rate": 3 + i * 0.25, "term_months": (24, 36, 48, 60, 84)[i % 5],
+                "fee": 1000 * (i % 3), "fee_percent": i % 2, "max_amount": 500000 + 20000 * i}
+               for i in range(50)],
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCHMARKS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _credit_card_payment(months, balance=100000, apr=6):
+    """Monthly payment that pays `balance` off in about `months` months
+
+    The APR is low enough that a 600-month payoff still clears the 1.01x
+    minimum-payment check.
+    """
+    return round(backend.calculate_monthly_payment(balance, apr, months) + 0.005, 2)
+
+
+_pool = None
+
+
+def _inference_pool():
+    """2-process InferencePool over the benchmark model, started on first use"""
+    global _pool
+    if _pool is None:
+        import joblib
+        from inference import InferencePool
+
+        path = os.path.join(tempfile.gettempdir(), 'finland-bench-model.pkl')
+        joblib.dump(backend._financial_advisor, path)
+        _pool = InferencePool(path, advisor=backend._financial_advisor, workers=2)
+    return _pool
+
+
+def _pooled_analyze(client, body):
+    """ai-analyze as served with INFERENCE_WORKERS=2"""
+    backend._inference_pool = _inference_pool()
+    try:
+        return client.post('/api/ai-analyze', json=body)
+    finally:
+        backend._inference_pool = None
+
+
+def collect_benchmarks(client):
+    """name -> zero-argument callable"""
+    benchmarks = {
+        'calculate_monthly_payment': lambda: backend.calculate_monthly_payment(300000, 6.5, 84),
+        'calculate_payoff_months': lambda: backend.calculate_payoff_months(100000, 0.015, 2500),
+        '_calculate_smart_boost': lambda: backend._calculate_smart_boost(250000, 16 / 1200, 7000, 32000, 48),
+        '_build_features': lambda: backend._build_features(
+            250000, 16, 48, 32000, 7000, 21.9, 15000, 2, 29, 70, 80, 36, 40000),
+        'ai_analyze': lambda: client.post('/api/ai-analyze', json=ANALYZE_INPUT),
+        'ai_analyze.no_intervals': lambda: client.post('/api/ai-analyze', json={**ANALYZE_INPUT, 'intervals': False}),
+        'ai_analyze.explain': lambda: client.post('/api/ai-analyze', json={**ANALYZE_INPUT, 'explain': True}),
+        'ai_analyze.pool': lambda: _pooled_analyze(client, ANALYZE_INPUT),
+        'ai_analyze.pool.no_intervals': lambda: _pooled_analyze(client, {**ANALYZE_INPUT, 'intervals': False}),
+    }
+    for months in SCHEDULE_MONTHS:
+        card = {"balance": 100000, "apr": 6, "monthly_payment": _credit_card_payment(months)}
+        loan = {"loan_amount": 300000, "interest_rate": 1, "term_months": months}
+        benchmarks[f'schedule.credit_card.{months}'] = (
+            lambda card=card: client.post('/api/calculate/credit-card', json=card))
+        benchmarks[f'schedule.student_loan.{months}'] = (
+            lambda loan=loan: client.post('/api/calculate/student-loan', json=loan))
+    benchmarks['schedule.loan_events.360'] = (
+        lambda: client.post('/api/calculate/loan-schedule', json=LOAN_EVENTS_INPUT))
+    benchmarks['refinance.10x50'] = lambda: client.post('/api/calculate/refinance', json=REFINANCE_INPUT)
+    # Request validation alone (compiled schemas, no calculation)
+    benchmarks['validate.ai_analyze'] = lambda: backend.ANALYZE_REQUEST.validate(ANALYZE_INPUT)
+    benchmarks['validate.refinance.10x50'] = lambda: backend.REFINANCE_REQUEST.validate(REFINANCE_INPUT)
+    return benchmarks
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Median seconds per call over `repeat` runs of at least `min_time` each"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"median_s": statistics.median(runs), "min_s": min(runs), "calls_per_run": number}
+
+
+def run(selected=None, repeat=5, min_time=0.2):
+    backend.limiter.enabled = False
+    backend._financial_advisor = build_small_advisor()
+    backend._advisor_loaded = True
+    client = backend.app.test_client()
+
+    results = {}
+    for name, fn in collect_benchmarks(client).items():
+        if selected and selected not in name:
+            continue
+        response = fn()
+        if hasattr(response, 'status_code') and response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}")
+        results[name] = measure(fn, repeat, min_time)
+        print(f"  {name:32} {results[name]['median_s'] * 1e6:12.1f} µs")
+
+    # Cold boot (fresh interpreter per run); see benchmarks/import_time.py for the breakdown
+    if not selected or selected in 'import_app':
+        results['import_app'] = measure_import('app', repeat)
+        print(f"  {'import_app':32} {results['import_app']['median_s'] * 1e6:12.1f} µs")
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BASELINE COMPARISON
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def compare(results, baseline, threshold):
+    """Return the names of benchmarks slower than baseline by more than `threshold`
+
+    Compares best runs: the minimum is far less sensitive to noisy neighbours.
+    """
+    regressions = []
+    print(f"\n{'benchmark (best run)':32} | {'baseline µs':>12} | {'now µs':>12} | change")
+    print("-" * 75)
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            print(f"{name:32} | {'-':>12} | {result['median_s'] * 1e6:12.1f} | new")
+            continue
+        change = result['min_s'] / before['min_s'] - 1
+        flag = '  ❌ REGRESSION' if change > threshold else ''
+        print(f"{name:32} | {before['min_s'] * 1e6:12.1f} | {result['min_s'] * 1e6:12.1f} | {change:+7.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument('--output', default=DEFAULT_RESULTS)
+    parser.add_argument('--baseline', help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help=f"also write {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+
+    print("⏱️  Backend hot-path benchmarks")
+    payload = {
+        "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": run(args.filter, args.repeat, args.min_time),
+    }
+    _write(args.output, payload)
+    print(f"\n💾 Results: {args.output}")
+    if args.save_baseline:
+        _write(DEFAULT_BASELINE, payload)
+        print(f"💾 Baseline: {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(payload['results'], json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Import-Time Report
+Runs `python -X importtime -c "import app"` in fresh interpreters (warm-up
+off) and summarizes total boot import time and the slowest packages. Fails
+if numpy/sklearn/Gemini land on the calculator-only boot path again.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--top 15] [--module app]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must stay lazy: loaded on first use (model, LLM, schedule math) or by the background warm-up
+LAZY_MODULES = ('numpy', 'sklearn', 'joblib', 'google.generativeai')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def import_profile(module='app'):
+    """One cold import: {module: (self µs, cumulative µs, depth)} in import order"""
+    env = dict(os.environ, WARMUP='off', RATELIMIT_STORAGE_URI='memory://')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            profile[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return profile
+
+
+def measure_import(module='app', runs=5):
+    """Cold import time of `module` in the hot_paths result format"""
+    times = sorted(import_profile(module)[module][1] / 1e6 for _ in range(runs))
+    return {"median_s": times[len(times) // 2], "min_s": times[0], "calls_per_run": 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    best = min(profiles, key=lambda p: p[args.module][1])
+
+    print(f"📦 import {args.module}: best {best[args.module][1] / 1000:.1f} ms of {args.runs} cold runs")
+    print(f"\n{'top-level package':40} | {'cumulative ms':>13}")
+    print("-" * 58)
+    top_level = [(name, cum) for name, (_, cum, depth) in best.items() if depth == 1]
+    for name, cumulative in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+        print(f"{name:40} | {cumulative / 1000:>13.1f}")
+
+    eager = [name for name in LAZY_MODULES if name in best]
+    if eager:
+        print(f"\n❌ Imported at boot but should be lazy: {', '.join(eager)}")
+        sys.exit(1)
+    print(f"\n✅ Lazy at boot: {', '.join(LAZY_MODULES)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+LLM Fallback Timing Benchmark
+Measures /api/ai-chat model fallback latency against the local stub server.
+
+Usage:
+    python benchmarks/llm_fallback.py [--slow 3.0] [--runs 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm import GeminiClient, LLMUnavailable  # noqa: E402
+from tools.stub_llm import StubConfig, start_stub_server  # noqa: E402
+
+MODELS = ['gemini-2.0-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
+
+
+def run_scenario(url, runs, **client_kwargs):
+    """Return per-call latencies (ms) and the model that answered"""
+    client = GeminiClient('stub', models=MODELS, api_endpoint=url, **client_kwargs)
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            _, model = client.generate("benchmark")
+        except LLMUnavailable:
+            model = 'FAILED'
+        results.append(((time.perf_counter() - start) * 1000, model))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--slow', type=float, default=3.0, help="latency of the hanging primary model (s)")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    # Primary hangs, second model is down, third answers quickly
+    config = StubConfig({MODELS[0]: args.slow, MODELS[2]: 0.05}, {MODELS[1]})
+    server, url = start_stub_server(config)
+
+    scenarios = [
+        ("sequential, no timeout", dict(attempt_timeout=args.slow * 2, deadline=args.slow * 4)),
+        ("timeout 1s", dict(attempt_timeout=1.0, deadline=args.slow * 4)),
+        ("timeout 1s + breaker", dict(attempt_timeout=1.0, deadline=args.slow * 4, breaker_threshold=1)),
+        ("hedge after 0.3s", dict(attempt_timeout=args.slow * 2, deadline=args.slow * 4, hedge_after=0.3)),
+    ]
+
+    print(f"{'scenario':28} | {'call':>4} | {'latency ms':>10} | model")
+    print("-" * 70)
+    for name, kwargs in scenarios:
+        for i, (ms, model) in enumerate(run_scenario(url, args.runs, **kwargs), 1):
+            print(f"{name:28} | {i:>4} | {ms:>10.1f} | {model}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+FinLand AI Chat Answer Cache
+Reuses Gemini answers for repeated questions asked with similar numbers.
+
+By default only the same question (after normalization) hits. Paraphrase
+matching is opt-in: character n-grams score "car loan" and "home loan", or a
+question and its negation, well above 0.85, so a near match also has to
+agree on negation, the numbers asked about and every financial topic named.
+"""
+
+import math
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r'\s+')
+_THAI_PARTICLES = re.compile(r'(?:\s*(?:ครับ|คับ|ค่ะ|คะ|จ้ะ|จ้า|นะ))+$')
+
+VECTOR_DIMENSIONS = 1024
+
+# Matched on normalized text (punctuation is already a space: "don't" -> "don t").
+# Thai has no word breaks, so Thai terms match as substrings.
+_NEGATION = re.compile(r'\b(?:no|not|never|cannot|without|\w+n t)\b|ไม่|อย่า|ห้าม')
+_NUMBER = re.compile(r'\d+')
+_TOPICS = tuple((name, re.compile(pattern)) for name, pattern in (
+    ('card', r'\bcards?\b|บัตร'),
+    ('loan', r'\b(?:loans?|borrow\w*|lend\w*)\b|สินเชื่อ|กู้'),
+    ('car', r'\b(?:cars?|auto|vehicles?)\b|รถ'),
+    ('home', r'\b(?:homes?|houses?|mortgages?|condos?)\b|บ้าน|คอนโด'),
+    ('student', r'\b(?:students?|tuition)\b|กยศ|การศึกษา'),
+    ('save', r'\b(?:save|saving|savings)\b|ออม|เก็บเงิน'),
+    ('pay', r'\b(?:pay|paying|payments?|repay\w*)\b|จ่าย|ผ่อน|ชำระ'),
+    ('month', r'\b(?:months?|monthly)\b|เดือน'),
+    ('interest', r'\b(?:interest|rates?|apr)\b|ดอกเบี้ย'),
+    ('refinance', r'\brefinanc\w*|รีไฟแนนซ์'),
+    ('consolidate', r'\bconsolidat\w*|รวมหนี้'),
+    ('invest', r'\b(?:invest\w*|stocks?|funds?)\b|ลงทุน|หุ้น|กองทุน'),
+    ('emergency', r'\bemergenc\w*|ฉุกเฉิน'),
+    ('minimum', r'\bminimum\b|ขั้นต่ำ'),
+    ('budget', r'\bbudget\w*|งบ'),
+))
+
+
+def normalize_question(question):
+    """Lowercase, drop punctuation/emoji, trailing Thai polite particles and extra whitespace"""
+    text = unicodedata.normalize('NFC', question).lower()
+    # Category-based so Thai vowel/tone marks (Mn) survive
+    text = ''.join(' ' if unicodedata.category(ch)[0] in 'PS' else ch for ch in text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _THAI_PARTICLES.sub('', text)
+
+
+def _log_bucket(value, step=1.15):
+    """Geometric bucket: values within ~15% of each other usually share one"""
+    if value <= 0:
+        return 0
+    return int(round(math.log(value) / math.log(step)))
+
+
+def context_bucket(balance, apr, payment, monthly_income, dti_ratio):
+    """Coarse numeric context an answer is still valid for"""
+    return (
+        _log_bucket(balance),
+        int(round(apr)),
+        _log_bucket(payment),
+        _log_bucket(monthly_income),
+        int(dti_ratio // 5),
+    )
+
+
+def vectorize(text):
+    """Hashed character n-gram vector (offline, no tokenizer needed for Thai)"""
+    padded = f" {text} "
+    counts = {}
+    for n in (2, 3):
+        for i in range(len(padded) - n + 1):
+            index = zlib.crc32(padded[i:i + n].encode('utf-8')) % VECTOR_DIMENSIONS
+            counts[index] = counts.get(index, 0) + 1
+    norm = math.sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {index: c / norm for index, c in counts.items()}
+
+
+def question_signature(normalized):
+    """What two questions must share before one may reuse the other's answer:
+    negation, the numbers in them and the financial topics they name"""
+    return (
+        _NEGATION.search(normalized) is not None,
+        frozenset(_NUMBER.findall(normalized)),
+        frozenset(name for name, pattern in _TOPICS if pattern.search(normalized)),
+    )
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
+
+
+class AnswerCache:
+    """TTL + LRU bounded cache keyed on (normalized question, context bucket).
+
+    With `similarity` > 0 (opt-in; 0.95 or higher), a miss on the exact key
+    falls back to the most similar cached question within the same context
+    bucket that has the same question_signature().
+    """
+
+    def __init__(self, max_entries=1000, ttl=21600, similarity=0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (expires_at, answer, model, (vector, signature))
+        self._by_bucket = {}            # bucket -> set of keys
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._by_bucket.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_bucket[key[1]]
+
+    def get(self, question, bucket):
+        """Return (answer, model) or None"""
+        if not self.enabled:
+            return None
+
+        normalized = normalize_question(question)
+        key = (normalized, bucket)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                self._remove(key)
+
+            if self.similarity > 0 and bucket in self._by_bucket:
+                vector, signature = vectorize(normalized), question_signature(normalized)
+                best_key, best_score = None, self.similarity
+                for candidate in list(self._by_bucket[bucket]):
+                    expires_at, _, _, (candidate_vector, candidate_signature) = self._entries[candidate]
+                    if expires_at <= now:
+                        self._remove(candidate)
+                        continue
+                    if candidate_signature != signature:
+                        continue
+                    score = cosine(vector, candidate_vector)
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    entry = self._entries[best_key]
+                    return entry[1], entry[2]
+
+            self.misses += 1
+            return None
+
+    def put(self, question, bucket, answer, model):
+        if not self.enabled or not answer:
+            return
+
+        normalized = normalize_question(question)
+        key = (normalized, bucket)
+        shape = (vectorize(normalized), question_signature(normalized)) if self.similarity > 0 else None
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, answer, model, shape)
+            self._by_bucket.setdefault(bucket, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self):
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0.0,
+        }
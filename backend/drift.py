@@ -0,0 +1,100 @@
+"""
+FinLand Input Drift
+Streaming histograms of the ai-analyze feature vector, compared against the
+training distribution saved in the model package.
+
+ReferenceSketch fixes per-feature bins at training quantiles and records the
+training share of each bin. DriftMonitor counts served rows into the same
+bins: constant memory, one vectorized comparison per row, and per-thread
+counters so request threads never wait on each other. Scores (PSI and a
+binned Kolmogorov-Smirnov distance) are only computed when asked for.
+Features the server builds differently from training can be excluded: they
+would always read as drifted.
+"""
+
+import threading
+
+import numpy as np
+
+# Population stability index bands (the usual 0.1 / 0.25 rule of thumb)
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+class ReferenceSketch:
+    """Training-time bin edges and bin shares per feature"""
+
+    def __init__(self, X, feature_names, bins=20):
+        X = np.asarray(X, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        # Interior edges at training quantiles, (n_features, bins - 1)
+        self.edges = np.quantile(X, np.linspace(0, 1, bins + 1)[1:-1], axis=0).T
+        self.proportions = self.counts(X) / len(X)
+
+    @property
+    def shape(self):
+        return self.edges.shape[0], self.edges.shape[1] + 1
+
+    def bin_index(self, X):
+        """(n_rows, n_features) bin of every value: how many edges lie below it"""
+        return (np.asarray(X, dtype=np.float64)[:, :, None] > self.edges).sum(axis=2)
+
+    def counts(self, X):
+        """(n_features, bins) counts for a large batch, one feature at a time"""
+        n_features, bins = self.shape
+        return np.stack([np.bincount(np.searchsorted(self.edges[f], X[:, f], side='left'), minlength=bins)
+                         for f in range(n_features)])
+
+
+class DriftMonitor:
+    """Served-row histograms in the reference's bins, one counter array per thread"""
+
+    def __init__(self, reference, exclude=()):
+        self.reference = reference
+        self.monitored = [f for f in range(reference.shape[0]) if f not in set(exclude)]
+        self._features = np.arange(reference.shape[0])
+        self._local = threading.local()
+        self._counters = []
+        self._lock = threading.Lock()   # only taken when a thread records its first row
+
+    def update(self, features):
+        """Count (n_rows, n_features) served feature rows"""
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = np.zeros(self.reference.shape, dtype=np.int64)
+            with self._lock:
+                self._counters.append(counts)
+        for bins in self.reference.bin_index(features):
+            counts[self._features, bins] += 1
+
+    def counts(self):
+        with self._lock:
+            counters = list(self._counters)
+        return sum(counters) if counters else np.zeros(self.reference.shape, dtype=np.int64)
+
+    def scores(self):
+        """{samples, max_psi, drifted, features: {name: {psi, ks, status}}} since startup"""
+        counts = self.counts()
+        samples = int(counts[0].sum())
+        if not samples:
+            return {"samples": 0, "max_psi": 0.0, "drifted": [], "features": {}}
+
+        observed = counts[self.monitored] / samples
+        expected = self.reference.proportions[self.monitored]
+        # Empty bins would make PSI infinite; a small floor keeps it comparable
+        o, e = np.maximum(observed, 1e-4), np.maximum(expected, 1e-4)
+        psi = ((o - e) * np.log(o / e)).sum(axis=1)
+        ks = np.abs(np.cumsum(observed, axis=1) - np.cumsum(expected, axis=1)).max(axis=1)
+
+        features = {}
+        names = [self.reference.feature_names[f] for f in self.monitored]
+        for name, feature_psi, feature_ks in zip(names, psi.tolist(), ks.tolist()):
+            status = ('significant' if feature_psi >= PSI_SIGNIFICANT
+                      else 'moderate' if feature_psi >= PSI_MODERATE else 'stable')
+            features[name] = {"psi": round(feature_psi, 4), "ks": round(feature_ks, 4), "status": status}
+        return {
+            "samples": samples,
+            "max_psi": round(float(psi.max()), 4),
+            "drifted": [name for name, score in features.items() if score["status"] == 'significant'],
+            "features": features,
+        }
@@ -0,0 +1,162 @@
+"""
+FinLand Packed Forests
+Every tree of a fitted sklearn forest flattened into shared node arrays, so
+all trees are evaluated for a batch of rows in one vectorized traversal
+(max_depth steps over an (n_rows, n_trees) array of node ids) instead of one
+Python-level predict() per tree.
+
+Leaves point back to themselves, so rows that reach a leaf early simply stay
+there for the remaining steps.
+"""
+
+import numpy as np
+
+
+class PackedForest:
+    """Flat node arrays for a list of fitted sklearn trees (DecisionTree*.tree_)"""
+
+    def __init__(self, trees):
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            n = tree.node_count
+            leaf = tree.children_left == -1
+            ids = np.arange(offset, offset + n)
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(np.where(leaf, np.inf, tree.threshold))
+            left.append(np.where(leaf, ids, tree.children_left + offset))
+            right.append(np.where(leaf, ids, tree.children_right + offset))
+            value.append(tree.value.reshape(n, -1))
+            roots.append(offset)
+            offset += n
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        # Trees with fewer outputs (regressors next to classifiers) are zero-padded
+        width = max(v.shape[1] for v in value)
+        self.value = np.concatenate([np.pad(v, ((0, 0), (0, width - v.shape[1]))) for v in value])
+        self.roots = np.array(roots, dtype=np.intp)
+        self.depth = max(tree.max_depth for tree in trees)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """(n_rows, n_trees) leaf node id of every row in every tree"""
+        return self.paths(X)[-1]
+
+    def paths(self, X):
+        """Node ids after each of `depth` steps: depth + 1 arrays of (n_rows, n_trees)"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        steps = [node]
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+            steps.append(node)
+        return steps
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REGRESSION (MultiOutputRegressor of RandomForestRegressors)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class RegressionForest:
+    """Per-tree predictions for every target of the advisor's regression model"""
+
+    def __init__(self, model):
+        forests = model.estimators_
+        self.n_targets = len(forests)
+        self.n_trees = len(forests[0].estimators_)
+        if any(len(forest.estimators_) != self.n_trees for forest in forests):
+            raise ValueError("every target's forest needs the same number of trees")
+        self.packed = PackedForest([tree.tree_ for forest in forests for tree in forest.estimators_])
+
+    def per_tree(self, X):
+        """(n_rows, n_targets, n_trees_per_target) predictions"""
+        leaves = self.packed.apply(X)
+        return self.packed.value[leaves, 0].reshape(len(leaves), self.n_targets, self.n_trees)
+
+    def predict_interval(self, X, level=0.8):
+        """(mean, low, high), each (n_rows, n_targets): the forests' point estimate
+        and the central `level` quantile range of their trees' predictions"""
+        predictions = self.per_tree(X)
+        low, high = self.quantile_range(predictions, level)
+        return predictions.mean(axis=2), low, high
+
+    @staticmethod
+    def quantile_range(predictions, level):
+        """(low, high) central `level` range of per_tree() predictions"""
+        tail = (1 - level) / 2
+        return np.quantile(predictions, [tail, 1 - tail], axis=2)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPLANATIONS (path contributions)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def advisor_forests(advisor):
+    """(output, forest) for every advisor forest: one per regression target, then the classifiers"""
+    from inference import OUTPUT_MODELS
+
+    forests = [(('regression_model', i), forest) for i, forest in enumerate(advisor['regression_model'].estimators_)]
+    return forests + [((name, None), advisor[name]) for name in OUTPUT_MODELS[1:]]
+
+
+class ForestExplainer:
+    """Per-feature contributions to every advisor output from one traversal of all trees.
+
+    Each node stores its expectation: the mean training target (regressors) or
+    class distribution (classifiers) of the rows that reached it. A prediction
+    is the root expectation plus, for every split on the row's path, the change
+    in expectation credited to the split's feature; averaged over each forest's
+    trees this adds up exactly to the forest's prediction (or probabilities).
+    Built at training time and stored in the model package.
+    """
+
+    def __init__(self, forests, n_features):
+        self.outputs = [output for output, _ in forests]
+        self.classes = [getattr(forest, 'classes_', None) for _, forest in forests]
+        trees = [tree.tree_ for _, forest in forests for tree in forest.estimators_]
+        self.packed = PackedForest(trees)
+        self.n_features = n_features
+
+        sizes = np.array([len(forest.estimators_) for _, forest in forests])
+        self.group = np.repeat(np.arange(len(forests)), sizes)
+        self.tree_weight = 1.0 / sizes[self.group]
+
+        # Node expectations: class counts (older sklearn) or fractions -> distributions
+        expectation = self.packed.value
+        for tree, (start, classes) in enumerate(zip(self.packed.roots, [self.classes[g] for g in self.group])):
+            if classes is not None:
+                nodes = slice(start, start + trees[tree].node_count)
+                expectation[nodes] /= expectation[nodes].sum(axis=1, keepdims=True)
+        self.expectation = expectation
+
+        # Root expectations averaged per forest: (n_outputs, width)
+        roots = expectation[self.packed.roots] * self.tree_weight[:, None]
+        self.bias = np.stack([roots[self.group == g].sum(axis=0) for g in range(len(forests))])
+
+    def explain(self, X):
+        """(bias (n_outputs, width), contributions (n_rows, n_outputs, n_features, width))"""
+        steps = self.packed.paths(X)
+        n_rows = len(steps[0])
+        n_outputs, width = self.bias.shape
+        rows = np.arange(n_rows)[:, None]
+
+        # Every step credits expectation[child] - expectation[parent] to the parent's
+        # split feature (zero once a row sits on its leaf)
+        index, delta = [], []
+        for parent, child in zip(steps, steps[1:]):
+            index.append(((rows * n_outputs + self.group) * self.n_features + self.packed.feature[parent]).ravel())
+            delta.append(((self.expectation[child] - self.expectation[parent]) * self.tree_weight[:, None]).reshape(-1, width))
+        index, delta = np.concatenate(index), np.concatenate(delta)
+
+        size = n_rows * n_outputs * self.n_features
+        contributions = np.stack([np.bincount(index, weights=delta[:, w], minlength=size) for w in range(width)], axis=1)
+        return self.bias, contributions.reshape(n_rows, n_outputs, self.n_features, width)
@@ -0,0 +1,50 @@
+"""
+FinLand Gunicorn Configuration
+Preforking production server: the advisor model is loaded once in the
+master, frozen with gc.freeze() and shared copy-on-write by every worker.
+
+    gunicorn -c gunicorn.conf.py app:app
+    SERVER=gunicorn FLASK_ENV=production python app.py
+"""
+
+import os
+import tempfile
+import threading
+
+# The master must not start the background warm-up thread: it would be lost
+# at fork, possibly while holding the model loader's lock
+os.environ.setdefault('WARMUP', 'off')
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+preload_app = True
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+pidfile = os.getenv('GUNICORN_PIDFILE', os.path.join(tempfile.gettempdir(), 'finland-gunicorn.pid'))
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before the first fork"""
+    import app
+    app.preload_for_fork()
+
+
+def post_worker_init(worker):
+    """Per-worker setup that must not be inherited across fork"""
+    import app
+    from metrics import process_memory
+
+    # The Gemini SDK (gRPC) is not fork-safe and the inference pool's processes
+    # belong to one worker: create both in each worker
+    threading.Thread(target=app.get_gemini_client, name='warm-up', daemon=True).start()
+    threading.Thread(target=app.get_inference_pool, name='warm-up-pool', daemon=True).start()
+    if os.getenv('PROFILER_SIGNAL'):
+        app.profiler.install_signal_handler(os.getenv('PROFILER_SIGNAL'))
+
+    memory = process_memory()
+    if memory:
+        worker.log.info("🧠 worker %s: %.0f MB shared, %.0f MB private",
+                        worker.pid, memory['shared'] / 2**20, memory['private'] / 2**20)
@@ -0,0 +1,201 @@
+"""
+FinLand Inference Pool
+Runs advisor predictions in worker processes so concurrent analyses use
+every core instead of queueing behind one GIL.
+
+Requests are queued (bounded: a full queue raises InferenceBusy instead of
+piling up threads), coalesced into micro-batches by a dispatcher thread and
+scored by processes that each memory-map an uncompressed copy of the model.
+A row's prediction interval is computed there too, from the same traversal
+of the regression trees, so the request thread never walks a forest.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+# Model package keys in the order predict_outputs() returns them
+OUTPUT_MODELS = ('regression_model', 'strategy_model', 'action_model',
+                 'urgency_model', 'support_model', 'better_model')
+
+
+class InferenceBusy(Exception):
+    """Raised when the inference queue is full or a row isn't scored in time (caller should shed load)"""
+
+
+def predict_outputs(advisor, features_scaled):
+    """All advisor outputs for a batch of scaled feature rows, in OUTPUT_MODELS order"""
+    return tuple(advisor[name].predict(features_scaled) for name in OUTPUT_MODELS)
+
+
+def predict_with_intervals(advisor, forest, features_scaled, levels):
+    """(outputs like predict_outputs(), low, high) from one traversal of the regression trees.
+
+    The regression output is the mean of `forest`'s (a forest.RegressionForest)
+    per-tree predictions, which is what the forests' predict() computes; row
+    i's interval is their central `levels[i]` range (NaN where levels[i] is None).
+    """
+    import numpy as np
+
+    predictions = forest.per_tree(features_scaled)
+    outputs = (predictions.mean(axis=2),) + tuple(
+        advisor[name].predict(features_scaled) for name in OUTPUT_MODELS[1:])
+    low, high = np.full((2,) + predictions.shape[:2], np.nan)
+    for level in set(levels) - {None}:
+        rows = [row for row, row_level in enumerate(levels) if row_level == level]
+        low[rows], high[rows] = forest.quantile_range(predictions[rows], level)
+    return outputs, low, high
+
+
+def mmap_artifact(model_path, advisor=None):
+    """Uncompressed copy of a joblib model that joblib.load(mmap_mode='r') can map.
+
+    The copy lives in the temp dir keyed by the source's path, size and mtime,
+    so it is written once per model version and shared by every process.
+    """
+    import joblib
+
+    stat = os.stat(model_path)
+    key = hashlib.blake2b(f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode(),
+                          digest_size=8).hexdigest()
+    path = os.path.join(tempfile.gettempdir(), f"finland-model-{key}.mmap.pkl")
+    if not os.path.exists(path):
+        partial = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(advisor if advisor is not None else joblib.load(model_path), partial)
+        os.replace(partial, path)
+    return path
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WORKER PROCESS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_worker_advisor = None
+_worker_forest = None
+
+
+def _init_worker(artifact_path):
+    global _worker_advisor, _worker_forest
+    import joblib
+    from forest import RegressionForest
+
+    _worker_advisor = joblib.load(artifact_path, mmap_mode='r')
+    _worker_forest = RegressionForest(_worker_advisor['regression_model'])
+    # Parallelism comes from the pool; per-forest joblib threads only add overhead
+    for name in OUTPUT_MODELS:
+        model = _worker_advisor[name]
+        for estimator in [model] + list(getattr(model, 'estimators_', [])):
+            if hasattr(estimator, 'n_jobs'):
+                estimator.n_jobs = 1
+
+
+def _predict_batch(features, levels):
+    scaled = _worker_advisor['scaler'].transform(features)
+    return predict_with_intervals(_worker_advisor, _worker_forest, scaled, levels)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# POOL
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class InferencePool:
+    """Bounded queue → micro-batches → ProcessPoolExecutor"""
+
+    def __init__(self, model_path, advisor=None, workers=2, max_queue=64, batch_size=32, batch_wait=0.002,
+                 timeout=10.0):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+        self.rejected = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # At most two batches per process: one running, one ready to go
+        self._slots = threading.Semaphore(workers * 2)
+        # forkserver/spawn: forking a threaded server process is not safe. The
+        # fork server preloads only this module, not the server's __main__
+        if os.name == 'posix':
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['inference'])
+        else:
+            context = multiprocessing.get_context('spawn')
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context,
+            initializer=_init_worker, initargs=(mmap_artifact(model_path, advisor),)
+        )
+        threading.Thread(target=self._dispatch, name='inference-dispatch', daemon=True).start()
+
+    def predict(self, features, interval_level=None):
+        """(outputs, low, high) for one (1, n_features) row, as predict_with_intervals()
+        returns them: the interval is computed in the worker, from the same traversal"""
+        future = Future()
+        try:
+            self._queue.put_nowait((features, interval_level, future))
+        except queue.Full:
+            self._reject()
+            raise InferenceBusy("Inference queue is full")
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            # Still queued: the dispatcher drops it instead of scoring it for nobody
+            future.cancel()
+            self._reject()
+            raise InferenceBusy(f"Inference took longer than {self.timeout:g}s") from None
+
+    def _reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def depth(self):
+        """Rows waiting for a worker plus rows being scored"""
+        return self._queue.qsize() + self._in_flight
+
+    def _dispatch(self):
+        import numpy as np
+
+        while True:
+            batch = [self._queue.get()]
+            self._slots.acquire()
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.batch_wait))
+            except queue.Empty:
+                pass
+            # Running futures can no longer be cancelled by a timed-out request
+            batch = [row for row in batch if row[2].set_running_or_notify_cancel()]
+            if not batch:
+                self._slots.release()
+                continue
+
+            with self._lock:
+                self._in_flight += len(batch)
+            try:
+                job = self._executor.submit(_predict_batch, np.vstack([features for features, _, _ in batch]),
+                                            [level for _, level, _ in batch])
+            except Exception as e:
+                self._finish(batch, None, e)
+                continue
+            job.add_done_callback(lambda job, batch=batch: self._finish(batch, job, None))
+
+    def _finish(self, batch, job, error):
+        with self._lock:
+            self._in_flight -= len(batch)
+        self._slots.release()
+        if error is None:
+            error = job.exception()
+        if error is None:
+            outputs, low, high = job.result()
+        for row, (_, _, future) in enumerate(batch):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((tuple(output[row:row + 1] for output in outputs),
+                                   low[row:row + 1], high[row:row + 1]))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
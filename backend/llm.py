@@ -0,0 +1,498 @@
+"""
+FinLand Gemini Client
+Process-wide model cache with bounded-latency fallbacks
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_MODELS = 'gemini-2.0-flash,gemini-1.5-flash,gemini-1.5-pro,gemini-pro'
+DEFAULT_ENDPOINT = 'https://generativelanguage.googleapis.com'
+
+
+class LLMUnavailable(Exception):
+    """Raised when no Gemini model produced an answer in time"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CircuitBreaker:
+    """Skip a model for `cooldown` seconds after `threshold` consecutive failures,
+    then let a single trial call through (half-open) to decide whether to close"""
+
+    def __init__(self, threshold=2, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Closed, or open long enough with no trial in flight (the caller becomes the trial)"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def release(self):
+        """The trial ended without an outcome (a cancelled hedge): the next caller may probe"""
+        with self._lock:
+            self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.probing or time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLIENT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class GeminiClient:
+    """Configured once per process; tries models in order under a deadline.
+
+    Each attempt gets its own timeout, models with an open circuit breaker are
+    skipped, and when `hedge_after` is set the next model is started in
+    parallel if the current one has not answered within that many seconds.
+    """
+
+    def __init__(self, api_key, models=None, attempt_timeout=15.0, deadline=30.0,
+                 hedge_after=0.0, breaker_threshold=2, breaker_cooldown=60.0,
+                 api_endpoint=None):
+        import google.generativeai as genai
+
+        if api_endpoint:
+            # Local stub server (see tools/stub_llm.py) speaks the REST API
+            genai.configure(api_key=api_key, transport='rest',
+                            client_options={'api_endpoint': api_endpoint})
+        else:
+            genai.configure(api_key=api_key)
+
+        self._genai = genai
+        self.models = list(models or DEFAULT_MODELS.split(','))
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.breakers = {name: CircuitBreaker(breaker_threshold, breaker_cooldown) for name in self.models}
+        self._model_cache = {}
+        self._lock = threading.Lock()
+        # Abandoned (timed out) calls finish here, never on request threads; the
+        # SDK timeout above bounds how long each one can hold a worker
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='gemini')
+
+    def get_model(self, name):
+        """Return the cached GenerativeModel for `name`"""
+        model = self._model_cache.get(name)
+        if model is None:
+            with self._lock:
+                model = self._model_cache.get(name)
+                if model is None:
+                    model = self._genai.GenerativeModel(name)
+                    self._model_cache[name] = model
+        return model
+
+    def _call(self, name, prompt):
+        response = self.get_model(name).generate_content(
+            prompt, request_options={'timeout': self.attempt_timeout, 'retry': None}
+        )
+        text = response.text
+        if not text:
+            raise ValueError(f"{name} returned an empty answer")
+        return text
+
+    def _open_stream(self, name, prompt):
+        """Start a streamed answer and wait for its first non-empty chunk"""
+        response = self.get_model(name).generate_content(
+            prompt, stream=True, request_options={'timeout': self.attempt_timeout, 'retry': None}
+        )
+        chunks = iter(response)
+        try:
+            for chunk in chunks:
+                if chunk.text:
+                    return chunk.text, chunks, response
+        except BaseException:
+            self._close_stream((None, chunks, response))
+            raise
+        self._close_stream((None, chunks, response))
+        raise ValueError(f"{name} returned an empty answer")
+
+    @staticmethod
+    def _close_stream(opened):
+        """Stop a stream nobody will read and drop its upstream connection"""
+        _, chunks, response = opened
+        chunks.close()
+        # The SDK has no public close; its transport iterator (HTTP or gRPC stream) does
+        upstream = getattr(response, '_iterator', None)
+        close = getattr(upstream, 'close', None) or getattr(upstream, 'cancel', None)
+        if close is not None:
+            close()
+
+    def generate(self, prompt):
+        """Return (answer, model_name) from the first model that succeeds"""
+        return self._first_success(self._call, prompt)
+
+    def stream(self, prompt):
+        """Yield (model_name, text) chunks as they arrive.
+
+        Fallback and hedging apply until a model delivers its first chunk;
+        after that the stream is committed to that model.
+        """
+        opened, name = self._first_success(self._open_stream, prompt, discard=self._close_stream)
+        first, chunks, _ = opened
+        try:
+            yield name, first
+            for chunk in chunks:
+                if chunk.text:
+                    yield name, chunk.text
+        finally:
+            self._close_stream(opened)
+
+    def _first_success(self, attempt, prompt, discard=None):
+        """Run `attempt(model_name, prompt)` across models; return (result, model_name).
+
+        `discard(result)` is called on results that arrive after the race is
+        decided (losing hedges, timed-out attempts), e.g. to close a stream.
+        """
+        queue = list(self.models)
+        pending = {}
+        errors = []
+        last_launch = 0.0
+        deadline = time.monotonic() + self.deadline
+
+        def launch():
+            nonlocal last_launch
+            while queue:
+                name = queue.pop(0)
+                if not self.breakers[name].allow():
+                    continue    # open, or another request holds its half-open trial
+                last_launch = time.monotonic()
+                pending[self._executor.submit(attempt, name, prompt)] = (name, last_launch)
+                return True
+            return False
+
+        if not launch():
+            raise LLMUnavailable("All Gemini models are cooling down")
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+
+                # Wake up for whichever comes first: deadline, attempt expiry, hedge
+                wake = min(deadline, min(started + self.attempt_timeout for _, started in pending.values()))
+                if self.hedge_after > 0 and queue:
+                    wake = min(wake, last_launch + self.hedge_after)
+                done, _ = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, _ = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.breakers[name].record_failure()
+                        errors.append(f"{name}: {e}")
+                        launch()
+                        continue
+                    self.breakers[name].record_success()
+                    return result, name
+
+                now = time.monotonic()
+                for future, (name, started) in list(pending.items()):
+                    if now - started >= self.attempt_timeout:
+                        pending.pop(future)
+                        self.breakers[name].record_failure()
+                        errors.append(f"{name}: timed out after {self.attempt_timeout:g}s")
+                        self._abandon(future, discard)
+                        launch()
+
+                if self.hedge_after > 0 and queue and pending and now - last_launch >= self.hedge_after:
+                    launch()
+
+            for future, (name, _) in list(pending.items()):
+                pending.pop(future)
+                self.breakers[name].record_failure()
+                errors.append(f"{name}: deadline exceeded")
+                self._abandon(future, discard)
+        finally:
+            # Hedges that lost keep running on the executor; their outcome still counts
+            for future, (name, _) in pending.items():
+                self._abandon(future, discard, self.breakers[name])
+        raise LLMUnavailable("All Gemini models failed (" + "; ".join(errors) + ")")
+
+    @staticmethod
+    def _abandon(future, discard, breaker=None):
+        """Let an attempt nobody waits for finish in the background, discarding
+        its result (closing a stream) and reporting its outcome to `breaker`"""
+        if future.cancel():
+            if breaker is not None:
+                breaker.release()
+            return
+
+        def settle(future):
+            try:
+                result = future.result()
+            except Exception:
+                if breaker is not None:
+                    breaker.record_failure()
+                return
+            if breaker is not None:
+                breaker.record_success()
+            if discard is not None:
+                discard(result)
+        future.add_done_callback(settle)
+
+    def status(self):
+        """Breaker state per model, for health reporting"""
+        return {name: breaker.state for name, breaker in self.breakers.items()}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ASYNC CLIENT (asgi.py)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _response_text(payload):
+    """Concatenated text parts of a generateContent response"""
+    candidates = payload.get('candidates') or []
+    if not candidates:
+        return ''
+    parts = (candidates[0].get('content') or {}).get('parts') or []
+    return ''.join(part.get('text', '') for part in parts)
+
+
+class AsyncGeminiClient:
+    """GeminiClient's fallback policy on asyncio + httpx (REST API).
+
+    Waiting on Gemini costs an event-loop task instead of a worker thread.
+    """
+
+    def __init__(self, api_key, models=None, attempt_timeout=15.0, deadline=30.0,
+                 hedge_after=0.0, breaker_threshold=2, breaker_cooldown=60.0,
+                 api_endpoint=None):
+        import httpx
+
+        self.models = list(models or DEFAULT_MODELS.split(','))
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.breakers = {name: CircuitBreaker(breaker_threshold, breaker_cooldown) for name in self.models}
+        self._http = httpx.AsyncClient(
+            base_url=(api_endpoint or DEFAULT_ENDPOINT).rstrip('/'),
+            headers={'x-goog-api-key': api_key},
+            timeout=attempt_timeout,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+
+    @staticmethod
+    def _body(prompt):
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+
+    async def _call(self, name, prompt):
+        response = await self._http.post(f"/v1beta/models/{name}:generateContent", json=self._body(prompt))
+        response.raise_for_status()
+        text = _response_text(response.json())
+        if not text:
+            raise ValueError(f"{name} returned an empty answer")
+        return text
+
+    async def _open_stream(self, name, prompt):
+        """Start an SSE stream and wait for its first non-empty chunk"""
+        request = self._http.build_request(
+            'POST', f"/v1beta/models/{name}:streamGenerateContent", params={'alt': 'sse'}, json=self._body(prompt)
+        )
+        response = await self._http.send(request, stream=True)
+        try:
+            response.raise_for_status()
+            texts = self._sse_texts(response)
+            async for text in texts:
+                if text:
+                    return text, texts, response
+        except BaseException:
+            await response.aclose()
+            raise
+        await response.aclose()
+        raise ValueError(f"{name} returned an empty answer")
+
+    @staticmethod
+    async def _sse_texts(response):
+        async for line in response.aiter_lines():
+            if line.startswith('data:'):
+                yield _response_text(json.loads(line[5:]))
+
+    async def generate(self, prompt):
+        """Return (answer, model_name) from the first model that succeeds"""
+        return await self._first_success(self._call, prompt)
+
+    async def stream(self, prompt):
+        """Async-yield (model_name, text) chunks; fallback applies until the first chunk"""
+        (first, texts, response), name = await self._first_success(
+            self._open_stream, prompt, discard=self._close_stream)
+        try:
+            yield name, first
+            async for text in texts:
+                if text:
+                    yield name, text
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    async def _close_stream(opened):
+        await opened[2].aclose()
+
+    async def _first_success(self, attempt, prompt, discard=None):
+        """Run `attempt(model_name, prompt)` across models; return (result, model_name).
+
+        `await discard(result)` is called on a result that finished alongside
+        the winner, e.g. to close its stream.
+        """
+        queue = list(self.models)
+        pending = {}
+        errors = []
+        last_launch = 0.0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+
+        def launch():
+            nonlocal last_launch
+            while queue:
+                name = queue.pop(0)
+                if not self.breakers[name].allow():
+                    continue    # open, or another request holds its half-open trial
+                last_launch = loop.time()
+                task = asyncio.ensure_future(asyncio.wait_for(attempt(name, prompt), self.attempt_timeout))
+                pending[task] = name
+                return True
+            return False
+
+        if not launch():
+            raise LLMUnavailable("All Gemini models are cooling down")
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake = deadline
+                if self.hedge_after > 0 and queue:
+                    wake = min(wake, last_launch + self.hedge_after)
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, wake - now),
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except asyncio.TimeoutError:
+                        self.breakers[name].record_failure()
+                        errors.append(f"{name}: timed out after {self.attempt_timeout:g}s")
+                        launch()
+                        continue
+                    except Exception as e:
+                        self.breakers[name].record_failure()
+                        errors.append(f"{name}: {e}")
+                        launch()
+                        continue
+                    self.breakers[name].record_success()
+                    return result, name
+
+                if self.hedge_after > 0 and queue and pending and loop.time() - last_launch >= self.hedge_after:
+                    launch()
+        finally:
+            # Losing hedges and deadline overruns are cancelled, not left running
+            # (a cancelled _open_stream closes its response); one that finished
+            # in the same wakeup as the winner is closed here
+            for task, name in pending.items():
+                if task.cancel() or task.cancelled():
+                    self.breakers[name].release()
+                elif task.exception() is not None:
+                    self.breakers[name].record_failure()
+                else:
+                    self.breakers[name].record_success()
+                    if discard is not None:
+                        await discard(task.result())
+
+        for name in pending.values():
+            self.breakers[name].record_failure()
+            errors.append(f"{name}: deadline exceeded")
+        raise LLMUnavailable("All Gemini models failed (" + "; ".join(errors) + ")")
+
+    def status(self):
+        """Breaker state per model, for health reporting"""
+        return {name: breaker.state for name, breaker in self.breakers.items()}
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROCESS-WIDE INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_gemini_client = None
+_gemini_lock = threading.Lock()
+
+
+def get_gemini_client():
+    """Lazy create the process-wide Gemini client (None if no API key)"""
+    global _gemini_client
+
+    if _gemini_client is not None:
+        return _gemini_client
+
+    api_key = os.environ.get('GEMINI_API_KEY')
+    if not api_key:
+        return None
+
+    with _gemini_lock:
+        if _gemini_client is None:
+            _gemini_client = GeminiClient(api_key, **_client_settings())
+    return _gemini_client
+
+
+def _client_settings():
+    return dict(
+        models=[m.strip() for m in os.getenv('GEMINI_MODELS', DEFAULT_MODELS).split(',') if m.strip()],
+        attempt_timeout=float(os.getenv('GEMINI_TIMEOUT', 15)),
+        deadline=float(os.getenv('GEMINI_DEADLINE', 30)),
+        hedge_after=float(os.getenv('GEMINI_HEDGE_AFTER', 0)),
+        breaker_threshold=int(os.getenv('GEMINI_BREAKER_FAILURES', 2)),
+        breaker_cooldown=float(os.getenv('GEMINI_BREAKER_COOLDOWN', 60)),
+        api_endpoint=os.getenv('GEMINI_API_ENDPOINT') or None,
+    )
+
+
+_async_gemini_client = None
+
+
+def get_async_gemini_client():
+    """Lazy create the event loop's Gemini client (None if no API key)"""
+    global _async_gemini_client
+
+    if _async_gemini_client is None and os.environ.get('GEMINI_API_KEY'):
+        _async_gemini_client = AsyncGeminiClient(os.environ['GEMINI_API_KEY'], **_client_settings())
+    return _async_gemini_client
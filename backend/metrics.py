@@ -0,0 +1,199 @@
+"""
+FinLand Metrics
+Per-stage timers, per-route request latency and gauges, exposed in the
+Prometheus text format. Metrics are per worker process.
+
+With METRICS_ENABLED=0 every recording call is a no-op (a shared null
+context manager for stages), so instrumentation can stay in hot paths.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Seconds; stage timings are usually well under a millisecond
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NULL_STAGE = nullcontext()
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Gauge:
+    """Last-set value per label set, or a callback read at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels=(), callback=None):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.callback = callback    # () -> {label tuple: value}
+        self._values = {}
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def samples(self):
+        values = self.callback() if self.callback else dict(self._values)
+        for labels, value in values.items():
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}           # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        names = self.label_names + ('le',)
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                yield f'{self.name}_bucket', _labels(names, labels + (_number(bound),)), cumulative
+            yield f'{self.name}_count', _labels(self.label_names, labels), cumulative
+            yield f'{self.name}_sum', _labels(self.label_names, labels), series[-1]
+
+
+class _Stage:
+    __slots__ = ('histogram', 'name', 'start', 'listener')
+
+    def __init__(self, histogram, name, listener=None):
+        self.histogram = histogram
+        self.name = name
+        self.listener = listener
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.histogram.observe(seconds, self.name)
+        if self.listener is not None:
+            self.listener(self.name, seconds)
+
+
+class Metrics:
+    """Registry of the backend's metrics"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stage_listener = None  # (stage, seconds) -> None, e.g. per-request timings for the request log
+        self._metrics = []
+        self.requests = self.register(Counter(
+            'finland_http_requests_total', 'HTTP requests by route, method and status',
+            ('route', 'method', 'status')))
+        self.request_latency = self.register(Histogram(
+            'finland_http_request_duration_seconds', 'Request latency until the response is returned',
+            ('route', 'method')))
+        self.stages = self.register(Histogram(
+            'finland_stage_duration_seconds', 'Time spent in an instrumented handler stage', ('stage',)))
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def stage(self, name):
+        """`with metrics.stage('ai_analyze.predict'):` times a block"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self.stages, name, self.stage_listener)
+
+    def observe_request(self, route, method, status, seconds):
+        if not self.enabled:
+            return
+        self.requests.inc(route, method, str(status))
+        self.request_latency.observe(seconds, route, method)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def process_memory(pid='self'):
+    """Shared vs private resident memory (bytes) from /proc/<pid>/smaps_rollup (Linux)"""
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    memory = {'rss': 0, 'pss': 0, 'shared': 0, 'private': 0}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in fields:
+                    memory[fields[name]] += int(rest.split()[0]) * 1024
+    except OSError:
+        return {}
+    return memory
+
+
+_metrics = None
+
+
+def get_metrics():
+    """Process-wide registry configured from METRICS_ENABLED"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(enabled=os.getenv('METRICS_ENABLED', '1') not in ('0', 'false', 'False', ''))
+    return _metrics
@@ -0,0 +1,88 @@
+"""
+FinLand Sampling Profiler
+On-demand stack sampling of a live worker, producing collapsed stacks
+(`frame;frame;frame count`) for flamegraph.pl / speedscope / inferno.
+
+Nothing runs until a profile is requested: via the authenticated
+/api/debug/profile endpoint, or `kill -USR2 <worker pid>` which writes
+the dump to the temp directory.
+"""
+
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 60
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_stacks(seconds=10.0, interval=0.005, match=None):
+    """Sample every other thread's stack; return a Counter of collapsed stacks"""
+    seconds = min(max(seconds, 0.0), MAX_SECONDS)
+    own_thread = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            if match is None or match in stack:
+                stacks[stack] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def collapsed(stacks):
+    """Render stacks in Brendan Gregg's collapsed format"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class Profiler:
+    """Allows one profile at a time per process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds=10.0, interval=0.005, match=None):
+        """Collapsed-stack text, or None if a profile is already running"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return collapsed(sample_stacks(seconds, interval, match))
+        finally:
+            self._lock.release()
+
+    def install_signal_handler(self, signal_name='USR2', seconds=30.0):
+        """Profile in the background on SIG<signal_name> and write the dump to a file"""
+        signum = getattr(signal, f"SIG{signal_name.upper().removeprefix('SIG')}", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+
+        def dump():
+            text = self.profile(seconds)
+            if text is None:
+                return
+            path = os.path.join(tempfile.gettempdir(), f"finland-profile-{os.getpid()}-{int(time.time())}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"🔬 Profile written to {path}")
+
+        signal.signal(signum, lambda *_: threading.Thread(target=dump, daemon=True).start())
+        return True
+
+
+profiler = Profiler()
@@ -0,0 +1,224 @@
+"""
+FinLand Shared Rate-Limit Storage
+A `limits` storage backend in a memory-mapped file, so every worker process
+on the box counts against the same limits.
+
+    RATELIMIT_STORAGE_URI=shm://finland-ratelimit?slots=65536
+
+Counters live in a fixed-size open-addressing table split into stripes.
+Each operation locks one stripe (a thread lock plus a POSIX byte-range lock
+for other processes) and probes at most one stripe, so the cost per request
+is O(1) and unrelated keys rarely contend.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport
+
+try:
+    import fcntl
+except ImportError:  # Windows: use memory:// instead
+    fcntl = None
+
+_MAGIC = b'FLRL0001'
+_HEADER = struct.Struct('<8sII')          # magic, slots, stripes
+_SLOT = struct.Struct('<Qdq')             # key hash (0 = empty), expires at, count
+_DATA_OFFSET = 4096
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """Cross-process fixed-window and sliding-window-counter storage"""
+
+    STORAGE_SCHEME = ['shm']
+
+    def __init__(self, uri='shm://finland-ratelimit', wrap_exceptions=False, **options):
+        if fcntl is None:
+            raise NotImplementedError("shm:// rate-limit storage needs fcntl (POSIX); use memory://")
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+        parsed = urlparse(uri)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        name = (parsed.netloc + parsed.path).strip('/') or 'finland-ratelimit'
+        self.slots = int(query.get('slots', options.get('slots', 65536)))
+        self.stripes = int(query.get('stripes', options.get('stripes', 64)))
+        self.stripe_size = self.slots // self.stripes
+
+        directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        self.path = os.path.join(directory, name)
+        size = _DATA_OFFSET + self.slots * _SLOT.size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self.stripes)  # init lock, past stripe bytes
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            magic, slots, stripes = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or slots != self.slots or stripes != self.stripes:
+                self._map[:size] = bytes(size)
+                _HEADER.pack_into(self._map, 0, _MAGIC, self.slots, self.stripes)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self.stripes)
+
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+
+    @property
+    def base_exceptions(self):
+        return (OSError, ValueError)
+
+    # ─── stripe locking & slot lookup ──────────────────────────────────────
+
+    class _StripeLock:
+        def __init__(self, storage, stripe):
+            self.storage = storage
+            self.stripe = stripe
+
+        def __enter__(self):
+            self.storage._thread_locks[self.stripe].acquire()
+            fcntl.lockf(self.storage._fd, fcntl.LOCK_EX, 1, self.stripe)
+
+        def __exit__(self, *exc):
+            fcntl.lockf(self.storage._fd, fcntl.LOCK_UN, 1, self.stripe)
+            self.storage._thread_locks[self.stripe].release()
+
+    def _stripe(self, base_key):
+        return _hash(base_key) % self.stripes
+
+    def _find(self, stripe, key, now, create):
+        """Return the slot offset for `key` (None if absent and not creating)"""
+        key_hash = _hash(key)
+        start = stripe * self.stripe_size
+        home = key_hash % self.stripe_size
+        reusable = None
+        for probe in range(self.stripe_size):
+            offset = _DATA_OFFSET + (start + (home + probe) % self.stripe_size) * _SLOT.size
+            slot_hash, expires_at, _ = _SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset
+            if slot_hash == 0:
+                return (reusable if reusable is not None else offset) if create else None
+            if reusable is None and expires_at <= now:
+                reusable = offset
+            if probe >= 16 and reusable is not None:
+                break
+        if create and reusable is not None:
+            return reusable
+        if create:
+            raise ValueError("rate-limit table is full; raise ?slots=")
+        return None
+
+    def _read(self, stripe, key, now):
+        offset = self._find(stripe, key, now, create=False)
+        if offset is None:
+            return 0, now
+        _, expires_at, count = _SLOT.unpack_from(self._map, offset)
+        if expires_at <= now:
+            return 0, now
+        return count, expires_at
+
+    def _incr(self, stripe, key, expiry, amount, now):
+        offset = self._find(stripe, key, now, create=True)
+        slot_hash, expires_at, count = _SLOT.unpack_from(self._map, offset)
+        if slot_hash != _hash(key) or expires_at <= now:
+            count, expires_at = 0, now + expiry
+        count += amount
+        _SLOT.pack_into(self._map, offset, _hash(key), expires_at, count)
+        return count
+
+    def _clear(self, stripe, key, now):
+        offset = self._find(stripe, key, now, create=False)
+        if offset is not None:
+            # Expire rather than empty the slot so probe chains stay intact
+            _SLOT.pack_into(self._map, offset, _hash(key), 0.0, 0)
+
+    # ─── fixed window ──────────────────────────────────────────────────────
+
+    def incr(self, key, expiry, amount=1):
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            return self._incr(stripe, key, expiry, amount, time.time())
+
+    def get(self, key):
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            return self._read(stripe, key, time.time())[0]
+
+    def get_expiry(self, key):
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            return self._read(stripe, key, time.time())[1]
+
+    def clear(self, key):
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            self._clear(stripe, key, time.time())
+
+    def check(self):
+        return not self._map.closed
+
+    def reset(self):
+        now = time.time()
+        cleared = 0
+        for stripe in range(self.stripes):
+            with self._StripeLock(self, stripe):
+                start = _DATA_OFFSET + stripe * self.stripe_size * _SLOT.size
+                for i in range(self.stripe_size):
+                    offset = start + i * _SLOT.size
+                    slot_hash, expires_at, _ = _SLOT.unpack_from(self._map, offset)
+                    if slot_hash and expires_at > now:
+                        cleared += 1
+                self._map[start:start + self.stripe_size * _SLOT.size] = bytes(self.stripe_size * _SLOT.size)
+        return cleared
+
+    # ─── sliding window counter ────────────────────────────────────────────
+
+    @staticmethod
+    def _window_keys(key, expiry, now):
+        window = int(now // expiry)
+        return f"{key}/{window - 1}", f"{key}/{window}"
+
+    def _window_info(self, stripe, key, expiry, now):
+        previous_key, current_key = self._window_keys(key, expiry, now)
+        previous_count = self._read(stripe, previous_key, now)[0]
+        current_count = self._read(stripe, current_key, now)[0]
+        previous_ttl = (1 - (now / expiry) % 1) * expiry if previous_count else 0.0
+        current_ttl = (1 - (now / expiry) % 1) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            now = time.time()
+            previous_count, previous_ttl, current_count, _ = self._window_info(stripe, key, expiry, now)
+            if math.floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+            # Whole check-and-increment holds the stripe lock: no over-admission
+            self._incr(stripe, self._window_keys(key, expiry, now)[1], 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key, expiry):
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            return self._window_info(stripe, key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        stripe = self._stripe(key)
+        with self._StripeLock(self, stripe):
+            now = time.time()
+            for window_key in self._window_keys(key, expiry, now):
+                self._clear(stripe, window_key, now)
@@ -0,0 +1,118 @@
+"""
+FinLand Refinance Optimizer
+Scores every (subset of debts) x (refinance offer) combination at once with
+NumPy: subsets are rows of a bitmask matrix, offers are columns, so 10 debts
+x 50 offers (51,150 plans) is a handful of array operations.
+
+A plan moves the chosen debts into one new loan from the offer and keeps
+paying the other debts as today. Plans beaten on both total cost and
+monthly payment by another plan are pruned (Pareto front).
+"""
+
+import numpy as np
+
+from amortization import annuity_payment, fixed_payment_schedule, to_satang
+
+PARETO_LIMIT = 20
+
+
+def debt_costs(debts):
+    """(monthly payment, total still to pay) per debt in baht, from its payoff schedule.
+
+    A debt is {"balance", "apr", "monthly_payment"} (or "term_months" instead
+    of a payment). Raises ValueError if a payment never pays the debt off.
+    """
+    payments, totals = [], []
+    for i, debt in enumerate(debts):
+        rate = debt['apr'] / 100 / 12
+        if debt.get('monthly_payment'):
+            payment = to_satang(debt['monthly_payment'])
+        else:
+            payment = annuity_payment(to_satang(debt['balance']), rate, debt['term_months'])
+        schedule = fixed_payment_schedule(to_satang(debt['balance']), rate, payment)
+        if schedule.months and schedule.remaining[-1] > 0:
+            raise ValueError(f"debts[{i}]: monthly payment never pays this debt off")
+        payments.append(payment / 100)
+        totals.append(schedule.total_paid)
+    return np.array(payments), np.array(totals)
+
+
+def _subsets(n):
+    """(2^n - 1, n) bool matrix of every non-empty subset"""
+    masks = np.arange(1, 2 ** n)
+    return (masks[:, None] >> np.arange(n)) & 1 == 1
+
+
+def _pareto(cost, payment):
+    """Indices of plans not dominated on (cost, payment), cheapest first"""
+    order = np.lexsort((payment, cost))
+    best_payment = np.minimum.accumulate(payment[order])
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = payment[order][1:] < best_payment[:-1]
+    return order[keep]
+
+
+def optimize(debts, offers, top=5):
+    """Best plans for moving debts into one of `offers`.
+
+    Offers are {"rate" (annual %), "term_months", "fee" (baht, optional),
+    "fee_percent" (of the amount, optional), "min_amount"/"max_amount"
+    (optional)}. Returns the current situation, the `top` cheapest plans, the
+    `top` lowest-payment plans and the Pareto front of both.
+    """
+    payments, totals = debt_costs(debts)
+    balances = np.array([debt['balance'] for debt in debts], dtype=np.float64)
+    subsets = _subsets(len(debts))
+
+    principal = subsets @ balances                      # (S,)
+    kept_payment = (~subsets) @ payments                # (S,)
+    kept_total = (~subsets) @ totals                    # (S,)
+
+    rate = np.array([offer['rate'] for offer in offers], dtype=np.float64) / 100 / 12
+    term = np.array([offer['term_months'] for offer in offers], dtype=np.float64)
+    fee = np.array([offer.get('fee', 0) for offer in offers], dtype=np.float64)
+    fee_percent = np.array([offer.get('fee_percent', 0) for offer in offers], dtype=np.float64) / 100
+    low = np.array([offer.get('min_amount', 0) for offer in offers], dtype=np.float64)
+    high = np.array([offer.get('max_amount') or np.inf for offer in offers], dtype=np.float64)
+
+    # Level payment for every (subset, offer): P = A r / (1 - (1+r)^-n), or A / n at 0%
+    amount = principal[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(rate > 0, rate / (1 - (1 + rate) ** -term), 1 / term)
+    new_payment = np.round(amount * factor, 2)
+    fees = np.round(fee + fee_percent * amount, 2)
+    total_cost = new_payment * term + fees + kept_total[:, None]
+    monthly = new_payment + kept_payment[:, None]
+
+    feasible = (amount >= low) & (amount <= high)
+    subset_index, offer_index = np.nonzero(feasible)
+    total_cost, monthly = total_cost[feasible], monthly[feasible]
+    new_payment, fees = new_payment[feasible], fees[feasible]
+
+    current_total = float(totals.sum())
+    current_monthly = float(payments.sum())
+
+    def plan(i):
+        s, o = subset_index[i], offer_index[i]
+        return {
+            "offer": int(o),
+            "offer_name": offers[o].get('name', f"offer-{o}"),
+            "debts": np.flatnonzero(subsets[s]).tolist(),
+            "amount": round(float(principal[s]), 2),
+            "fees": float(fees[i]),
+            "new_payment": float(new_payment[i]),
+            "term_months": int(term[o]),
+            "monthly_payment": round(float(monthly[i]), 2),
+            "total_cost": round(float(total_cost[i]), 2),
+            "savings": round(current_total - float(total_cost[i]), 2),
+            "monthly_change": round(float(monthly[i]) - current_monthly, 2),
+        }
+
+    front = _pareto(total_cost, monthly)
+    return {
+        "current": {"monthly_payment": round(current_monthly, 2), "total_cost": round(current_total, 2)},
+        "plans_evaluated": int(feasible.sum()),
+        "cheapest": [plan(i) for i in np.argsort(total_cost, kind='stable')[:top]],
+        "lowest_payment": [plan(i) for i in np.lexsort((total_cost, monthly))[:top]],
+        "pareto": [plan(i) for i in front[:PARETO_LIMIT]],
+    }
@@ -0,0 +1,191 @@
+"""
+FinLand Request Log
+Structured per-request events (route, status, stage timings, model version,
+cache hit, error class) written as JSON lines by a background thread.
+
+Request threads only build a dict and put_nowait() it on a bounded queue. A
+writer thread drains up to `batch_size` events at a time, serializes them
+(exceptions are formatted there, not on the request thread) and appends the
+batch in a single write to a size-rotated file. When the queue is full the
+event is dropped and counted: a slow disk costs log lines, never latency.
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+    import json
+
+_STOP = object()
+
+
+def _default(value):
+    """Serialize what orjson/json can't: exceptions become their formatted traceback"""
+    if isinstance(value, BaseException):
+        return ''.join(traceback.format_exception(type(value), value, value.__traceback__)).rstrip()
+    return str(value)
+
+
+def _encode(event):
+    if orjson is not None:
+        return orjson.dumps(event, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(event, default=_default, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class RequestLog:
+    """Bounded queue of events flushed in batches to a rotating JSONL file (path '-' = stdout)"""
+
+    def __init__(self, path, max_queue=10000, batch_size=256, flush_interval=1.0,
+                 max_bytes=50 * 2**20, backups=5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._fd = None
+
+    def emit(self, event):
+        """Queue an event without ever blocking; dropped (and counted) when full"""
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {"queued": self.depth(), "written": self.written, "dropped": self.dropped, "failed": self.failed}
+
+    def _start(self):
+        # Started lazily, and again in a forked worker: threads don't survive fork
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._fd = None
+            self._thread = threading.Thread(target=self._run, name='request-log', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def close(self, timeout=5.0):
+        """Flush what is queued and stop the writer (tests, shutdown)"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread, self._pid = None, None
+        if self._fd is not None and self.path != '-':
+            os.close(self._fd)
+        self._fd = None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # WRITER THREAD
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _run(self):
+        events = self._queue
+        while True:
+            try:
+                batch = [events.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            if stop:
+                batch = [item for item in batch if item is not _STOP]
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        lines = []
+        for event in batch:
+            try:
+                lines.append(_encode(event))
+            except Exception:
+                self.failed += 1
+        try:
+            fd = self._open()
+            os.write(fd, b''.join(lines))
+            self.written += len(lines)
+            if self.path != '-':
+                self._rotate_if_needed(fd)
+        except OSError:
+            self.failed += len(lines)
+            self._fd = None
+
+    def _open(self):
+        if self._fd is None:
+            if self.path == '-':
+                self._fd = 1
+            else:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                # O_APPEND: each batch is one write, so workers sharing the file don't interleave lines
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _rotate_if_needed(self, fd):
+        """path -> path.1 -> ... -> path.<backups> once the file reaches max_bytes"""
+        if not self.max_bytes or os.fstat(fd).st_size < self.max_bytes:
+            return
+        try:
+            # Another worker may have rotated already: only rotate the file we still hold
+            if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                for i in range(self.backups - 1, 0, -1):
+                    if os.path.exists(f'{self.path}.{i}'):
+                        os.replace(f'{self.path}.{i}', f'{self.path}.{i + 1}')
+                if self.backups:
+                    os.replace(self.path, f'{self.path}.1')
+                else:
+                    os.truncate(self.path, 0)
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+        self._fd = None
+
+
+_request_log = None
+_request_log_lock = threading.Lock()
+
+
+def get_request_log():
+    """Process-wide log configured from REQUEST_LOG (path, '-' for stdout, '0' to disable)"""
+    global _request_log
+    if _request_log is None:
+        with _request_log_lock:
+            if _request_log is None:
+                path = os.getenv('REQUEST_LOG', 'logs/requests.jsonl')
+                _request_log = False if path in ('', '0', 'off') else RequestLog(
+                    path,
+                    max_queue=int(os.getenv('REQUEST_LOG_QUEUE', 10000)),
+                    max_bytes=int(os.getenv('REQUEST_LOG_MAX_BYTES', 50 * 2**20)),
+                    backups=int(os.getenv('REQUEST_LOG_BACKUPS', 5)),
+                )
+    return _request_log or None
+
+
+def event(**fields):
+    """An event dict stamped with the wall-clock time and process id"""
+    return {"ts": round(time.time(), 3), "pid": os.getpid(), **fields}
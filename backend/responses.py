@@ -0,0 +1,156 @@
+"""
+FinLand Response Encoding
+Fast JSON serialization, gzip/brotli negotiation, compact schedules and CSV export
+"""
+
+import csv
+import gzip
+import io
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional - stdlib json is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional - gzip only
+    brotli = None
+
+SCHEDULE_FIELDS = ('month', 'payment', 'interest', 'principal', 'remaining')
+CSV_BLOCK_ROWS = 120
+CONTENT_ENCODINGS = ('br', 'gzip')
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# JSON
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson-backed JSON provider; behaves like Flask's default without orjson"""
+
+    if orjson is not None:
+        _options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent'):
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPRESSION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _negotiate_encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, min_size=1024):
+    """Compress a buffered 200 response body when it is worth it"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(data, quality=5)
+    else:
+        data = gzip.compress(data, compresslevel=6)
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+
+    # Each encoding is a different representation: keep strong ETags distinct
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+def matching_etag(etag):
+    """The If-None-Match entry for this result, or None.
+
+    A client that received a compressed body holds that variant's ETag
+    ("<etag>-br"); the 304 has to echo the one it holds. The variant this
+    request would be encoded with is preferred when several are listed.
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    preferred = _negotiate_encoding()
+    candidates = [f"{etag}-{preferred}"] if preferred else []
+    candidates.append(etag)
+    candidates.extend(f"{etag}-{encoding}" for encoding in CONTENT_ENCODINGS if encoding != preferred)
+    for candidate in candidates:
+        if if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCHEDULES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def format_schedule(columns, schedule_format='rows'):
+    """`columns` holds parallel lists keyed by SCHEDULE_FIELDS.
+
+    'columnar' returns them as-is (much smaller and faster to encode);
+    'rows' returns the classic list of per-month dicts.
+    """
+    if schedule_format == 'columnar':
+        return columns
+    return [dict(zip(SCHEDULE_FIELDS, row)) for row in zip(*(columns[f] for f in SCHEDULE_FIELDS))]
+
+
+def _baht_cells(satang):
+    return [f"{value / 100:.2f}" for value in satang.tolist()]
+
+
+def schedule_csv(header, schedules, block_rows=CSV_BLOCK_ROWS):
+    """Stream CSV text: `header`, then the rows of each (prefix cells, amortization.Schedule).
+
+    Schedules are pulled one at a time and written `block_rows` months per
+    chunk, so memory does not grow with the number or length of schedules.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+
+    for prefix, schedule in schedules:
+        for start in range(0, schedule.months, block_rows):
+            end = min(start + block_rows, schedule.months)
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                [*prefix, month, *cells] for month, *cells in zip(
+                    range(start + 1, end + 1),
+                    *(_baht_cells(column[start:end]) for column in
+                      (schedule.payment, schedule.interest, schedule.principal, schedule.remaining))
+                )
+            )
+            yield buffer.getvalue()
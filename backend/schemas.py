@@ -0,0 +1,269 @@
+"""
+FinLand Request Schemas
+Each endpoint declares its body once as a tree of fields; every field
+compiles itself when constructed into a closure with its range, cast,
+default and (for text) precompiled sanitizing regexes already bound.
+
+Validating is one pass over the declared fields that collects every
+problem, keyed by path ("loans[3].balance"), instead of stopping at the
+first. Lists of objects (bulk loans, debts, offers, events) reuse the item's
+compiled closure for each element.
+"""
+
+import html
+import math
+import re
+from abc import ABC, abstractmethod
+
+_TAGS = re.compile(r'<[^>]*>')
+_JAVASCRIPT = re.compile(r'javascript:', re.IGNORECASE)
+_EVENT_HANDLERS = re.compile(r'on\w+\s*=', re.IGNORECASE)
+# Every pass below needs one of these characters to change anything
+_UNSAFE = re.compile(r'[<>&"\':=]')
+
+
+def sanitize_string(value):
+    """Sanitize string input to prevent XSS attacks"""
+    if not isinstance(value, str):
+        return None
+    if _UNSAFE.search(value) is None:
+        return value
+    value = html.escape(_TAGS.sub('', value))
+    return _EVENT_HANDLERS.sub('', _JAVASCRIPT.sub('', value))
+
+
+def _bound(value):
+    return f"{value:,.0f}" if value == int(value) else f"{value:g}"
+
+
+def join_path(path, name):
+    return f"{path}.{name}" if path else name
+
+
+def _missing(raw):
+    return raw is None or raw == ''
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCALAR FIELDS: check(raw) -> (value, problem or None); the container adds the path
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Field(ABC):
+    """A request value; absent (missing, null or '') means `default`, or an error if `required`"""
+
+    nested = False
+
+    def __init__(self, default=None, required=False):
+        self.default, self.required = default, required
+        self.absent = (default, "is required" if required else None)   # (value, problem) when absent
+        self.check = self.compile()
+
+    @abstractmethod
+    def compile(self):
+        """The field's check closure, with its settings bound"""
+
+
+class Number(Field):
+    """Finite number within [low, high]. cast=int truncates like int(float(x));
+    whole=True rejects fractions; lenient=True turns bad values into the default."""
+
+    def __init__(self, low=0, high=1e12, default=None, required=False, cast=float, whole=False, lenient=False):
+        self.low, self.high, self.cast, self.whole, self.lenient = low, high, cast, whole, lenient
+        super().__init__(default, required)
+
+    def compile(self):
+        low, high, cast, whole, lenient = self.low, self.high, self.cast, self.whole, self.lenient
+        default = self.default
+        expected = f"must be a {'whole ' if whole else ''}number from {_bound(low)} to {_bound(high)}"
+        absent = self.absent
+        isfinite, nan = math.isfinite, math.nan
+
+        def check(raw):
+            kind = raw.__class__
+            if kind is float:
+                value = raw
+            elif kind is int or kind is str:    # JSON ints, query strings (bool is not int here)
+                try:
+                    value = float(raw)
+                except ValueError:
+                    if raw == '':
+                        return absent
+                    value = nan
+                except OverflowError:       # ints past float range (10**400)
+                    value = nan
+            elif raw is None:
+                return absent
+            else:
+                value = nan
+            if isfinite(value) and low <= value <= high and not (whole and value != int(value)):
+                return cast(value), None
+            if lenient:
+                return default, None
+            return None, expected
+        return check
+
+
+class Text(Field):
+    """String up to `max_length` characters, HTML-sanitized unless sanitize=False.
+    truncate=True cuts longer values instead of rejecting them; stringify=True
+    also accepts numbers (as their text)."""
+
+    def __init__(self, max_length=1000, default=None, required=False, truncate=False, stringify=False, sanitize=True):
+        self.max_length, self.truncate, self.stringify, self.sanitize = max_length, truncate, stringify, sanitize
+        super().__init__(default, required)
+
+    def compile(self):
+        max_length, truncate, stringify = self.max_length, self.truncate, self.stringify
+        clean = sanitize_string if self.sanitize else (lambda value: value)
+        absent = self.absent
+        too_long = f"must be at most {max_length} characters"
+
+        def check(raw):
+            if stringify and isinstance(raw, (int, float)) and not isinstance(raw, bool):
+                raw = str(raw)
+            if not isinstance(raw, str):
+                return absent if raw is None else (None, "must be text")
+            value = clean(raw)
+            if len(value) > max_length:
+                if not truncate:
+                    return None, too_long
+                value = value[:max_length]
+            if not value:
+                return absent
+            return value, None
+        return check
+
+
+class Choice(Field):
+    """One of a fixed set of strings"""
+
+    def __init__(self, options, default=None, required=False):
+        self.options = tuple(options)
+        super().__init__(default, required)
+
+    def compile(self):
+        options = frozenset(self.options)
+        expected = f"must be one of {', '.join(self.options)}"
+        absent = self.absent
+
+        def check(raw):
+            if isinstance(raw, str) and raw in options:
+                return raw, None
+            return absent if _missing(raw) else (None, expected)
+        return check
+
+
+class Flag(Field):
+    """JSON true/false; anything else (including absent) means `default`"""
+
+    def __init__(self, default=False):
+        super().__init__(default)
+
+    def compile(self):
+        default = self.default
+
+        def check(raw):
+            return (raw if raw is True or raw is False else default), None
+        return check
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# NESTED FIELDS: check(raw, path, errors) -> value, errors added to `errors`
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _Nested(Field):
+    nested = True
+
+    def validate(self, data, path=''):
+        """(values, {path: message}); values are only meaningful when there are no errors"""
+        errors = {}
+        values = self.check(data, path, errors)
+        return values, errors
+
+
+class Schema(_Nested):
+    """An object with named fields (a request body, or a nested object / list item)"""
+
+    def __init__(self, fields, required=True):
+        self.fields = dict(fields)
+        super().__init__(None, required)
+
+    def compile(self):
+        fields = tuple((name, field.check, field.nested, field.absent) for name, field in self.fields.items())
+        required = self.required
+
+        def check(raw, path, errors):
+            if not isinstance(raw, dict):
+                if raw is not None or required:
+                    errors[path or 'body'] = f"{path or 'body'} must be an object"
+                return None
+            values = {}
+            get = raw.get
+            for name, check_field, nested, absent in fields:
+                value = get(name)
+                if nested:
+                    values[name] = check_field(value, join_path(path, name), errors)
+                    continue
+                # Absent fields (most optional ones) skip the check call
+                values[name], problem = absent if value is None else check_field(value)
+                if problem is not None:
+                    field_path = join_path(path, name)
+                    errors[field_path] = f"{field_path} {problem}"
+            return values
+        return check
+
+
+class Variant(_Nested):
+    """An object whose schema is picked by one of its fields, e.g. {"type": "credit-card", ...}"""
+
+    def __init__(self, key, schemas):
+        self.key, self.schemas = key, dict(schemas)
+        super().__init__(None, True)
+
+    def compile(self):
+        key = self.key
+        schemas = {kind: schema.check for kind, schema in self.schemas.items()}
+        expected = f"must be one of {', '.join(self.schemas)}"
+
+        def check(raw, path, errors):
+            if not isinstance(raw, dict):
+                errors[path or 'body'] = f"{path or 'body'} must be an object"
+                return None
+            kind = raw.get(key)
+            schema = schemas.get(kind) if isinstance(kind, str) else None
+            if schema is None:
+                errors[join_path(path, key)] = f"{join_path(path, key)} {expected}"
+                return None
+            values = schema(raw, path, errors)
+            values[key] = kind
+            return values
+        return check
+
+
+class ListOf(_Nested):
+    """A list of `min_items` to `max_items` items of one field type (absent = [] unless required)"""
+
+    def __init__(self, item, min_items=0, max_items=100, required=False):
+        self.item, self.min_items, self.max_items = item, min_items, max_items
+        super().__init__(None, required)
+
+    def compile(self):
+        item, nested = self.item.check, self.item.nested
+        min_items, max_items, required = self.min_items, self.max_items, self.required
+
+        def check(raw, path, errors):
+            if _missing(raw) and not required:
+                return []
+            if not isinstance(raw, list) or not min_items <= len(raw) <= max_items:
+                errors[path] = f"{path} must be a list of {min_items} to {max_items} items"
+                return None
+            if nested:
+                return [item(value, f"{path}[{i}]", errors) for i, value in enumerate(raw)]
+            values = []
+            for i, value in enumerate(raw):
+                value, problem = item(value)
+                if problem is not None:
+                    errors[f"{path}[{i}]"] = f"{path}[{i}] {problem}"
+                values.append(value)
+            return values
+        return check
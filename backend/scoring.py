@@ -0,0 +1,187 @@
+"""
+FinLand Batch Scoring
+The /api/ai-analyze pipeline over column arrays: same input defaults,
+features, advisor outputs, clipping and risk rules, one NumPy pass per chunk.
+Used by tools/score_bulk.py; the web app only shares its output tables.
+"""
+
+import numpy as np
+
+from inference import predict_outputs
+
+# Request field -> default, as read by ai_analyze
+ANALYZE_INPUTS = {
+    'loan_amount': 0.0,
+    'interest_rate': 0.0,
+    'term_months': 60.0,
+    'monthly_income': 0.0,
+    'monthly_payment': 0.0,
+    'monthly_expenses': 0.0,
+    'emergency_months': 0.0,
+    'age': 30.0,
+    'job_stability': 70.0,
+    'payment_history': 80.0,
+    'account_age': 36.0,
+    'current_savings': 0.0,
+}
+
+# Output column -> (regression target index, low clip, high clip, decimals); mirrors ai_analyze
+REGRESSION_OUTPUTS = {
+    'interest_burden_ratio': (4, 0, None, 1),
+    'health_score': (5, 0, 100, 0),
+    'debt_stress_index': (6, 0, 100, 0),
+    'stability_score': (7, 0, 100, 0),
+    'wealth_potential': (8, 0, 100, 0),
+    'emergency_buffer_months': (9, 0, None, 0),
+    'savings_potential': (10, 0, None, 0),
+    'investment_readiness': (11, 0, 100, 0),
+    'retirement_gap_years': (12, 0, None, 1),
+    'percentile_rank': (13, 1, 99, 0),
+    'credit_score_impact': (14, -50, 50, 0),
+    'life_quality_score': (15, 0, 100, 0),
+}
+
+LABEL_OUTPUTS = (
+    ('payoff_strategy', 1, 'strategy_labels', "Standard"),
+    ('primary_action', 2, 'action_labels', "รักษาระดับ"),
+    ('urgency_level', 3, 'urgency_labels', "ปกติ"),
+    ('support_needed', 4, 'support_labels', "Self-service"),
+)
+
+OUTPUT_COLUMNS = (
+    ['monthly_payment', 'dti_ratio', 'severity', 'risk_score', 'monthly_interest', 'total_interest']
+    + list(REGRESSION_OUTPUTS) + [name for name, *_ in LABEL_OUTPUTS] + ['better_than_average', 'error']
+)
+
+
+def prepare_inputs(columns):
+    """Apply ai_analyze's defaults to {field: float array}; returns (inputs, error per row)"""
+    n = len(next(iter(columns.values())))
+    inputs = {}
+    for name, default in ANALYZE_INPUTS.items():
+        values = np.asarray(columns.get(name, np.full(n, np.nan)), dtype=np.float64)
+        inputs[name] = np.where(np.isnan(values), default, values)
+    # `or monthly_income * 0.5`: a zero also means "not given"
+    expenses = inputs['monthly_expenses']
+    inputs['monthly_expenses'] = np.where(expenses == 0, inputs['monthly_income'] * 0.5, expenses)
+    inputs['age'] = np.trunc(inputs['age'])
+    inputs['account_age'] = np.trunc(inputs['account_age'])
+
+    errors = np.full(n, '', dtype=object)
+    errors[inputs['monthly_income'] <= 0] = "กรุณาระบุรายได้ต่อเดือน"
+    errors[inputs['loan_amount'] <= 0] = "กรุณาระบุยอดหนี้"
+    return inputs, errors
+
+
+def monthly_payments(principal, annual_rate, term_months):
+    """calculate_monthly_payment over arrays"""
+    rate = annual_rate / 100 / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amortized = principal * rate / (1 - (1 + rate) ** (-term_months))
+        flat = np.where(term_months > 0, principal / term_months, 0.0)
+    return np.where(annual_rate <= 0, flat, amortized)
+
+
+def build_feature_matrix(loan, rate, term, income, payment, dti, expenses, emergency, age,
+                         job_stab, pay_hist, acc_age, savings):
+    """app._build_features for arrays of rows: (n, 30) in feature_columns order"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effective_rate = ((1 + rate / 100 / 12) ** 12 - 1) * 100
+        payment_flexibility = income - payment - expenses
+        debt_to_annual = np.where(income > 0, loan / (income * 12), 10)
+        savings_rate = np.where(income > 0, (income - payment - expenses) / income * 100, 0)
+    one = np.ones_like(loan)
+    return np.column_stack([
+        loan, rate, term, income, payment,
+        dti, payment, expenses, emergency, age,
+        job_stab, pay_hist, acc_age, savings,
+        effective_rate, np.log1p(loan), np.log1p(income), payment_flexibility,
+        debt_to_annual, one, savings_rate, np.maximum(0, 60 - age),
+        rate <= 2,
+        (4 <= rate) & (rate < 15),
+        (15 <= rate) & (rate < 20),
+        rate >= 20,
+        age < 30,
+        age >= 50,
+        emergency >= 3,
+        income >= 50000,
+    ]).astype(np.float64)
+
+
+def risk_vector(dti, rate):
+    """app._calculate_risk over arrays: (severity, risk_score)"""
+    conditions = [(dti > 50) | (rate >= 20), (dti > 40) | (rate >= 15), (dti > 30) | (rate >= 10)]
+    severity = np.select(conditions, ['critical', 'high', 'medium'], 'low')
+    score = np.select(conditions, [
+        np.minimum(99, 75 + np.maximum((dti - 50) / 2, rate - 20)),
+        np.minimum(85, 55 + np.maximum(dti - 40, (rate - 15) * 2)),
+        np.minimum(65, 35 + np.maximum(dti - 30, (rate - 10) * 2)),
+    ], np.maximum(10, 30 - (30 - dti) / 2))
+    return severity, score
+
+
+def score_columns(advisor, columns, surrogate=None):
+    """Score one chunk: {field: float array} -> {OUTPUT_COLUMNS name: array}
+
+    With a surrogate.LookupSurrogate, rows inside its grid skip the forests.
+    """
+    inputs, errors = prepare_inputs(columns)
+    loan, rate, term = inputs['loan_amount'], inputs['interest_rate'], inputs['term_months']
+    income = inputs['monthly_income']
+
+    payment = inputs['monthly_payment']
+    payment = np.where(payment <= 0, monthly_payments(loan, rate, term), payment)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dti = np.where(income > 0, payment / income * 100, 100)
+    monthly_interest = loan * (rate / 100 / 12)
+    total_interest = payment * term - loan
+
+    features = build_feature_matrix(
+        loan, rate, term, income, payment, dti, inputs['monthly_expenses'], inputs['emergency_months'],
+        inputs['age'], inputs['job_stability'], inputs['payment_history'], inputs['account_age'],
+        inputs['current_savings'],
+    )
+    valid = (errors == '') & np.isfinite(features).all(axis=1)
+    errors[(errors == '') & ~valid] = "invalid input"
+
+    n = len(loan)
+    outputs = {
+        'monthly_payment': np.round(payment, 2),
+        'dti_ratio': np.round(dti, 1),
+        'monthly_interest': np.round(monthly_interest),
+        'total_interest': np.round(total_interest),
+        'error': errors,
+    }
+    outputs['severity'], risk = risk_vector(dti, rate)
+    outputs['risk_score'] = np.round(risk)
+
+    regression = np.full((n, 16), np.nan)
+    codes = [np.full(n, -1) for _ in range(5)]
+    if valid.any():
+        if surrogate is not None:
+            predictions, _ = surrogate.predict_with_fallback(advisor, features[valid])
+        else:
+            predictions = predict_outputs(advisor, advisor['scaler'].transform(features[valid]))
+        regression[valid] = predictions[0]
+        for i, output in enumerate(predictions[1:]):
+            codes[i][valid] = output
+
+    for name, (index, low, high, decimals) in REGRESSION_OUTPUTS.items():
+        outputs[name] = np.round(np.clip(regression[:, index], low, high), decimals)
+    for name, code_index, labels_key, default in LABEL_OUTPUTS:
+        labels = advisor[labels_key]
+        outputs[name] = np.array([labels.get(int(code), default) if ok else '' for code, ok
+                                  in zip(codes[code_index - 1], valid)], dtype=object)
+    outputs['better_than_average'] = np.where(valid, codes[4].astype(bool), False)
+    return outputs
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WORKER PROCESS (tools/score_bulk.py --jobs)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def score_in_worker(columns, use_surrogate=False):
+    """score_columns() with the advisor loaded by inference._init_worker"""
+    import inference
+    advisor = inference._worker_advisor
+    return score_columns(advisor, columns, advisor.get('surrogate') if use_surrogate else None)
@@ -0,0 +1,188 @@
+"""
+FinLand Lookup Surrogate
+The advisor forests distilled into a lookup grid over their most important
+features, for the bulk and slider paths that need answers in microseconds.
+
+Each grid cell holds the forests' mean regression outputs and majority
+labels over the training rows that fell in it. Serving is a bin search per
+axis plus multilinear interpolation between cell centres; rows outside the
+grid, or in a cell with too few training rows, fall back to the forests.
+
+A grid over a few features cannot follow outputs that depend on the others,
+so evaluate() measures every output against the forests on held-out rows
+and only the ones within tolerance are served from the grid; the rest come
+from their own forest. A surrogate that was never evaluated serves nothing.
+Built by train_financial_advisor.py and stored in the model package.
+"""
+
+import numpy as np
+
+from inference import OUTPUT_MODELS, predict_outputs
+
+
+def important_features(advisor, k, X, bins):
+    """Indices of the `k` features the forests rely on most, among those with more than `bins` values"""
+    forests = list(advisor['regression_model'].estimators_) + [advisor[name] for name in OUTPUT_MODELS[1:]]
+    importance = sum(forest.feature_importances_ for forest in forests)
+    continuous = [f for f in range(X.shape[1]) if len(np.unique(X[:50_000, f])) > bins]
+    return sorted(continuous, key=lambda f: -importance[f])[:k]
+
+
+def forest_outputs(advisor, X, chunk_size=20_000):
+    """predict_outputs() over raw feature rows, chunked to bound memory"""
+    parts = [predict_outputs(advisor, advisor['scaler'].transform(X[start:start + chunk_size]))
+             for start in range(0, len(X), chunk_size)]
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+class LookupSurrogate:
+    """Quantile grid over a few raw features: regression means and labels per cell"""
+
+    # Set by evaluate(): which outputs the grid may serve (bool per regression
+    # target, and per label output in OUTPUT_MODELS[1:] order)
+    trusted_targets = None
+    trusted_labels = None
+
+    def __init__(self, advisor, X, features=None, k=4, bins=12, min_count=5):
+        self.features = list(features) if features is not None else important_features(advisor, k, X, bins)
+        columns = X[:, self.features]
+
+        # Quantile edges (equal training mass per bin); centres are the mean value in each bin
+        self.edges = [np.unique(np.quantile(column, np.linspace(0, 1, bins + 1))) for column in columns.T]
+        bin_index = [self._bin(column, edges) for column, edges in zip(columns.T, self.edges)]
+        self.shape = tuple(len(edges) - 1 for edges in self.edges)
+        self.centres = []
+        for index, column, edges in zip(bin_index, columns.T, self.edges):
+            n = len(edges) - 1
+            rows = np.bincount(index, minlength=n)
+            mean = np.bincount(index, weights=column, minlength=n) / np.maximum(rows, 1)
+            self.centres.append(np.where(rows > 0, mean, (edges[:-1] + edges[1:]) / 2))
+
+        cell = np.ravel_multi_index(bin_index, self.shape)
+        n_cells = int(np.prod(self.shape))
+        count = np.bincount(cell, minlength=n_cells)
+        supported = count >= min_count
+
+        outputs = forest_outputs(advisor, X)
+        regression = np.stack([np.bincount(cell, weights=target, minlength=n_cells) for target in outputs[0].T], axis=1)
+        regression /= np.maximum(count, 1)[:, None]
+        regression[~supported] = np.nan
+        self.regression = regression  # (n_cells, n_targets), cells in ravel_multi_index order
+
+        # Majority class per cell, -1 where unsupported
+        self.labels = []
+        for codes in outputs[1:]:
+            classes, index = np.unique(codes, return_inverse=True)
+            votes = np.bincount(cell * len(classes) + index, minlength=n_cells * len(classes))
+            majority = classes[votes.reshape(n_cells, len(classes)).argmax(axis=1)]
+            self.labels.append(np.where(supported, majority, -1))
+
+        # The 2^k corners of an interpolation cube, as 0/1 offsets per axis
+        self.corners = np.array(list(np.ndindex(*(2,) * len(self.features))), dtype=np.intp)
+        self.strides = np.array([int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape))], dtype=np.intp)
+        self.report = None
+
+    @staticmethod
+    def _bin(column, edges):
+        return np.clip(np.searchsorted(edges, column, side='right') - 1, 0, len(edges) - 2)
+
+    def predict(self, X):
+        """(outputs like predict_outputs(), covered mask); rows not covered, and the
+        outputs evaluate() did not trust, hold NaN / -1 (see complete())"""
+        columns = np.asarray(X, dtype=np.float64)[:, self.features]
+        covered = np.ones(len(columns), dtype=bool)
+        cell = np.zeros(len(columns), dtype=np.intp)
+        lower = np.empty(columns.shape, dtype=np.intp)
+        weight = np.empty(columns.shape)
+        for axis, (column, edges, centres) in enumerate(zip(columns.T, self.edges, self.centres)):
+            covered &= (column >= edges[0]) & (column <= edges[-1])
+            cell += self._bin(column, edges) * self.strides[axis]
+            # Position between the two nearest cell centres
+            i = np.clip(np.searchsorted(centres, column) - 1, 0, max(len(centres) - 2, 0))
+            span = centres[np.minimum(i + 1, len(centres) - 1)] - centres[i]
+            lower[:, axis] = i
+            weight[:, axis] = np.clip(np.divide(column - centres[i], span, out=np.zeros_like(column),
+                                                where=span > 0), 0, 1)
+
+        # Labels: the row's own cell. Regression: multilinear over the 2^k surrounding
+        # centres, or the row's own cell when one of them is unsupported
+        labels = [grid[cell] for grid in self.labels]
+        corner_cells = np.minimum(lower[:, None, :] + self.corners, np.array(self.shape) - 1) @ self.strides
+        corner_weights = np.where(self.corners, weight[:, None, :], 1 - weight[:, None, :]).prod(axis=2)
+        regression = np.einsum('nc,nct->nt', corner_weights, self.regression[corner_cells])
+        own = np.isnan(regression).any(axis=1)
+        regression[own] = self.regression[cell[own]]
+
+        covered &= ~np.isnan(regression).any(axis=1)
+        for codes in labels:
+            covered &= codes >= 0
+        if self.trusted_targets is None:
+            covered[:] = False
+        else:
+            regression[:, ~self.trusted_targets] = np.nan
+            labels = [codes if trusted else np.full_like(codes, -1)
+                      for codes, trusted in zip(labels, self.trusted_labels)]
+        regression[~covered] = np.nan
+        return (regression, *(np.where(covered, codes, -1) for codes in labels)), covered
+
+    @property
+    def fully_trusted(self):
+        return self.trusted_targets is not None and self.trusted_targets.all() and all(self.trusted_labels)
+
+    def complete(self, advisor, X, outputs, rows):
+        """Fill the untrusted outputs of `rows` (covered rows) in place from their own forests"""
+        if self.fully_trusted or not rows.any():
+            return outputs
+        scaled = advisor['scaler'].transform(X[rows])
+        forests = advisor['regression_model'].estimators_
+        for target in np.flatnonzero(~self.trusted_targets):
+            outputs[0][rows, target] = forests[target].predict(scaled)
+        for name, codes, trusted in zip(OUTPUT_MODELS[1:], outputs[1:], self.trusted_labels):
+            if not trusted:
+                codes[rows] = advisor[name].predict(scaled)
+        return outputs
+
+    def predict_with_fallback(self, advisor, X):
+        """Surrogate outputs where covered and trusted, the forests' everywhere else; returns (outputs, covered)"""
+        outputs, covered = self.predict(X)
+        self.complete(advisor, X, outputs, covered)
+        if not covered.all():
+            missing = ~covered
+            forest = predict_outputs(advisor, advisor['scaler'].transform(X[missing]))
+            for merged, values in zip(outputs, forest):
+                merged[missing] = values
+        return outputs, covered
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ACCURACY REPORT
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def evaluate(self, advisor, X, target_names=None, tolerance=0.1, min_agreement=0.95):
+        """Accuracy loss against the forests on held-out rows (stored as self.report).
+
+        A regression target is served from the grid only when its MAE is at most
+        `tolerance` times the forests' own spread of that target; a label only
+        when it agrees with the forest on `min_agreement` of the rows.
+        """
+        self.trusted_targets = np.ones(self.regression.shape[1], dtype=bool)
+        self.trusted_labels = [True] * len(self.labels)
+        outputs, covered = self.predict(X)
+        forest = forest_outputs(advisor, X[covered])
+        mae = np.abs(outputs[0][covered] - forest[0]).mean(axis=0)
+        std = forest[0].std(axis=0)
+        agreement = [float((codes[covered] == reference).mean()) for codes, reference in zip(outputs[1:], forest[1:])]
+
+        self.trusted_targets = mae <= tolerance * std
+        self.trusted_labels = [value >= min_agreement for value in agreement]
+        names = target_names or [f"target_{i}" for i in range(len(mae))]
+        self.report = {
+            "coverage": float(covered.mean()),
+            "tolerance": tolerance,
+            "min_agreement": min_agreement,
+            "regression_mae": dict(zip(names, mae.tolist())),
+            "regression_forest_std": dict(zip(names, std.tolist())),
+            "label_agreement": dict(zip(OUTPUT_MODELS[1:], agreement)),
+            "served_from_grid": [name for name, trusted in zip(names, self.trusted_targets) if trusted]
+            + [name for name, trusted in zip(OUTPUT_MODELS[1:], self.trusted_labels) if trusted],
+        }
+        return self.report
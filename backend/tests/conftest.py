@@ -0,0 +1,36 @@
+"""
+Backend tests run from backend/ (python -m pytest -q) against the modules
+as the servers import them: flat, with backend/ on sys.path.
+"""
+
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# No warmup thread, rate limits, request log file or shared-memory limiter
+os.environ.setdefault('WARMUP', 'off')
+os.environ.setdefault('RATELIMIT_ENABLED', '0')
+os.environ.setdefault('REQUEST_LOG', '0')
+os.environ.setdefault('RATELIMIT_STORAGE_URI', 'memory://')
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def advisor():
+    """Small model package with the real one's structure (benchmarks/fixtures.py)"""
+    from benchmarks.fixtures import build_small_advisor
+    return build_small_advisor(n_samples=800, n_estimators=10, max_depth=6)
+
+
+@pytest.fixture
+def analyze_client(advisor, monkeypatch):
+    """Test client serving ai-analyze from `advisor`, with fresh lazily-built helpers"""
+    import app as flask_app
+    monkeypatch.setattr(flask_app, '_financial_advisor', advisor)
+    monkeypatch.setattr(flask_app, '_advisor_loaded', True)
+    for cached in ('_regression_forest', '_forest_explainer', '_drift_monitor', '_inference_pool'):
+        monkeypatch.setattr(flask_app, cached, None)
+    return flask_app.app.test_client()
@@ -0,0 +1,56 @@
+"""get_financial_advisor: one load, and no caller sees None while it runs"""
+
+import sys
+import threading
+import types
+
+import app as flask_app
+
+MODEL = {"training_samples": 1}
+
+
+def test_concurrent_caller_waits_for_the_model(monkeypatch, tmp_path):
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b"")
+    monkeypatch.setenv('MODEL_PATH', str(model_path))
+    monkeypatch.setattr(flask_app, '_financial_advisor', None)
+    monkeypatch.setattr(flask_app, '_advisor_loaded', False)
+
+    loading, release = threading.Event(), threading.Event()
+    loads = []
+
+    def slow_load(path):
+        loads.append(path)
+        loading.set()
+        assert release.wait(10)
+        return MODEL
+
+    monkeypatch.setitem(sys.modules, 'joblib', types.SimpleNamespace(load=slow_load))
+
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault('first', flask_app.get_financial_advisor()))
+    first.start()
+    assert loading.wait(10)
+
+    second = threading.Thread(target=lambda: results.setdefault('second', flask_app.get_financial_advisor()))
+    second.start()
+    second.join(0.2)
+    # Still loading: the second caller blocks on the lock instead of getting None
+    assert second.is_alive() and 'second' not in results
+
+    release.set()
+    first.join(10)
+    second.join(10)
+    assert results == {'first': MODEL, 'second': MODEL}
+    assert loads == [str(model_path)]
+    assert flask_app.get_financial_advisor() is MODEL
+
+
+def test_failed_load_is_not_retried(monkeypatch, tmp_path):
+    monkeypatch.setenv('MODEL_PATH', str(tmp_path / "missing.pkl"))
+    monkeypatch.setenv('MODEL_URL', '')
+    monkeypatch.setattr(flask_app, '_financial_advisor', MODEL)
+    monkeypatch.setattr(flask_app, '_advisor_loaded', False)
+
+    assert flask_app.get_financial_advisor() is None
+    assert flask_app._advisor_loaded
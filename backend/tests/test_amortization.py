@@ -0,0 +1,163 @@
+"""Integer-satang schedules: reconciliation, exact close, and the float loop they replaced"""
+
+import random
+import warnings
+
+import numpy as np
+import pytest
+
+from amortization import MAX_MONTHS, credit_card_schedule, event_schedule, fixed_payment_schedule, \
+    student_loan_schedule, to_satang
+
+
+def old_credit_card_loop(balance, apr, monthly_payment):
+    """The route's month-by-month float loop before schedules moved to satang"""
+    monthly_rate = apr / 100 / 12
+    rows, current_balance = [], balance
+    while current_balance > 0 and len(rows) < MAX_MONTHS:
+        interest = current_balance * monthly_rate
+        principal = min(monthly_payment - interest, current_balance)
+        current_balance -= principal
+        rows.append((interest + principal, interest, principal, max(0, current_balance)))
+    return np.array(rows)
+
+
+def credit_card_cases(n, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        balance = round(rng.uniform(1000, 2_000_000), 2)
+        apr = round(rng.uniform(0, 36), 2)
+        # 1.01x the first month's interest (the route's minimum) up to a few months' payoff
+        low = balance * apr / 1200 * 1.01 + 1
+        yield balance, apr, round(rng.uniform(low, max(low * 3, balance / 3)), 2)
+
+
+def assert_reconciles(schedule, principal, paid_off=True):
+    opening = np.concatenate(([principal], schedule.remaining[:-1]))
+    np.testing.assert_array_equal(schedule.payment, schedule.interest + schedule.principal)
+    np.testing.assert_array_equal(schedule.principal, opening - schedule.remaining)
+    if paid_off:
+        assert schedule.remaining[-1] == 0
+        assert schedule.principal.sum() == principal
+    assert (schedule.interest >= 0).all()
+    assert (schedule.remaining[:-1] > 0).all()
+
+
+@pytest.mark.parametrize("balance, apr, payment", list(credit_card_cases(200)))
+def test_credit_card_matches_the_old_loop(balance, apr, payment):
+    schedule = credit_card_schedule(balance, apr, payment)
+    assert_reconciles(schedule, to_satang(balance), paid_off=schedule.months < MAX_MONTHS)
+
+    old = old_credit_card_loop(balance, apr, payment)
+    assert schedule.months == len(old)
+    columns = np.stack([schedule.payment, schedule.interest, schedule.principal, schedule.remaining], axis=1) / 100
+    # Same balances to the satang (the float loop is unrounded); the last row settles the rest
+    np.testing.assert_allclose(columns[:-1, 3], old[:-1, 3], atol=0.0051 + 1e-9 * balance)
+    np.testing.assert_allclose(columns[:-1, 1], old[:-1, 1], atol=0.0101 + 1e-9 * balance)
+    assert columns[-1, 0] == pytest.approx(old[-1, 0], abs=0.02)
+
+
+def per_period_loop(principal, apr, term):
+    """Bank-style month by month in integer satang: each month's interest is
+    rounded on its opening balance and the payment is re-levelled over the
+    months left, so no month's rounding compounds into the last payment"""
+    r = apr / 1200
+    rows, balance = [], principal
+    for month in range(1, term + 1):
+        interest, left = round(balance * r), term - month + 1
+        if left == 1:
+            payment = balance + interest
+        elif r:
+            payment = round(balance * r / (1 - (1 + r) ** -left))
+        else:
+            payment = round(balance / left)
+        balance -= payment - interest
+        rows.append((payment, interest, balance))
+    return np.array(rows, dtype=np.int64).T
+
+
+def residual_bound(apr, term):
+    """Largest balance error from rounding the level payment: half a satang a month, never compounded"""
+    r = apr / 1200
+    return 0.5 * ((1 - (1 + r) ** -term) / r if r else term)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_term_loans_close_at_exactly_zero(seed):
+    rng = random.Random(seed)
+    loan, rate, term = round(rng.uniform(10_000, 5_000_000), 2), rng.choice([0, 1, 2.5, 7, 15.99, 36, 100]), rng.randint(1, 600)
+    payment, schedule = student_loan_schedule(loan, rate, term)
+    assert schedule.months == term
+    assert_reconciles(schedule, to_satang(loan))
+    # Rounding the level payment to the satang only moves the last payment
+    assert (schedule.payment[:-1] == payment).all()
+    assert abs(schedule.payment[-1] - payment) <= residual_bound(rate, term) * (1 + rate / 1200) + 2
+
+
+@pytest.mark.parametrize("rate", [0, 1, 7, 15.99, 20, 25, 36, 40, 50, 75, 100])
+@pytest.mark.parametrize("term", [1, 12, 120, 360, 480, 600])
+def test_term_loans_match_the_per_period_loop(rate, term):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for loan in (10_000, 1_000_000, 50_000_000, 1e12):
+            payment, schedule = student_loan_schedule(loan, rate, term)
+            expected_payment, interest, remaining = per_period_loop(to_satang(loan), rate, term)
+
+            assert schedule.months == term
+            assert_reconciles(schedule, to_satang(loan))
+            # Every month's interest within 2 satang of rounding it on that month's balance
+            np.testing.assert_allclose(schedule.interest, interest, atol=2)
+            # Balances apart by the payment's rounding plus the loop's own re-levelling drift
+            slack = residual_bound(rate, term) + term / 10 + 2
+            np.testing.assert_allclose(schedule.remaining, remaining, atol=slack)
+            assert abs(schedule.payment[-1] - expected_payment[-1]) <= slack
+            assert abs(int(schedule.interest.sum()) - int(interest.sum())) <= term
+
+
+def test_high_rate_long_term_loans_stay_level():
+    for loan, rate, term in ((10_000, 25, 600), (1_000_000, 40, 600), (10_000, 50, 480), (10_000, 100, 600)):
+        payment, schedule = student_loan_schedule(loan, rate, term)
+        assert schedule.months == term
+        assert schedule.payment[-1] == pytest.approx(payment, abs=100)
+        level = loan * 100 * (rate / 1200) / (1 - (1 + rate / 1200) ** -term)
+        assert schedule.total_interest == pytest.approx((level * term - loan * 100) / 100, abs=5)
+
+
+def test_runaway_balances_do_not_overflow():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        schedule = credit_card_schedule(500, 99, 400)               # 8.25% a month
+        assert schedule.months == 2 and schedule.remaining[-1] == 0
+        never = fixed_payment_schedule(to_satang(1e12), 1.0, 100)   # payment below interest
+        assert never.months == MAX_MONTHS
+
+
+def random_events(rng, term):
+    events = []
+    for _ in range(rng.randint(0, 6)):
+        month, kind = rng.randint(1, term), rng.choice(['rate_change', 'extra_payment', 'payment_holiday'])
+        if kind == 'rate_change':
+            events.append({"month": month, "type": kind, "rate": rng.uniform(0, 20), "recast": rng.random() < 0.7})
+        elif kind == 'extra_payment':
+            events.append({"month": month, "type": kind, "amount": rng.randint(1, 50_000_00),
+                           "recast": rng.random() < 0.3})
+        else:
+            events.append({"month": month, "type": kind, "months": rng.randint(1, 12),
+                           "capitalize": rng.random() < 0.7})
+    return sorted(events, key=lambda event: event['month'])
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_event_schedules_reconcile_and_close(seed):
+    rng = random.Random(seed)
+    principal, term = rng.randint(10_000_00, 5_000_000_00), rng.randint(6, 360)
+    events = random_events(rng, term)
+    schedule, summaries = event_schedule(principal, rng.uniform(0, 18), term, events)
+
+    assert 1 <= schedule.months <= term
+    opening = np.concatenate(([principal], schedule.remaining[:-1]))
+    np.testing.assert_array_equal(schedule.payment, schedule.interest + schedule.principal)
+    np.testing.assert_array_equal(schedule.principal, opening - schedule.remaining)
+    assert schedule.remaining[-1] == 0 and schedule.principal.sum() == principal
+    assert summaries[0]["start_month"] == 1 and summaries[-1]["end_month"] == schedule.months
+    assert sum(summary["interest"] for summary in summaries) == pytest.approx(schedule.total_interest)
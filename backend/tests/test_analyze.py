@@ -0,0 +1,111 @@
+"""ai-analyze predictions, prediction intervals and their single tree traversal"""
+
+import queue
+import threading
+
+import numpy as np
+import pytest
+
+import app as flask_app
+from forest import RegressionForest
+from inference import InferenceBusy, InferencePool, predict_outputs, predict_with_intervals
+
+ANALYZE_INPUT = {
+    "loan_amount": 250000, "interest_rate": 16, "term_months": 48, "monthly_income": 32000,
+    "monthly_expenses": 15000, "emergency_months": 2, "age": 29, "current_savings": 40000,
+}
+
+
+@pytest.fixture(scope='module')
+def rows(advisor):
+    rng = np.random.default_rng(7)
+    return advisor['scaler'].transform(rng.lognormal(2.0, 1.5, size=(40, 30)))
+
+
+def test_single_traversal_matches_the_forests(advisor, rows):
+    forest = RegressionForest(advisor['regression_model'])
+    levels = [0.8] * 20 + [None] * 10 + [0.5] * 10
+    outputs, low, high = predict_with_intervals(advisor, forest, rows, levels)
+
+    for got, expected in zip(outputs, predict_outputs(advisor, rows)):
+        np.testing.assert_allclose(got, expected, rtol=1e-12, atol=1e-9)
+    for level, part in ((0.8, slice(0, 20)), (0.5, slice(30, 40))):
+        _, expected_low, expected_high = forest.predict_interval(rows[part], level)
+        np.testing.assert_array_equal(low[part], expected_low)
+        np.testing.assert_array_equal(high[part], expected_high)
+    assert np.isnan(low[20:30]).all() and np.isnan(high[20:30]).all()
+
+
+def test_intervals_cost_one_traversal(analyze_client, monkeypatch):
+    traversals = []
+    per_tree = RegressionForest.per_tree
+    monkeypatch.setattr(RegressionForest, 'per_tree', lambda self, X: traversals.append(len(X)) or per_tree(self, X))
+
+    with_intervals = analyze_client.post('/api/ai-analyze', json=ANALYZE_INPUT).get_json()
+    assert traversals == [1]
+    without = analyze_client.post('/api/ai-analyze', json={**ANALYZE_INPUT, 'intervals': False}).get_json()
+    assert traversals == [1, 1]
+
+    intervals = with_intervals.pop('prediction_intervals')
+    assert with_intervals == without
+    assert intervals['level'] == 0.8
+    health = with_intervals['financial_health']['health_score']
+    assert intervals['health_score'][0] <= health <= intervals['health_score'][1]
+
+
+@pytest.fixture(scope='module')
+def pool(advisor, tmp_path_factory):
+    import joblib
+    path = tmp_path_factory.mktemp('model') / 'advisor.pkl'
+    joblib.dump(advisor, path)
+    pool = InferencePool(str(path), advisor=advisor, workers=1, timeout=60)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_computes_intervals_in_the_worker(analyze_client, pool, monkeypatch):
+    in_thread = analyze_client.post('/api/ai-analyze', json=ANALYZE_INPUT).get_json()
+
+    traversals = []
+    monkeypatch.setattr(RegressionForest, 'per_tree', lambda self, X: traversals.append(len(X)))
+    monkeypatch.setattr(flask_app, '_inference_pool', pool)
+    pooled = analyze_client.post('/api/ai-analyze', json=ANALYZE_INPUT).get_json()
+    without = analyze_client.post('/api/ai-analyze', json={**ANALYZE_INPUT, 'intervals': False}).get_json()
+
+    assert traversals == []
+    assert pooled == in_thread
+    assert 'prediction_intervals' not in without
+
+
+def test_pool_timeout_is_busy_not_an_error(analyze_client, pool, monkeypatch):
+    # A queue the dispatcher never reads: the row is never scored
+    monkeypatch.setattr(pool, '_queue', queue.Queue())
+    monkeypatch.setattr(pool, 'timeout', 0.05)
+    monkeypatch.setattr(flask_app, '_inference_pool', pool)
+    rejected = pool.rejected
+
+    response = analyze_client.post('/api/ai-analyze', json=ANALYZE_INPUT)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert pool.rejected == rejected + 1
+    _, _, future = pool._queue.get_nowait()
+    assert future.cancelled()
+
+
+def test_pool_counts_every_rejection(pool, monkeypatch):
+    full = queue.Queue(maxsize=1)
+    full.put(None)
+    monkeypatch.setattr(pool, '_queue', full)
+    rejected = pool.rejected
+
+    def reject(times):
+        for _ in range(times):
+            with pytest.raises(InferenceBusy):
+                pool.predict(None)
+
+    threads = [threading.Thread(target=reject, args=(2000,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.rejected == rejected + 16000
@@ -0,0 +1,72 @@
+"""Answer cache: exact by default, paraphrase matches gated on negation/numbers/topics"""
+
+import pytest
+
+import app as flask_app
+from chat_cache import AnswerCache, context_bucket, cosine, normalize_question, vectorize
+
+BUCKET = context_bucket(50000, 18, 2000, 30000, 6.7)
+
+# Different questions whose n-gram vectors are close enough that they used to
+# share one answer at the old 0.85 default
+DIFFERENT_QUESTIONS = [
+    ("Should I pay off my credit card first?", "Should I not pay off my credit card first?"),
+    ("ควรปิดบัตรเครดิตก่อนดีไหม", "ไม่ควรปิดบัตรเครดิตก่อนดีไหม"),
+    ("Should I use a credit card to pay my bills?", "Should I use a loan to pay my bills?"),
+    ("Should I refinance my car loan?", "Should I refinance my home loan?"),
+    ("How much should I save every month?", "How much should I pay every month?"),
+    ("Can I pay 2000 a month?", "Can I pay 3000 a month?"),
+]
+
+
+def similarity(a, b):
+    return cosine(vectorize(normalize_question(a)), vectorize(normalize_question(b)))
+
+
+def test_default_cache_only_matches_the_same_question():
+    cache = AnswerCache()
+    cache.put("Should I pay off my credit card first?", BUCKET, "answer", "model")
+
+    assert cache.get("should i pay off my credit card first", BUCKET) == ("answer", "model")
+    assert cache.get("Should I pay off my credit card first, please?", BUCKET) is None
+    assert cache.get("Should I pay off my credit card first?", context_bucket(90000, 18, 2000, 30000, 6.7)) is None
+
+
+def test_thai_polite_particles_are_the_same_question():
+    cache = AnswerCache()
+    cache.put("ควรปิดบัตรเครดิตก่อนดีไหมครับ", BUCKET, "answer", "model")
+    assert cache.get("ควรปิดบัตรเครดิตก่อนดีไหมคะ", BUCKET) == ("answer", "model")
+
+
+@pytest.mark.parametrize("cached, asked", DIFFERENT_QUESTIONS)
+def test_near_match_never_crosses_negation_numbers_or_topics(cached, asked):
+    assert similarity(cached, asked) >= 0.8
+    cache = AnswerCache(similarity=0.8)
+    cache.put(cached, BUCKET, "answer", "model")
+    assert cache.get(asked, BUCKET) is None
+    assert cache.stats()["similar_hits"] == 0
+
+
+def test_near_match_reuses_a_rewording():
+    cache = AnswerCache(similarity=0.95)
+    cache.put("What is the best way to pay off my credit card debt?", BUCKET, "answer", "model")
+    assert cache.get("Whats the best way to pay off my credit card debt", BUCKET) == ("answer", "model")
+    assert cache.stats()["similar_hits"] == 1
+
+
+class FakeGemini:
+    def generate(self, prompt):
+        return f"advice for: {prompt.split('คำถาม: ')[1].splitlines()[0]}", 'fake-model'
+
+
+@pytest.mark.parametrize("first, second", DIFFERENT_QUESTIONS[:4])
+def test_ai_chat_answers_each_different_question(monkeypatch, first, second):
+    monkeypatch.setattr(flask_app, 'get_gemini_client', lambda: FakeGemini())
+    monkeypatch.setattr(flask_app, 'chat_cache', AnswerCache(similarity=0.85))
+    client = flask_app.app.test_client()
+    context = {"balance": 50000, "apr": 18, "payment": 2000, "monthly_income": 30000}
+
+    answers = [client.post('/api/ai-chat', json={"question": question, **context}).get_json()
+               for question in (first, second, second)]
+    assert [answer["cached"] for answer in answers] == [False, False, True]
+    assert answers[1]["answer"] == f"advice for: {second}"
@@ -0,0 +1,51 @@
+"""Calculator ETags and 304s across compressed representations"""
+
+import pytest
+
+import app as flask_app
+import responses
+
+URL = '/api/calculate/credit-card?balance=50000&apr=18&monthly_payment=1500'
+
+
+@pytest.fixture
+def client():
+    return flask_app.app.test_client()
+
+
+@pytest.mark.parametrize("encoding", [
+    'gzip',
+    pytest.param('br', marks=pytest.mark.skipif(responses.brotli is None, reason="Brotli not installed")),
+])
+def test_304_echoes_the_compressed_variant_the_client_holds(client, encoding):
+    first = client.get(URL, headers={'Accept-Encoding': encoding})
+    assert first.status_code == 200 and first.headers['Content-Encoding'] == encoding
+    etag = first.headers['ETag']
+    assert etag.endswith(f'-{encoding}"')
+
+    again = client.get(URL, headers={'Accept-Encoding': encoding, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_304_for_an_uncompressed_etag(client):
+    etag = client.get(URL).headers['ETag']
+    again = client.get(URL, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_304_prefers_the_variant_this_request_negotiates(client):
+    bare = client.get(URL).headers['ETag'].strip('"')
+    held = f'"{bare}", "{bare}-gzip"'
+    again = client.get(URL, headers={'Accept-Encoding': 'gzip', 'If-None-Match': held})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == f'"{bare}-gzip"'
+
+
+def test_other_results_are_not_304(client):
+    etag = client.get(URL, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    other = client.get(URL.replace('1500', '1600'), headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert other.status_code == 200
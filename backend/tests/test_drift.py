@@ -0,0 +1,64 @@
+"""Input drift scores (PSI, binned KS) and the features left out of them"""
+
+import numpy as np
+import pytest
+
+import app as flask_app
+from drift import DriftMonitor, ReferenceSketch
+
+NAMES = ['steady', 'shifted', 'skewed']
+
+
+@pytest.fixture(scope='module')
+def reference():
+    rng = np.random.default_rng(11)
+    return ReferenceSketch(rng.normal(size=(200_000, 3)), NAMES)
+
+
+def monitor_with(reference, served, exclude=()):
+    monitor = DriftMonitor(reference, exclude)
+    for start in range(0, len(served), 1000):
+        monitor.update(served[start:start + 1000])
+    return monitor.scores()
+
+
+def test_same_distribution_is_stable(reference):
+    served = np.random.default_rng(12).normal(size=(20_000, 3))
+    scores = monitor_with(reference, served)
+    assert scores['samples'] == 20_000 and scores['drifted'] == []
+    assert scores['max_psi'] < 0.01
+    assert all(feature['ks'] < 0.02 for feature in scores['features'].values())
+
+
+def test_known_shift(reference):
+    served = np.random.default_rng(13).normal(size=(20_000, 3))
+    served[:, 1] += 1.0     # one standard deviation
+    scores = monitor_with(reference, served)
+
+    shifted = scores['features']['shifted']
+    # N(0,1) vs N(1,1): PSI (symmetric KL) is 1.0 unbinned, KS is 2*Phi(0.5) - 1 = 0.383
+    assert 0.8 < shifted['psi'] < 1.05
+    assert shifted['ks'] == pytest.approx(0.383, abs=0.02)
+    assert scores['drifted'] == ['shifted'] and scores['max_psi'] == shifted['psi']
+    assert scores['features']['steady']['status'] == 'stable'
+
+
+def test_excluded_features_are_not_scored(reference):
+    served = np.random.default_rng(14).normal(size=(5_000, 3))
+    served[:, 2] = 1.0      # built as a constant by the server, unlike training
+    assert monitor_with(reference, served)['drifted'] == ['skewed']
+
+    scores = monitor_with(reference, served, exclude=(2,))
+    assert list(scores['features']) == ['steady', 'shifted'] and scores['drifted'] == []
+
+
+def test_ai_analyze_skips_features_it_builds_differently(analyze_client, advisor, monkeypatch):
+    names = [f'feature_{i}' for i in range(30)]
+    rng = np.random.default_rng(15)
+    monkeypatch.setitem(advisor, 'reference_sketch', ReferenceSketch(rng.lognormal(2, 1.5, (5000, 30)), names))
+    analyze_client.post('/api/ai-analyze', json={"loan_amount": 250000, "monthly_income": 32000})
+
+    scores = analyze_client.get('/api/drift').get_json()
+    assert scores['samples'] == 1
+    assert {'feature_6', 'feature_19'}.isdisjoint(scores['features'])
+    assert len(scores['features']) == 28
@@ -0,0 +1,181 @@
+"""Circuit breaker half-open trial and hedged-stream cleanup (llm.py)"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm import AsyncGeminiClient, CircuitBreaker, GeminiClient, LLMUnavailable
+
+
+def open_breaker(cooldown=0.05):
+    breaker = CircuitBreaker(threshold=1, cooldown=cooldown)
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+    time.sleep(cooldown * 1.5)
+    return breaker
+
+
+def test_half_open_admits_exactly_one_trial():
+    breaker = open_breaker()
+    start = threading.Barrier(16)
+    admitted = []
+
+    def caller():
+        start.wait()
+        admitted.append(breaker.allow())
+
+    threads = [threading.Thread(target=caller) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert admitted.count(True) == 1
+    assert breaker.state == 'half-open'
+
+
+def test_trial_outcome_closes_or_reopens():
+    breaker = open_breaker()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    time.sleep(0.08)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow() and breaker.allow()
+
+
+def test_released_trial_lets_the_next_caller_probe():
+    breaker = open_breaker()
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SYNC CLIENT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class Upstream:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class StreamResponse:
+    """What _open_stream holds on to: the SDK response and its transport iterator"""
+
+    def __init__(self):
+        self._iterator = Upstream()
+
+
+def fake_open_stream(delays, opened):
+    def open_stream(name, prompt):
+        time.sleep(delays[name])
+        response = StreamResponse()
+        opened[name] = response
+        chunks = (Chunk(text) for text in [f"{name} more"])
+        return f"{name} first", chunks, response
+    return open_stream
+
+
+def sync_client(models, **settings):
+    return GeminiClient('test-key', models=models, attempt_timeout=5.0, deadline=5.0, **settings)
+
+
+def test_losing_hedged_stream_is_closed():
+    client = sync_client(['slow', 'fast'], hedge_after=0.02)
+    opened = {}
+    client._open_stream = fake_open_stream({'slow': 0.3, 'fast': 0.0}, opened)
+
+    chunks = list(client.stream('prompt'))
+    assert chunks == [('fast', 'fast first'), ('fast', 'fast more')]
+    assert opened['fast']._iterator.closed
+
+    deadline = time.monotonic() + 2
+    while 'slow' not in opened or not opened['slow']._iterator.closed:
+        assert time.monotonic() < deadline, "losing hedge's stream was never closed"
+        time.sleep(0.01)
+    assert client.breakers['slow'].state == 'closed'
+
+
+def test_abandoned_stream_is_closed_when_the_reader_stops():
+    client = sync_client(['only'])
+    opened = {}
+    client._open_stream = fake_open_stream({'only': 0.0}, opened)
+
+    stream = client.stream('prompt')
+    assert next(stream) == ('only', 'only first')
+    stream.close()
+    assert opened['only']._iterator.closed
+
+
+def test_concurrent_requests_share_one_half_open_trial():
+    client = sync_client(['model'], breaker_threshold=1, breaker_cooldown=0.05)
+    client.breakers['model'].record_failure()
+    time.sleep(0.08)
+
+    release = threading.Event()
+    calls = []
+
+    def slow_call(name, prompt):
+        calls.append(name)
+        release.wait(2)
+        return 'answer'
+
+    client._call = slow_call
+    results = []
+    trial = threading.Thread(target=lambda: results.append(client.generate('prompt')))
+    trial.start()
+    while not calls:
+        time.sleep(0.005)
+
+    with pytest.raises(LLMUnavailable):
+        client.generate('prompt')
+    release.set()
+    trial.join()
+    assert results == [('answer', 'model')]
+    assert calls == ['model']
+    assert client.breakers['model'].state == 'closed'
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ASYNC CLIENT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_async_losing_hedge_is_cancelled_and_releases_its_trial():
+    async def run():
+        client = AsyncGeminiClient('test-key', models=['slow', 'fast'], attempt_timeout=5.0, deadline=5.0,
+                                   hedge_after=0.02, breaker_threshold=1, breaker_cooldown=0.05)
+        client.breakers['slow'].record_failure()
+        await asyncio.sleep(0.08)
+        cancelled = []
+
+        async def attempt(name, prompt):
+            if name == 'fast':
+                return 'fast answer'
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            return 'slow answer'
+
+        result = await client._first_success(attempt, 'prompt')
+        await asyncio.sleep(0)
+        await client.aclose()
+        return result, cancelled, client.breakers['slow']
+
+    result, cancelled, slow = asyncio.run(run())
+    assert result == ('fast answer', 'fast')
+    assert cancelled == ['slow']
+    assert slow.state == 'half-open' and slow.allow()
@@ -0,0 +1,263 @@
+"""event_schedule against a month-by-month walk of its rules, and the loan-schedule route"""
+
+import random
+import warnings
+
+import numpy as np
+import pytest
+
+import app as flask_app
+from amortization import MAX_BALANCE, annuity_payment, event_schedule
+
+PRINCIPAL = 1_000_000_00     # satang
+RATE = 6.0
+TERM = 120
+
+
+def level_payment(balance, monthly_rate, months):
+    if monthly_rate == 0:
+        return round(balance / months)
+    return round(balance * monthly_rate / (1 - (1 + monthly_rate) ** -months))
+
+
+def per_month_schedule(principal, annual_rate, term, events):
+    """(payment, interest, remaining, spread) per month, stepping every month in integer satang.
+
+    Each month's interest is rounded on that month's balance. While the
+    payment is levelled (from the start, after a recast or a holiday) it is
+    re-levelled every month over the months left, so rounding never
+    compounds; a rate change or extra payment without a recast keeps the last
+    payment. `spread` is how far a satang of rounding can have grown by then.
+    """
+    rate = annual_rate / 1200
+    balance = principal
+    levelled, due, kept = True, False, level_payment(principal, rate, term)
+    holiday_until, capitalize = None, True
+    rows, spread = [], 1.0
+    for month in range(1, term + 1):
+        keep = False
+        for event in events:
+            if event['month'] != month:
+                continue
+            if event['type'] == 'rate_change':
+                rate = event['rate'] / 1200
+                if event.get('recast', True):
+                    due = True
+                else:
+                    keep = True
+            elif event['type'] == 'payment_holiday':
+                holiday_until, capitalize = month + event['months'] - 1, event.get('capitalize', True)
+        in_holiday = holiday_until is not None and month <= holiday_until
+        if holiday_until is not None and month == holiday_until + 1:
+            due = True
+        if due and not in_holiday:
+            levelled, due = True, False
+        elif keep and not due:
+            levelled = False
+        # Rounding compounds in a holiday or under a kept payment; re-levelling only stops the growth
+        spread = spread * (1 + rate) + 1 if in_holiday or not levelled else spread + 0.1
+
+        if in_holiday:
+            payment, interest = 0, round(balance * rate) if capitalize else 0
+        else:
+            interest = round(balance * rate)
+            payment = kept = level_payment(balance, rate, term - month + 1) if levelled else kept
+        if month == term or (payment and balance + interest <= payment):
+            rows.append((balance + interest, interest, 0, spread))
+            break
+        balance += interest - payment
+        extras = [event for event in events if event['month'] == month and event['type'] == 'extra_payment']
+        extra = min(sum(event['amount'] for event in extras), balance)
+        balance -= extra
+        rows.append((payment + extra, interest, balance, spread))
+        if balance == 0:
+            break
+        if extra:
+            if any(event.get('recast', False) for event in extras):
+                due = True
+            else:
+                levelled = False
+    return [np.array(column) for column in zip(*rows)]
+
+
+def assert_matches_reference(principal, annual_rate, term, events):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        schedule, summaries = event_schedule(principal, annual_rate, term, events)
+    payment, interest, remaining, spread = per_month_schedule(principal, annual_rate, term, events)
+    assert schedule.months == len(payment)
+    if max(payment.max(), remaining.max()) > MAX_BALANCE:
+        # A balance that outgrows int64 satang is clipped, never wrapped
+        assert schedule.remaining.max() <= MAX_BALANCE and (schedule.interest >= 0).all()
+        return schedule, summaries
+    tolerance = 100 + 5 * spread
+    for got, expected in ((schedule.payment, payment), (schedule.interest, interest), (schedule.remaining, remaining)):
+        expected = expected.astype(np.float64)
+        assert (np.abs(got - expected) <= tolerance + 1e-9 * np.abs(expected)).all()
+    return schedule, summaries
+
+
+def test_no_events_is_a_level_payment_loan():
+    schedule, summaries = assert_matches_reference(PRINCIPAL, RATE, TERM, [])
+    assert schedule.months == TERM and len(summaries) == 1
+    assert (schedule.payment[:-1] == annuity_payment(PRINCIPAL, RATE / 1200, TERM)).all()
+
+
+def test_holiday_capitalizes_interest_then_recasts():
+    holiday = {"month": 13, "type": "payment_holiday", "months": 6}
+    schedule, summaries = assert_matches_reference(PRINCIPAL, RATE, TERM, [holiday])
+    level = annuity_payment(PRINCIPAL, RATE / 1200, TERM)
+
+    assert (schedule.payment[12:18] == 0).all()
+    assert (np.diff(schedule.remaining[11:18]) > 0).all()        # interest added to the balance
+    assert schedule.payment[18] > level
+    assert schedule.months == TERM
+    assert [s["start_month"] for s in summaries] == [1, 13, 19]
+
+
+def test_holiday_without_capitalization_freezes_the_balance():
+    holiday = {"month": 13, "type": "payment_holiday", "months": 6, "capitalize": False}
+    schedule, summaries = assert_matches_reference(PRINCIPAL, RATE, TERM, [holiday])
+
+    assert (schedule.payment[12:18] == 0).all() and (schedule.interest[12:18] == 0).all()
+    assert (schedule.remaining[12:18] == schedule.remaining[11]).all()
+    assert summaries[1]["annual_rate"] == 0 and summaries[1]["interest"] == 0
+
+
+def test_rate_change_without_recast_keeps_the_payment():
+    change = {"month": 25, "type": "rate_change", "rate": 9.0, "recast": False}
+    schedule, summaries = assert_matches_reference(PRINCIPAL, RATE, TERM, [change])
+    level = annuity_payment(PRINCIPAL, RATE / 1200, TERM)
+
+    assert (schedule.payment[:-1] == level).all()
+    # The higher rate leaves more to settle in the last month
+    assert schedule.payment[-1] > level and schedule.months == TERM
+    assert summaries[1]["annual_rate"] == 9.0
+
+
+def test_rate_change_recasts_by_default():
+    change = {"month": 25, "type": "rate_change", "rate": 9.0}
+    schedule, _ = assert_matches_reference(PRINCIPAL, RATE, TERM, [change])
+    assert schedule.payment[24] > schedule.payment[23]
+    assert abs(schedule.payment[-1] - schedule.payment[24]) < 200
+
+
+def test_extra_payment_that_pays_the_loan_off():
+    payoff = {"month": 30, "type": "extra_payment", "amount": PRINCIPAL}
+    schedule, summaries = assert_matches_reference(PRINCIPAL, RATE, TERM, [payoff])
+
+    assert schedule.months == 30 and schedule.remaining[-1] == 0
+    opening = schedule.remaining[-2]
+    assert schedule.payment[-1] == opening + int(np.rint(opening * RATE / 1200))
+    assert schedule.principal.sum() == PRINCIPAL
+    assert summaries[-1]["end_month"] == 30
+
+
+def test_extra_payment_shortens_the_term():
+    extra = {"month": 30, "type": "extra_payment", "amount": 200_000_00}
+    schedule, _ = assert_matches_reference(PRINCIPAL, RATE, TERM, [extra])
+    assert schedule.months < TERM
+    assert schedule.payment[29] == schedule.payment[28] + 200_000_00
+
+
+def test_recast_extra_payment_lowers_the_payment():
+    extra = {"month": 30, "type": "extra_payment", "amount": 200_000_00, "recast": True}
+    schedule, summaries = assert_matches_reference(PRINCIPAL, RATE, TERM, [extra])
+    level = annuity_payment(PRINCIPAL, RATE / 1200, TERM)
+
+    assert schedule.months == TERM
+    assert schedule.payment[30] < level
+    assert summaries[1]["payment"] * 100 == schedule.payment[30]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_random_events_match_the_reference(seed):
+    rng = random.Random(seed)
+    term, top_rate = rng.randint(1, 600), rng.choice([20, 100])
+    events = []
+    for _ in range(rng.randint(1, 8)):
+        month, kind = rng.randint(1, term), rng.choice(['rate_change', 'extra_payment', 'payment_holiday'])
+        if kind == 'rate_change':
+            events.append({"month": month, "type": kind, "rate": round(rng.uniform(0, top_rate), 2),
+                           "recast": rng.random() < 0.6})
+        elif kind == 'extra_payment':
+            events.append({"month": month, "type": kind, "amount": rng.randint(1, 300_000_00),
+                           "recast": rng.random() < 0.4})
+        else:
+            events.append({"month": month, "type": kind, "months": rng.randint(1, min(24, term)),
+                           "capitalize": rng.random() < 0.6})
+    events.sort(key=lambda event: event['month'])
+    principal = rng.randint(10_000_00, 5_000_000_00)
+    assert_matches_reference(principal, round(rng.uniform(0, top_rate), 2), term, events)
+
+
+@pytest.mark.parametrize("rate", [0, 20, 25, 40, 50, 75, 100])
+@pytest.mark.parametrize("term", [1, 240, 480, 600])
+def test_high_rates_and_long_terms_stay_level(rate, term):
+    schedule, _ = assert_matches_reference(PRINCIPAL, rate, term, [])
+    level = annuity_payment(PRINCIPAL, rate / 1200, term)
+    assert schedule.months == term
+    # At 0% the payment's rounding isn't outweighed by interest: up to half a satang a month
+    assert abs(schedule.payment[-1] - level) <= (term / 2 if rate == 0 else 100)
+
+
+def test_rate_change_at_high_rates_recasts_to_a_level_payment():
+    change = {"month": 100, "type": "rate_change", "rate": 45.0}
+    schedule, summaries = assert_matches_reference(PRINCIPAL, 40, 600, [change])
+    assert schedule.months == 600
+    assert abs(schedule.payment[-1] - schedule.payment[99]) <= 100
+    assert summaries[1]["payment"] * 100 == schedule.payment[99]
+
+
+def test_runaway_balances_are_clipped():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        schedule, _ = event_schedule(PRINCIPAL, 100, 600, [{"month": 1, "type": "payment_holiday", "months": 600}])
+    assert schedule.months == 600
+    assert 0 <= schedule.remaining.min() and schedule.remaining.max() <= MAX_BALANCE
+    assert (schedule.interest >= 0).all()
+
+
+def test_loan_schedule_route():
+    body = {
+        "loan_amount": 1_000_000, "interest_rate": RATE, "term_months": TERM, "schedule_format": "columnar",
+        "events": [
+            {"month": 40, "type": "extra_payment", "amount": 50_000.5},
+            {"month": 13, "type": "payment_holiday", "months": 3, "capitalize": False},
+            {"month": 25, "type": "rate_change", "rate": 7.5, "recast": False},
+        ],
+    }
+    response = flask_app.app.test_client().post('/api/calculate/loan-schedule', json=body)
+    assert response.status_code == 200
+    result = response.get_json()
+
+    events = [{"month": 13, "type": "payment_holiday", "months": 3, "capitalize": False},
+              {"month": 25, "type": "rate_change", "rate": 7.5, "recast": False},
+              {"month": 40, "type": "extra_payment", "amount": 5_000_050, "recast": False}]
+    schedule, summaries = event_schedule(PRINCIPAL, RATE, TERM, events)
+    assert result["months"] == schedule.months
+    assert result["segments"] == summaries
+    assert result["schedule"]["payment"] == (schedule.payment / 100).tolist()
+    assert result["schedule"]["remaining"][-1] == 0
+    assert result["total_interest"] == schedule.total_interest
+
+
+def test_loan_schedule_route_rejects_events_past_the_term():
+    body = {"loan_amount": 100_000, "interest_rate": 5, "term_months": 12,
+            "events": [{"month": 13, "type": "extra_payment", "amount": 1000}]}
+    response = flask_app.app.test_client().post('/api/calculate/loan-schedule', json=body)
+    assert response.status_code == 400
+    assert 'events[0].month' in response.get_json()["errors"]
+
+
+def test_loan_schedule_route_at_the_top_of_the_range():
+    body = {"loan_amount": 1_000_000, "interest_rate": 100, "term_months": 600, "schedule_format": "columnar",
+            "events": [{"month": 300, "type": "rate_change", "rate": 45}]}
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        response = flask_app.app.test_client().post('/api/calculate/loan-schedule', json=body)
+    assert response.status_code == 200
+    schedule = response.get_json()["schedule"]
+    assert min(schedule["interest"]) >= 0 and min(schedule["remaining"]) >= 0
+    assert schedule["remaining"][-1] == 0
+    assert schedule["payment"][-1] == pytest.approx(schedule["payment"][299], abs=1)
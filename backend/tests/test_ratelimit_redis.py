@@ -0,0 +1,72 @@
+"""redis:// limiter storage for workers on several hosts, against an in-process stand-in server"""
+
+import threading
+
+import pytest
+from flask import Flask
+from flask_limiter import Limiter
+from limits import parse
+from limits.storage import RedisStorage, storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+fakeredis = pytest.importorskip('fakeredis', reason="fakeredis not installed")
+redis = pytest.importorskip('redis')
+
+WORKERS = 4
+HITS_PER_WORKER = 40
+LIMIT = 50
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _pool(server):
+    connection = getattr(fakeredis, 'FakeRedisConnection', fakeredis.FakeConnection)
+    return redis.ConnectionPool(connection_class=connection, server=server)
+
+
+def _storage(server):
+    # One client and connection pool per worker, all talking to the same server
+    return storage_from_string('redis://localhost:6379', connection_pool=_pool(server))
+
+
+def test_redis_uri_selects_the_redis_storage(server):
+    assert isinstance(_storage(server), RedisStorage)
+
+
+@pytest.mark.parametrize("strategy", [SlidingWindowCounterRateLimiter, FixedWindowRateLimiter])
+def test_workers_together_admit_exactly_the_limit(server, strategy):
+    limit = parse(f"{LIMIT}/hour")
+    start, admitted = threading.Barrier(WORKERS), []
+
+    def hammer():
+        limiter = strategy(_storage(server))
+        start.wait()
+        admitted.append(sum(limiter.hit(limit, '203.0.113.7') for _ in range(HITS_PER_WORKER)))
+
+    workers = [threading.Thread(target=hammer) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert sum(admitted) == LIMIT
+    assert not strategy(_storage(server)).hit(limit, '203.0.113.7')
+    assert strategy(_storage(server)).hit(limit, '198.51.100.4')
+
+
+def _app(server):
+    app = Flask(__name__)
+    limiter = Limiter(lambda: '203.0.113.7', app=app, storage_uri='redis://localhost:6379',
+                      storage_options={'connection_pool': _pool(server)}, strategy='sliding-window-counter')
+    app.add_url_rule('/', 'index', limiter.limit("3 per minute")(lambda: 'ok'))
+    return app
+
+
+def test_flask_limiter_counts_in_redis(server):
+    # Two app processes sharing the server: each sees the other's hits
+    first, second = _app(server).test_client(), _app(server).test_client()
+    statuses = [client.get('/').status_code for client in (first, second, first, second)]
+    assert statuses == [200, 200, 200, 429]
@@ -0,0 +1,57 @@
+"""shm:// limiter storage shared by worker processes (ratelimit_store.py)"""
+
+import multiprocessing
+import os
+import uuid
+
+import pytest
+from limits import parse
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from ratelimit_store import SharedMemoryStorage
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="shm:// needs fcntl")
+
+WORKERS = 4
+HITS_PER_WORKER = 40
+LIMIT = 50
+
+
+@pytest.fixture
+def uri():
+    uri = f"shm://finland-ratelimit-test-{uuid.uuid4().hex}?slots=1024&stripes=16"
+    yield uri
+    os.unlink(SharedMemoryStorage(uri).path)
+
+
+def _hammer(uri, strategy, start, admitted):
+    # Each worker maps the table itself, like a gunicorn worker after fork
+    limiter = strategy(SharedMemoryStorage(uri))
+    limit = parse(f"{LIMIT}/hour")
+    start.wait()
+    admitted.put(sum(limiter.hit(limit, '203.0.113.7') for _ in range(HITS_PER_WORKER)))
+
+
+@pytest.mark.parametrize("strategy", [SlidingWindowCounterRateLimiter, FixedWindowRateLimiter])
+def test_processes_together_admit_exactly_the_limit(uri, strategy):
+    context = multiprocessing.get_context('fork')
+    start, admitted = context.Barrier(WORKERS), context.Queue()
+    workers = [context.Process(target=_hammer, args=(uri, strategy, start, admitted)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    counts = [admitted.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(10)
+        assert worker.exitcode == 0
+
+    assert sum(counts) == LIMIT
+    assert not strategy(SharedMemoryStorage(uri)).hit(parse(f"{LIMIT}/hour"), '203.0.113.7')
+
+
+def test_keys_are_counted_separately(uri):
+    storage = SharedMemoryStorage(uri)
+    assert storage.incr('a', 60) == 1
+    assert storage.incr('a', 60, amount=2) == 3
+    assert storage.incr('b', 60) == 1
+    storage.clear('a')
+    assert storage.get('a') == 0 and storage.get('b') == 1
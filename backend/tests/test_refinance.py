@@ -0,0 +1,127 @@
+"""refinance.optimize against scoring each (subset, offer) plan one at a time"""
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from refinance import PARETO_LIMIT, _pareto, debt_costs, optimize
+
+
+def brute_force_plans(debts, offers):
+    """Every feasible plan as {(debts, offer): (total cost, monthly payment)}, subsets in bitmask order"""
+    payments, totals = debt_costs(debts)
+    plans = {}
+    for mask in range(1, 2 ** len(debts)):
+        chosen = tuple(i for i in range(len(debts)) if mask >> i & 1)
+        amount = sum(debts[i]['balance'] for i in chosen)
+        kept_payment = sum(payments[i] for i in range(len(debts)) if i not in chosen)
+        kept_total = sum(totals[i] for i in range(len(debts)) if i not in chosen)
+        for o, offer in enumerate(offers):
+            if not offer.get('min_amount', 0) <= amount <= (offer.get('max_amount') or np.inf):
+                continue
+            rate, term = offer['rate'] / 100 / 12, offer['term_months']
+            payment = amount * rate / (1 - (1 + rate) ** -term) if rate else amount / term
+            payment = round(payment, 2)
+            fees = round(offer.get('fee', 0) + offer.get('fee_percent', 0) / 100 * amount, 2)
+            plans[chosen, o] = (payment * term + fees + kept_total, payment + kept_payment)
+    return plans
+
+
+def random_case(rng, n_debts, n_offers):
+    debts = []
+    for _ in range(n_debts):
+        debt = {"balance": round(rng.uniform(5_000, 400_000), 2), "apr": round(rng.uniform(0, 28), 2)}
+        if rng.random() < 0.5:
+            debt["term_months"] = rng.randint(6, 120)
+        else:
+            debt["monthly_payment"] = round(debt["balance"] * rng.uniform(0.03, 0.2), 2)
+        debts.append(debt)
+    offers = []
+    for i in range(n_offers):
+        offer = {"name": f"bank-{i}", "rate": round(rng.uniform(0, 18), 2), "term_months": rng.choice([12, 24, 36, 60, 84])}
+        if rng.random() < 0.5:
+            offer["fee"] = round(rng.uniform(0, 5_000), 2)
+        if rng.random() < 0.3:
+            offer["fee_percent"] = round(rng.uniform(0, 3), 2)
+        if rng.random() < 0.3:
+            offer["min_amount"] = round(rng.uniform(0, 200_000), 2)
+        if rng.random() < 0.3:
+            offer["max_amount"] = round(rng.uniform(100_000, 1_500_000), 2)
+        offers.append(offer)
+    return debts, offers
+
+
+def key(plan):
+    return tuple(plan["debts"]), plan["offer"]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_optimize_matches_brute_force(seed):
+    rng = random.Random(seed)
+    debts, offers = random_case(rng, rng.randint(1, 7), rng.randint(1, 8))
+    top = rng.randint(1, 10)
+    plans = brute_force_plans(debts, offers)
+    result = optimize(debts, offers, top=top)
+
+    assert result["plans_evaluated"] == len(plans)
+    payments, totals = debt_costs(debts)
+    assert result["current"] == {"monthly_payment": round(payments.sum(), 2), "total_cost": round(totals.sum(), 2)}
+
+    for plan in result["cheapest"] + result["lowest_payment"] + result["pareto"]:
+        cost, monthly = plans[key(plan)]
+        assert plan["total_cost"] == pytest.approx(cost, abs=0.01 * (1 + plan["term_months"]))
+        assert plan["monthly_payment"] == pytest.approx(monthly, abs=0.02)
+        assert plan["amount"] == pytest.approx(sum(debts[i]['balance'] for i in plan["debts"]), abs=0.01)
+
+    # The same top costs and payments as ranking every plan, up to cent rounding
+    costs = sorted(cost for cost, _ in plans.values())[:top]
+    monthly = sorted(monthly for _, monthly in plans.values())[:top]
+    assert [p["total_cost"] for p in result["cheapest"]] == pytest.approx(costs, abs=1.0)
+    assert [p["monthly_payment"] for p in result["lowest_payment"]] == pytest.approx(monthly, abs=0.02)
+    assert len(result["cheapest"]) == min(top, len(plans))
+
+
+def test_optimize_with_no_feasible_plan():
+    debts = [{"balance": 10_000, "apr": 18, "term_months": 12}]
+    result = optimize(debts, [{"rate": 5, "term_months": 12, "min_amount": 50_000}])
+    assert result["plans_evaluated"] == 0
+    assert result["cheapest"] == result["lowest_payment"] == result["pareto"] == []
+
+
+def test_optimize_rejects_a_payment_that_never_pays_off():
+    with pytest.raises(ValueError, match=r"debts\[0\]"):
+        optimize([{"balance": 100_000, "apr": 24, "monthly_payment": 1_000}], [{"rate": 5, "term_months": 12}])
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_pareto_front_is_the_undominated_plans(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 300))
+    # Coarse values so ties on either axis are common
+    cost = rng.integers(0, 40, n).astype(np.float64)
+    payment = rng.integers(0, 40, n).astype(np.float64)
+    front = _pareto(cost, payment)
+
+    assert list(cost[front]) == sorted(cost[front])
+    assert (np.diff(payment[front]) < 0).all()
+    for i in front:
+        dominated = (cost <= cost[i]) & (payment <= payment[i]) & ((cost < cost[i]) | (payment < payment[i]))
+        assert not dominated.any()
+    # Everything left out is matched or beaten on both axes by a plan on the front
+    for i in np.setdiff1d(np.arange(n), front):
+        assert ((cost[front] <= cost[i]) & (payment[front] <= payment[i])).any()
+
+
+def test_optimize_pareto_front_is_capped_and_undominated():
+    rng = random.Random(7)
+    debts, offers = random_case(rng, 8, 30)
+    plans = brute_force_plans(debts, offers)
+    front = optimize(debts, offers)["pareto"]
+
+    assert 0 < len(front) <= PARETO_LIMIT
+    for plan in front:
+        cost, monthly = plans[key(plan)]
+        assert not any(other_cost < cost - 1.0 and other_monthly < monthly - 0.02
+                       for other_cost, other_monthly in plans.values())
@@ -0,0 +1,145 @@
+"""Request schemas: collected errors and their paths, number options, sanitizing"""
+
+import html
+import random
+
+import pytest
+
+from schemas import _EVENT_HANDLERS, _JAVASCRIPT, _TAGS, Choice, Field, Flag, ListOf, Number, Schema, Text, \
+    Variant, sanitize_string
+
+LOAN = Variant('type', {
+    'card': Schema({'balance': Number(0, 1e6, required=True), 'apr': Number(0, 100, required=True)}),
+    'term': Schema({'amount': Number(1, 1e6, required=True), 'months': Number(1, 600, required=True, cast=int)}),
+})
+REQUEST = Schema({
+    'name': Text(10, required=True),
+    'mode': Choice(['fast', 'full'], default='fast'),
+    'loans': ListOf(LOAN, 1, 3, required=True),
+    'tags': ListOf(Number(0, 10, whole=True)),
+    'owner': Schema({'age': Number(0, 120, cast=int)}, required=False),
+    'verbose': Flag(),
+})
+
+
+def full_sanitize(value):
+    """sanitize_string without its no-unsafe-characters shortcut"""
+    return _EVENT_HANDLERS.sub('', _JAVASCRIPT.sub('', html.escape(_TAGS.sub('', value))))
+
+
+def test_every_problem_is_reported_with_its_path():
+    body = {
+        'name': 'x' * 11,
+        'mode': 'slow',
+        'loans': [{'type': 'card', 'balance': -1, 'apr': 10}, {'type': 'lease'}, {'type': 'term', 'amount': 5}],
+        'tags': [1, 2.5, 'x', 3],
+        'owner': {'age': 'old'},
+    }
+    values, errors = REQUEST.validate(body)
+    assert errors == {
+        'name': "name must be at most 10 characters",
+        'mode': "mode must be one of fast, full",
+        'loans[0].balance': "loans[0].balance must be a number from 0 to 1,000,000",
+        'loans[1].type': "loans[1].type must be one of card, term",
+        'loans[2].months': "loans[2].months is required",
+        'tags[1]': "tags[1] must be a whole number from 0 to 10",
+        'tags[2]': "tags[2] must be a whole number from 0 to 10",
+        'owner.age': "owner.age must be a number from 0 to 120",
+    }
+
+
+def test_valid_body_values():
+    body = {'name': 'a<b>', 'loans': [{'type': 'term', 'amount': '5000', 'months': 12.9}], 'tags': [0, 10.0],
+            'verbose': 'yes'}
+    values, errors = REQUEST.validate(body)
+    assert errors == {}
+    assert values == {
+        'name': 'a', 'mode': 'fast', 'loans': [{'type': 'term', 'amount': 5000.0, 'months': 12}],
+        'tags': [0.0, 10.0], 'owner': None, 'verbose': False,
+    }
+
+
+@pytest.mark.parametrize("body, path", [
+    (None, 'body'),
+    ([], 'body'),
+    ({'name': 'a', 'loans': []}, 'loans'),
+    ({'name': 'a', 'loans': [{}] * 4}, 'loans'),
+    ({'name': 'a', 'loans': ['card']}, 'loans[0]'),
+    ({'name': 'a', 'loans': [{'type': 'card', 'balance': 1, 'apr': 1}], 'owner': 3}, 'owner'),
+])
+def test_container_errors(body, path):
+    _, errors = REQUEST.validate(body)
+    assert list(errors) == [path]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (None, (None, "is required")),
+    ('', (None, "is required")),
+    ('12.5', (12.5, None)),
+    (7, (7.0, None)),
+    (True, (None, "must be a number from 0 to 100")),
+    ('abc', (None, "must be a number from 0 to 100")),
+    ('nan', (None, "must be a number from 0 to 100")),
+    ('1e400', (None, "must be a number from 0 to 100")),
+    (10 ** 400, (None, "must be a number from 0 to 100")),
+    (-10 ** 400, (None, "must be a number from 0 to 100")),
+    ([1], (None, "must be a number from 0 to 100")),
+])
+def test_number_check(raw, expected):
+    assert Number(0, 100, required=True).check(raw) == expected
+
+
+def test_number_options():
+    assert Number(0, 100, cast=int).check('99.9') == (99, None)
+    assert Number(0, 100, cast=int).check(-0.5) == (None, "must be a number from 0 to 100")
+    assert Number(0, 100, whole=True).check(4.0) == (4.0, None)
+    assert Number(0, 100, whole=True).check('4.5') == (None, "must be a whole number from 0 to 100")
+
+    lenient = Number(0, 100, default=7, lenient=True)
+    for raw in ('junk', 101, 10 ** 400, float('inf'), {}):
+        assert lenient.check(raw) == (7, None)
+    assert lenient.check(None) == (7, None)
+    assert lenient.check(50) == (50.0, None)
+
+
+def test_overflowing_numbers_in_a_body():
+    schema = Schema({'amount': Number(0, 1e12, required=True), 'items': ListOf(Number(0, 1e12))})
+    _, errors = schema.validate({'amount': 10 ** 400, 'items': [1, 10 ** 309]})
+    assert set(errors) == {'amount', 'items[1]'}
+
+
+def test_field_is_abstract():
+    with pytest.raises(TypeError):
+        Field()
+
+    class Upper(Field):
+        def compile(self):
+            return lambda raw: (raw.upper(), None)
+
+    assert Upper().check('ok') == ('OK', None)
+
+
+def test_text_options():
+    assert Text(5).check('  ') == ('  ', None)
+    assert Text(5, default='-').check('<b></b>') == ('-', None)
+    assert Text(5, truncate=True).check('abcdefgh') == ('abcde', None)
+    assert Text(5).check(12) == (None, "must be text")
+    assert Text(5, stringify=True).check(12) == ('12', None)
+    assert Text(5, sanitize=False).check('<i>') == ('<i>', None)
+
+
+@pytest.mark.parametrize("value", [
+    "plain text", "ราคา 1,000 บาท", "<script>alert(1)</script>", "a & b", "javascript:alert(1)",
+    "<img src=x onerror=alert(1)>", "x onclick = y", "it's \"quoted\"", "JaVaScRiPt:x", "a=b", "",
+])
+def test_sanitize_string_matches_the_full_path(value):
+    assert sanitize_string(value) == full_sanitize(value)
+
+
+def test_sanitize_string_fuzz():
+    rng = random.Random(5)
+    alphabet = list("abcz onjavscript<>&\"':=/ \t\nก") + ["javascript:", "onload=", "<b>", "&amp;"]
+    for _ in range(20000):
+        value = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert sanitize_string(value) == full_sanitize(value), value
+    assert sanitize_string(None) is None and sanitize_string(5) is None
@@ -0,0 +1,122 @@
+"""Bulk scoring (scoring.score_columns, tools/score_bulk.py) against /api/ai-analyze row by row"""
+
+import csv
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from scoring import ANALYZE_INPUTS, OUTPUT_COLUMNS, score_columns
+
+ROWS = 3000
+SCORE_BULK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools', 'score_bulk.py')
+
+# Output column -> path in the ai-analyze response
+RESPONSE_PATHS = {
+    'monthly_payment': ('input_summary', 'monthly_payment'),
+    'dti_ratio': ('input_summary', 'dti_ratio'),
+    'severity': ('insights', 'severity'),
+    'risk_score': ('insights', 'risk_score'),
+    'monthly_interest': ('insights', 'monthly_interest'),
+    'total_interest': ('insights', 'total_interest'),
+    'interest_burden_ratio': ('debt_analysis', 'interest_burden_ratio'),
+    'health_score': ('financial_health', 'health_score'),
+    'debt_stress_index': ('financial_health', 'debt_stress_index'),
+    'stability_score': ('financial_health', 'stability_score'),
+    'wealth_potential': ('financial_health', 'wealth_potential'),
+    'emergency_buffer_months': ('planning', 'emergency_buffer_months'),
+    'savings_potential': ('planning', 'savings_potential'),
+    'investment_readiness': ('planning', 'investment_readiness'),
+    'retirement_gap_years': ('planning', 'retirement_gap_years'),
+    'percentile_rank': ('comparison', 'percentile_rank'),
+    'credit_score_impact': ('impact', 'credit_score_impact'),
+    'life_quality_score': ('impact', 'life_quality_score'),
+    'payoff_strategy': ('strategy', 'payoff_strategy'),
+    'primary_action': ('strategy', 'primary_action'),
+    'urgency_level': ('strategy', 'urgency_level'),
+    'support_needed': ('strategy', 'support_needed'),
+    'better_than_average': ('comparison', 'better_than_average'),
+}
+
+
+def random_profiles(n, seed=11):
+    """{field: float array} with NaN for fields left out (the API default applies)"""
+    rng = np.random.default_rng(seed)
+    columns = {
+        'loan_amount': np.round(rng.lognormal(12, 1.2, n), 2),
+        'interest_rate': np.round(rng.uniform(0, 30, n), 2),
+        'term_months': rng.integers(1, 361, n).astype(np.float64),
+        'monthly_income': np.round(rng.lognormal(10.3, 0.7, n)),
+        'monthly_payment': np.where(rng.random(n) < 0.5, 0, np.round(rng.lognormal(8.5, 1, n))),
+        'monthly_expenses': np.round(rng.lognormal(9.5, 0.8, n)),
+        'emergency_months': rng.integers(0, 13, n).astype(np.float64),
+        'age': rng.uniform(18, 75, n),
+        'job_stability': rng.integers(0, 101, n).astype(np.float64),
+        'payment_history': rng.integers(0, 101, n).astype(np.float64),
+        'account_age': rng.uniform(0, 240, n),
+        'current_savings': np.round(rng.lognormal(10, 1.5, n)),
+    }
+    for name, values in columns.items():
+        values[rng.random(n) < 0.1] = np.nan
+    # A few rows the API rejects
+    columns['monthly_income'][rng.random(n) < 0.02] = 0
+    columns['loan_amount'][rng.random(n) < 0.02] = 0
+    return columns
+
+
+def request_body(columns, i):
+    return {name: float(values[i]) for name, values in columns.items() if not np.isnan(values[i])}
+
+
+def test_bulk_scores_match_the_api(advisor, analyze_client):
+    columns = random_profiles(ROWS)
+    scored = score_columns(advisor, columns)
+    assert set(scored) == set(OUTPUT_COLUMNS)
+
+    mismatches = []
+    for i in range(ROWS):
+        response = analyze_client.post('/api/ai-analyze', json={**request_body(columns, i), 'intervals': False})
+        if scored['error'][i]:
+            assert response.status_code == 400, i
+            continue
+        assert response.status_code == 200, (i, response.get_json())
+        result = response.get_json()
+        for name, (section, key) in RESPONSE_PATHS.items():
+            expected, got = result[section][key], scored[name][i]
+            if isinstance(expected, str) or isinstance(expected, bool):
+                same = expected == got
+            else:
+                same = expected == pytest.approx(float(got), abs=1e-9)
+            if not same:
+                mismatches.append((i, name, expected, got))
+    assert mismatches == []
+    assert (scored['error'] != '').sum() > 0
+
+
+def test_score_bulk_cli(advisor, tmp_path):
+    import joblib
+    model = tmp_path / 'advisor.pkl'
+    joblib.dump(advisor, model)
+    columns = random_profiles(200, seed=3)
+    source, target = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    with open(source, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', *ANALYZE_INPUTS])
+        for i in range(200):
+            writer.writerow([f"c{i}", *('' if np.isnan(columns[name][i]) else columns[name][i] for name in ANALYZE_INPUTS)])
+
+    subprocess.run([sys.executable, SCORE_BULK, str(source), str(target), '--model', str(model),
+                    '--chunk-size', '64'], check=True, capture_output=True)
+
+    with open(target, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    scored = score_columns(advisor, columns)
+    assert [row['id'] for row in rows] == [f"c{i}" for i in range(200)]
+    for i, row in enumerate(rows):
+        assert row['severity'] == scored['severity'][i]
+        assert row['error'] == scored['error'][i]
+        if not scored['error'][i]:
+            assert float(row['health_score']) == scored['health_score'][i]
+            assert row['payoff_strategy'] == scored['payoff_strategy'][i]
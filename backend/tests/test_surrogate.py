@@ -0,0 +1,115 @@
+"""Lookup-grid surrogate on the ai-analyze path"""
+
+import numpy as np
+import pytest
+
+import app as flask_app
+from inference import OUTPUT_MODELS, predict_outputs
+from surrogate import LookupSurrogate
+
+ANALYZE_INPUT = {
+    "loan_amount": 250000, "interest_rate": 16, "term_months": 48, "monthly_income": 32000,
+    "monthly_expenses": 15000, "emergency_months": 2, "age": 29, "current_savings": 40000,
+}
+
+
+def served_features(n, seed=3):
+    """Feature rows as ai-analyze builds them, for applicants around ANALYZE_INPUT"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        loan, rate = 250000 * rng.uniform(0.3, 3), rng.uniform(1, 28)
+        term, income = rng.integers(12, 120), 32000 * rng.uniform(0.4, 3)
+        payment = flask_app.calculate_monthly_payment(loan, rate, term)
+        rows.append(flask_app._build_features(
+            loan, rate, term, income, payment, payment / income * 100, income * rng.uniform(0.2, 0.6),
+            rng.integers(0, 8), rng.integers(21, 65), rng.uniform(30, 100), rng.uniform(30, 100),
+            rng.integers(0, 240), income * rng.uniform(0, 10))[0])
+    return np.array(rows)
+
+
+TOLERANCE = 0.25
+
+
+@pytest.fixture(scope='module')
+def surrogate(advisor):
+    surrogate = LookupSurrogate(advisor, served_features(3000), k=3, bins=6, min_count=1)
+    surrogate.evaluate(advisor, served_features(1000, seed=4), tolerance=TOLERANCE)
+    return surrogate
+
+
+@pytest.fixture
+def client(analyze_client, advisor, surrogate, monkeypatch):
+    monkeypatch.setitem(advisor, 'surrogate', surrogate)
+    return analyze_client
+
+
+def analyze(client, **options):
+    response = client.post('/api/ai-analyze', json={**ANALYZE_INPUT, **options})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_surrogate_serves_covered_rows(client):
+    assert analyze(client, surrogate=True)['prediction_source'] == 'surrogate'
+    assert 'prediction_source' not in analyze(client)
+
+
+def test_explanations_always_explain_the_returned_predictions(client):
+    forest = analyze(client, intervals=False)
+    explained = analyze(client, surrogate=True, explain=True, explain_top=10, intervals=False)
+
+    assert explained['prediction_source'] == 'forest'
+    explanations = explained.pop('explanations')
+    del explained['prediction_source']
+    assert explained == forest
+
+    # With every contribution returned, base + contributions is the returned value
+    health = explanations['health_score']
+    total = health['base'] + sum(c['contribution'] for c in health['contributions'])
+    assert len(health['contributions']) < 10
+    assert total == pytest.approx(forest['financial_health']['health_score'], abs=0.6)
+
+
+def test_only_outputs_within_tolerance_are_served_from_the_grid(advisor, surrogate):
+    report = surrogate.report
+    # A 3-feature grid cannot follow every one of 16 targets and 5 labels
+    assert 0 < surrogate.trusted_targets.sum() < len(surrogate.trusted_targets)
+    for i, (name, mae) in enumerate(report['regression_mae'].items()):
+        assert surrogate.trusted_targets[i] == (mae <= TOLERANCE * report['regression_forest_std'][name])
+        assert (name in report['served_from_grid']) == surrogate.trusted_targets[i]
+
+    X = served_features(500, seed=5)
+    outputs, covered = surrogate.predict_with_fallback(advisor, X)
+    forest = predict_outputs(advisor, advisor['scaler'].transform(X))
+    assert covered.mean() > 0.5
+
+    untrusted = ~surrogate.trusted_targets
+    np.testing.assert_allclose(outputs[0][:, untrusted], forest[0][:, untrusted])
+    np.testing.assert_allclose(outputs[0][~covered], forest[0][~covered])
+    errors = np.abs(outputs[0] - forest[0])[covered][:, surrogate.trusted_targets]
+    assert (errors.mean(axis=0) <= 2 * TOLERANCE * forest[0].std(axis=0)[surrogate.trusted_targets]).all()
+    for name, codes, reference, trusted in zip(OUTPUT_MODELS[1:], outputs[1:], forest[1:], surrogate.trusted_labels):
+        if not trusted:
+            np.testing.assert_array_equal(codes, reference, err_msg=name)
+
+
+def test_untrusted_outputs_match_the_forest_on_the_route(client, surrogate):
+    from scoring import REGRESSION_OUTPUTS
+
+    forest = analyze(client, intervals=False)
+    served = analyze(client, surrogate=True, intervals=False)
+    assert served['prediction_source'] == 'surrogate'
+    for name, (index, *_) in REGRESSION_OUTPUTS.items():
+        if not surrogate.trusted_targets[index]:
+            assert served_value(served, name) == served_value(forest, name)
+
+
+def served_value(result, name):
+    return next(values[name] for values in result.values() if isinstance(values, dict) and name in values)
+
+
+def test_unevaluated_surrogate_serves_nothing(advisor):
+    surrogate = LookupSurrogate(advisor, served_features(1000), k=3, bins=6, min_count=1)
+    outputs, covered = surrogate.predict(served_features(50, seed=6))
+    assert not covered.any() and np.isnan(outputs[0]).all()
@@ -0,0 +1,29 @@
+"""Bearer-token protected operational endpoints"""
+
+import pytest
+
+import app as flask_app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(flask_app, 'METRICS_TOKEN', 's3cret')
+    monkeypatch.setattr(flask_app, 'PROFILER_TOKEN', 'pr0file')
+    return flask_app.app.test_client()
+
+
+@pytest.mark.parametrize("url", ['/api/metrics', '/api/drift'])
+@pytest.mark.parametrize("authorization", [None, 'Bearer wrong', 'Bearer s3cret2', 's3cret', 'Bearer sécret'])
+def test_metrics_token_rejects(client, url, authorization):
+    headers = {'Authorization': authorization} if authorization else {}
+    assert client.get(url, headers=headers).status_code == 401
+
+
+def test_metrics_token_accepts(client):
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code in (200, 404)
+    assert client.get('/api/drift', headers={'Authorization': 'Bearer s3cret'}).status_code != 401
+
+
+def test_profiler_token(client):
+    assert client.get('/api/debug/profile', headers={'Authorization': 'Bearer s3cret'}).status_code == 401
+    assert client.get('/api/debug/profile', headers={'Authorization': 'Bearer pr0fïle'}).status_code == 401
@@ -0,0 +1,281 @@
+"""
+FinLand Load Test
+Open-loop load generator replaying a mix of calculator, ai-analyze and
+ai-chat requests at a target rate. Inputs are drawn from the training
+script's INCOME_DISTRIBUTIONS / LOAN_TYPES so load looks like real users.
+
+Against a running server:
+    python tools/loadtest.py --url http://127.0.0.1:5000 --rps 50 --duration 30
+
+Or let the harness start the app (with a stub LLM, a small model and rate
+limiting off) under waitress, gunicorn or uvicorn (asgi.py):
+    python tools/loadtest.py --spawn waitress --threads 8 --rps 100
+    python tools/loadtest.py --spawn gunicorn --workers 4 --threads 4 \\
+        --mix calculator=70,analyze=20,chat=10
+    python tools/loadtest.py --spawn uvicorn --threads 4 --llm-latency 5
+
+Latency is measured from each request's scheduled start, so a saturated
+server shows up as queueing delay instead of a silently lower request rate.
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from train_financial_advisor import INCOME_DISTRIBUTIONS, LOAN_TYPES  # noqa: E402
+from tools.stub_llm import StubConfig, start_stub_server  # noqa: E402
+
+CHAT_QUESTIONS = [
+    "ควรจ่ายหนี้ก้อนไหนก่อนดี",
+    "ถ้าจ่ายเพิ่มเดือนละ 1000 จะปิดหนี้เร็วขึ้นไหม",
+    "ควรรีไฟแนนซ์ไหม",
+    "มีเงินเก็บควรโปะหนี้หรือเก็บเป็นเงินสำรอง",
+    "DTI ของฉันสูงเกินไปไหม",
+    "รวมหนี้บัตรเครดิตดีไหม",
+]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TRAFFIC
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _weighted_choice(rng, items, weights):
+    return rng.choices(items, weights=weights)[0]
+
+
+def random_profile(rng):
+    """One borrower sampled like the training data"""
+    income_type = _weighted_choice(rng, list(INCOME_DISTRIBUTIONS), [v[2] for v in INCOME_DISTRIBUTIONS.values()])
+    low, high, _ = INCOME_DISTRIBUTIONS[income_type]
+    monthly_income = rng.uniform(low, high)
+
+    loan_type = _weighted_choice(rng, list(LOAN_TYPES), [v['prob'] for v in LOAN_TYPES.values()])
+    params = LOAN_TYPES[loan_type]
+    rate = rng.uniform(*params['rate'])
+    amount = rng.uniform(*params['amount'])
+    term = rng.randrange(params['term'][0], params['term'][1] + 1, 6)
+
+    monthly_rate = rate / 100 / 12
+    payment = amount * monthly_rate / (1 - (1 + monthly_rate) ** -term) if monthly_rate > 0 else amount / term
+    payment *= rng.choice([1.0, 1.05, 1.1, 1.2, 1.3, 1.5])
+    if payment > monthly_income * 0.7:
+        payment = monthly_income * 0.5
+
+    return {
+        "loan_type": loan_type,
+        "loan_amount": round(amount), "interest_rate": round(rate, 2), "term_months": term,
+        "monthly_income": round(monthly_income), "monthly_payment": round(payment),
+        "age": rng.randint(20, 58), "emergency_months": rng.choice([0, 0, 1, 2, 3, 4, 6, 9, 12]),
+    }
+
+
+def build_request(route, rng):
+    """(label, method, path, kwargs) for one request of the given route class"""
+    p = random_profile(rng)
+    if route == 'calculator':
+        if p['loan_type'] == 'student_loan':
+            return 'student-loan', 'GET', '/api/calculate/student-loan', {"params": {
+                "loan_amount": p['loan_amount'], "interest_rate": p['interest_rate'],
+                "term_months": p['term_months'], "schedule_format": 'columnar'}}
+        # Credit-card calculator rejects payments below 1.01x the first month's interest
+        minimum = p['loan_amount'] * p['interest_rate'] / 1200 * 1.02
+        return 'credit-card', 'GET', '/api/calculate/credit-card', {"params": {
+            "balance": p['loan_amount'], "apr": p['interest_rate'],
+            "monthly_payment": max(p['monthly_payment'], round(minimum) + 1), "schedule_format": 'columnar'}}
+    if route == 'analyze':
+        return 'ai-analyze', 'POST', '/api/ai-analyze', {"json": {
+            k: p[k] for k in ('loan_amount', 'interest_rate', 'term_months', 'monthly_income',
+                              'monthly_payment', 'age', 'emergency_months')}}
+    return 'ai-chat', 'POST', '/api/ai-chat', {"json": {
+        "question": rng.choice(CHAT_QUESTIONS), "balance": p['loan_amount'], "apr": p['interest_rate'],
+        "payment": p['monthly_payment'], "monthly_income": p['monthly_income']}}
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ('calculator', 'analyze', 'chat'):
+            raise argparse.ArgumentTypeError(f"unknown route class '{name}'")
+        mix[name] = float(weight)
+    return mix
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Results:
+    def __init__(self):
+        self.samples = {}       # label -> list of (latency s, status)
+        self._lock = threading.Lock()
+
+    def add(self, label, latency, status):
+        with self._lock:
+            self.samples.setdefault(label, []).append((latency, status))
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def run_load(base_url, mix, rps, duration, concurrency, timeout, seed):
+    rng = random.Random(seed)
+    routes, weights = list(mix), list(mix.values())
+    results = Results()
+    local = threading.local()
+
+    def fire(label, method, path, kwargs, scheduled):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        try:
+            response = session.request(method, base_url + path, timeout=timeout, **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            status = 'error'
+        results.add(label, time.perf_counter() - scheduled, status)
+
+    total = int(rps * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            label, method, path, kwargs = build_request(_weighted_choice(rng, routes, weights), rng)
+            pool.submit(fire, label, method, path, kwargs, scheduled)
+    return results, time.perf_counter() - start
+
+
+def report(results, elapsed):
+    print(f"\n{'route':14} | {'reqs':>6} | {'rps':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | "
+          f"{'max ms':>8} | {'errors':>6} | {'429':>5}")
+    print("-" * 96)
+    everything = []
+    for label in sorted(results.samples):
+        samples = results.samples[label]
+        everything.extend(samples)
+        _report_row(label, samples, elapsed)
+    print("-" * 96)
+    _report_row('TOTAL', everything, elapsed)
+
+
+def _report_row(label, samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, status in samples if status == 'error' or (status != 429 and status >= 400))
+    limited = sum(1 for _, status in samples if status == 429)
+    print(f"{label:14} | {len(samples):>6} | {len(samples) / elapsed:>7.1f} | "
+          f"{_percentile(latencies, 0.50) * 1000:>8.1f} | {_percentile(latencies, 0.95) * 1000:>8.1f} | "
+          f"{_percentile(latencies, 0.99) * 1000:>8.1f} | {latencies[-1] * 1000 if latencies else 0:>8.1f} | "
+          f"{errors:>6} | {limited:>5}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERVER UNDER TEST
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(server, workers, threads, llm_latency, model_path):
+    """Start app.py under waitress/gunicorn/uvicorn with a stub LLM; returns (process, url, stub)"""
+    stub, stub_url = start_stub_server(StubConfig({'gemini-2.0-flash': llm_latency}))
+    port = _free_port()
+    env = dict(os.environ,
+               GEMINI_API_KEY='stub', GEMINI_API_ENDPOINT=stub_url,
+               RATELIMIT_ENABLED='0', RATELIMIT_STORAGE_URI='memory://', FLASK_ENV='production')
+    if model_path:
+        env['MODEL_PATH'] = model_path
+
+    if server == 'waitress':
+        command = [sys.executable, '-m', 'waitress', f'--port={port}', f'--threads={threads}', 'app:app']
+    elif server == 'uvicorn':
+        env['ASGI_THREADS'] = str(threads)
+        command = [sys.executable, '-m', 'uvicorn', '--workers', str(workers), '--port', str(port),
+                   '--log-level', 'warning', 'asgi:app']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-k', 'gthread',
+                   '--threads', str(threads), '-b', f'127.0.0.1:{port}', 'app:app']
+    process = subprocess.Popen(command, cwd=BACKEND, env=env)
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with code {process.returncode}")
+        try:
+            requests.get(url + '/api/health', timeout=1)
+            return process, url, stub
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{server} did not come up on port {port}")
+
+
+def _small_model_file():
+    """Train the benchmark fixture model once so ai-analyze works without the real pickle"""
+    import joblib
+    from benchmarks.fixtures import build_small_advisor
+
+    path = os.path.join(tempfile.gettempdir(), 'finland-loadtest-model.pkl')
+    if not os.path.exists(path):
+        joblib.dump(build_small_advisor(), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="server to test (ignored with --spawn)")
+    parser.add_argument('--spawn', choices=['waitress', 'gunicorn', 'uvicorn'], help="start the app for the test")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn/uvicorn worker processes")
+    parser.add_argument('--threads', type=int, default=4, help="threads per worker (uvicorn: Flask route threads)")
+    parser.add_argument('--real-model', action='store_true', help="with --spawn, use financial_advisor_model.pkl")
+    parser.add_argument('--llm-latency', type=float, default=0.8, help="stub Gemini latency (s)")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('calculator=60,analyze=25,chat=15'))
+    parser.add_argument('--rps', type=float, default=20)
+    parser.add_argument('--duration', type=float, default=20, help="seconds")
+    parser.add_argument('--concurrency', type=int, default=64, help="max requests in flight")
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    process = stub = None
+    url = args.url
+    if args.spawn:
+        model_path = None if args.real_model else _small_model_file()
+        process, url, stub = spawn_server(args.spawn, args.workers, args.threads, args.llm_latency, model_path)
+
+    mix = ', '.join(f"{name}={weight:g}" for name, weight in args.mix.items())
+    print(f"🔥 {args.rps:g} rps for {args.duration:g}s against {url} ({mix})")
+    try:
+        results, elapsed = run_load(url, args.mix, args.rps, args.duration, args.concurrency, args.timeout, args.seed)
+        report(results, elapsed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if stub is not None:
+            stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Worker Memory Report
+Shared (copy-on-write) vs private resident memory of a gunicorn master and
+its workers, from /proc/<pid>/smaps_rollup (Linux).
+
+Usage:
+    python tools/memreport.py              # master from gunicorn.conf.py's pidfile
+    python tools/memreport.py <master pid>
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import process_memory  # noqa: E402
+
+
+def child_pids(pid):
+    pids = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pid', type=int, nargs='?', help="gunicorn master pid")
+    args = parser.parse_args()
+    if args.pid is None:
+        pidfile = os.getenv('GUNICORN_PIDFILE', os.path.join(tempfile.gettempdir(), 'finland-gunicorn.pid'))
+        with open(pidfile) as f:
+            args.pid = int(f.read())
+
+    mb = 2 ** 20
+    print(f"{'process':>16} | {'RSS MB':>8} | {'shared MB':>9} | {'private MB':>10} | {'PSS MB':>8}")
+    print("-" * 64)
+    total_pss = 0
+    for label, pid in [('master', args.pid)] + [('worker', pid) for pid in child_pids(args.pid)]:
+        memory = process_memory(pid)
+        if not memory:
+            continue
+        total_pss += memory['pss']
+        print(f"{label + ' ' + str(pid):>16} | {memory['rss'] / mb:>8.1f} | {memory['shared'] / mb:>9.1f} | "
+              f"{memory['private'] / mb:>10.1f} | {memory['pss'] / mb:>8.1f}")
+    print("-" * 64)
+    print(f"{'total (PSS)':>16} | {total_pss / mb:>8.1f}   ← actual memory used by the whole server")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+FinLand Bulk Scoring
+Scores a CSV or Parquet file of customer profiles with the /api/ai-analyze
+logic (scoring.py) in fixed-size chunks, writing results as it goes, so
+memory stays bounded by --chunk-size x in-flight chunks.
+
+Input columns are ai-analyze's request fields (loan_amount, interest_rate,
+term_months, monthly_income, ...); missing ones take the API defaults.
+
+Usage:
+    python tools/score_bulk.py customers.csv scored.csv
+    python tools/score_bulk.py customers.parquet scored.parquet --jobs 4 --keep customer_id
+    python tools/score_bulk.py customers.csv scored.csv --surrogate
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from scoring import ANALYZE_INPUTS, OUTPUT_COLUMNS, score_columns, score_in_worker  # noqa: E402
+
+
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def _floats(values):
+    """Text cells -> float array; blanks become NaN (API default), junk becomes inf (row error)"""
+    try:
+        return np.array([v if v.strip() else 'nan' for v in values], dtype=np.float64)
+    except ValueError:
+        out = np.empty(len(values))
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v) if v.strip() else np.nan
+            except ValueError:
+                out[i] = np.inf
+        return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# READERS: yield (inputs {field: float array}, kept {column: array})
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def read_csv_chunks(path, chunk_size, keep):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = {name: i for i, name in enumerate(header)}
+        fields = [name for name in ANALYZE_INPUTS if name in index]
+        kept = [name for name in keep if name in index]
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader)]
+            if not rows:
+                return
+            yield ({name: _floats([row[index[name]] for row in rows]) for name in fields},
+                   {name: [row[index[name]] for row in rows] for name in kept})
+
+
+def read_parquet_chunks(path, chunk_size, keep):
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(path)
+    names = set(source.schema_arrow.names)
+    fields = [name for name in ANALYZE_INPUTS if name in names]
+    kept = [name for name in keep if name in names]
+    for batch in source.iter_batches(batch_size=chunk_size, columns=fields + kept):
+        inputs = {name: batch.column(name).cast('float64').to_numpy(zero_copy_only=False) for name in fields}
+        yield inputs, {name: batch.column(name).to_pylist() for name in kept}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WRITERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CSVWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+        self.columns = columns
+
+    def write(self, table):
+        self._writer.writerows(zip(*(_cells(table[name]) for name in self.columns)))
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, columns):
+        self.path, self.columns = path, columns
+        self._writer = None
+
+    def write(self, table):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        batch = pa.table({name: _arrow_column(table[name]) for name in self.columns})
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, batch.schema)
+        self._writer.write_table(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _cells(values):
+    """NaN (unscored row) as an empty CSV cell, whole numbers without '.0'"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+        return ['' if v != v else int(v) if v.is_integer() else v for v in values.tolist()]
+    return values.tolist() if isinstance(values, np.ndarray) else values
+
+
+def _arrow_column(values):
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values.tolist()
+    return values
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def scored_chunks(chunks, advisor, model_path, jobs, use_surrogate=False):
+    """Yield (outputs, kept) per chunk in input order, at most 2 x jobs chunks in flight"""
+    if jobs <= 1:
+        surrogate = advisor.get('surrogate') if use_surrogate else None
+        for inputs, kept in chunks:
+            yield score_columns(advisor, inputs, surrogate), kept
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from inference import _init_worker, mmap_artifact
+
+    pending = deque()
+    context = multiprocessing.get_context('forkserver' if os.name == 'posix' else 'spawn')
+    with ProcessPoolExecutor(jobs, mp_context=context, initializer=_init_worker,
+                             initargs=(mmap_artifact(model_path, advisor),)) as pool:
+        for inputs, kept in chunks:
+            pending.append((pool.submit(score_in_worker, inputs, use_surrogate), kept))
+            if len(pending) >= jobs * 2:
+                future, kept = pending.popleft()
+                yield future.result(), kept
+        while pending:
+            future, kept = pending.popleft()
+            yield future.result(), kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help=".csv or .parquet")
+    parser.add_argument('output', help=".csv or .parquet")
+    parser.add_argument('--model', default=os.getenv('MODEL_PATH', os.path.join(BACKEND, 'financial_advisor_model.pkl')))
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--jobs', type=int, default=1, help="scoring processes")
+    parser.add_argument('--keep', default='id', help="comma-separated input columns copied to the output")
+    parser.add_argument('--surrogate', action='store_true',
+                        help="use the model's lookup-grid surrogate where it applies (faster, approximate)")
+    args = parser.parse_args()
+
+    import joblib
+    advisor = joblib.load(args.model)
+    if args.surrogate and advisor.get('surrogate') is None:
+        parser.error("this model package has no surrogate (retrain with train_financial_advisor.py)")
+    keep = [name for name in args.keep.split(',') if name]
+
+    read = read_parquet_chunks if _is_parquet(args.input) else read_csv_chunks
+    chunks = read(args.input, args.chunk_size, keep)
+
+    writer = None
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for outputs, kept in scored_chunks(chunks, advisor, args.model, args.jobs, args.surrogate):
+            if writer is None:
+                columns = list(kept) + list(OUTPUT_COLUMNS)
+                writer = (ParquetWriter if _is_parquet(args.output) else CSVWriter)(args.output, columns)
+            writer.write({**kept, **outputs})
+            rows += len(outputs['error'])
+            elapsed = time.perf_counter() - start
+            print(f"📊 {rows:,} rows ({rows / elapsed:,.0f} rows/s)", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows:,} rows in {elapsed:.1f}s ({rows / elapsed * 60:,.0f} rows/min) → {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Stub Gemini Server
+Speaks the subset of the Generative Language REST API used by FinLand, with
+configurable per-model latency and failures, so LLM fallbacks can be
+exercised and benchmarked offline.
+
+Usage:
+    python tools/stub_llm.py --port 8765 --latency gemini-2.0-flash=5 --fail gemini-1.5-flash
+    GEMINI_API_KEY=stub GEMINI_API_ENDPOINT=http://127.0.0.1:8765 python app.py
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = "💡 **คำแนะนำ:** จ่ายหนี้ดอกเบี้ยสูงก่อน และสร้างเงินสำรองฉุกเฉิน 3-6 เดือน"
+
+_ROUTE = re.compile(r'^/v1beta/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)$')
+
+
+class StubConfig:
+    """Per-model behaviour, mutable while the server runs"""
+
+    def __init__(self, latencies=None, failures=None, answer=DEFAULT_ANSWER, token_delay=0.0):
+        self.latencies = dict(latencies or {})
+        self.failures = set(failures or ())
+        self.answer = answer
+        self.token_delay = token_delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def record(self, model):
+        with self._lock:
+            self.calls.append(model)
+
+
+def _candidate(text):
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2},
+    }
+
+
+def _make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client gave up (attempt timeout) - expected in benchmarks
+
+        def _send_stream(self, text, sse=False):
+            """streamGenerateContent: a JSON array sent one element per chunk,
+            or server-sent events with ?alt=sse"""
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream' if sse else 'application/json; charset=utf-8')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            words = text.split(' ')
+            pieces = [w + (' ' if i < len(words) - 1 else '') for i, w in enumerate(words)]
+            try:
+                for i, piece in enumerate(pieces):
+                    if i:
+                        time.sleep(config.token_delay)
+                    if sse:
+                        data = ('data: ' + json.dumps(_candidate(piece), ensure_ascii=False) + '\r\n\r\n').encode('utf-8')
+                    else:
+                        prefix = '[' if i == 0 else ',\r\n'
+                        suffix = ']' if i == len(pieces) - 1 else ''
+                        data = (prefix + json.dumps(_candidate(piece), ensure_ascii=False) + suffix).encode('utf-8')
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+
+            path, _, query = self.path.partition('?')
+            match = _ROUTE.match(path)
+            if not match:
+                self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                return
+
+            model = match.group('model')
+            config.record(model)
+            time.sleep(config.latencies.get(model, 0))
+
+            if model in config.failures:
+                self._send_json(503, {"error": {"code": 503, "message": f"{model} overloaded", "status": "UNAVAILABLE"}})
+                return
+            if match.group('method') == 'streamGenerateContent':
+                self._send_stream(config.answer, sse='alt=sse' in query.split('&'))
+            else:
+                self._send_json(200, _candidate(config.answer))
+
+    return StubHandler
+
+
+def start_stub_server(config=None, host='127.0.0.1', port=0):
+    """Start the stub in a daemon thread; returns (server, base_url)"""
+    config = config or StubConfig()
+    server = ThreadingHTTPServer((host, port), _make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def _parse_latency(items):
+    latencies = {}
+    for item in items:
+        model, _, seconds = item.partition('=')
+        latencies[model] = float(seconds)
+    return latencies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini REST API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', action='append', default=[], metavar='MODEL=SECONDS')
+    parser.add_argument('--fail', action='append', default=[], metavar='MODEL')
+    parser.add_argument('--token-delay', type=float, default=0.05, help="seconds between streamed chunks")
+    args = parser.parse_args()
+
+    config = StubConfig(_parse_latency(args.latency), args.fail, token_delay=args.token_delay)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(config))
+    server.daemon_threads = True
+    print(f"🤖 Stub Gemini on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,5 +1,5 @@
 // Service Worker for PWA - Offline Support & Advanced Caching
-const CACHE_VERSION = 'v3.1.0';
+const CACHE_VERSION = 'v3.2.0';
 const CACHE_NAME = `fincalc-${CACHE_VERSION}`;
 const API_CACHE = `fincalc-api-${CACHE_VERSION}`;
 const CALCULATION_CACHE = `fincalc-calc-${CACHE_VERSION}`;
@@ -156,7 +156,7 @@ const OFFLINE_CALCULATIONS = {
 
 // Install Service Worker
 self.addEventListener('install', (event) => {
-  console.log('📦 Service Worker v3.1.0 installing...');
+  console.log('📦 Service Worker v3.2.0 installing...');
   event.waitUntil(
     caches.open(CACHE_NAME)
       .then((cache) => {
@@ -169,7 +169,7 @@ self.addEventListener('install', (event) => {
 
 // Activate Service Worker
 self.addEventListener('activate', (event) => {
-  console.log('✅ Service Worker v3.1.0 activating...');
+  console.log('✅ Service Worker v3.2.0 activating...');
   event.waitUntil(
     caches.keys()
       .then((cacheNames) => {
@@ -208,9 +208,11 @@ self.addEventListener('fetch', (event) => {
           const response = await fetch(request.clone());
           
           if (response.ok) {
-            // Cache successful responses
-            const cache = await caches.open(API_CACHE);
-            cache.put(request, response.clone());
+            // Cache successful responses (the Cache API only stores GET)
+            if (request.method === 'GET') {
+              const cache = await caches.open(API_CACHE);
+              cache.put(request, response.clone());
+            }
             return response;
           }
           
@@ -225,23 +227,23 @@ self.addEventListener('fetch', (event) => {
             return cachedResponse;
           }
           
-          // Try offline calculation for POST requests
-          if (request.method === 'POST') {
-            const requestData = await request.clone().json();
-            const endpoint = url.pathname;
+          // Try offline calculation (JSON body for POST, query string for GET)
+          const endpoint = url.pathname;
+          if (OFFLINE_CALCULATIONS[endpoint]) {
+            const requestData = request.method === 'POST'
+              ? await request.clone().json()
+              : Object.fromEntries([...url.searchParams].map(([key, value]) => [key, Number(value)]));
             
-            if (OFFLINE_CALCULATIONS[endpoint]) {
-              console.log('🧮 Performing offline calculation');
-              const result = OFFLINE_CALCULATIONS[endpoint](requestData);
-              
-              return new Response(JSON.stringify(result), {
-                status: 200,
-                headers: { 
-                  'Content-Type': 'application/json',
-                  'X-Offline-Mode': 'true'
-                }
-              });
-            }
+            console.log('🧮 Performing offline calculation');
+            const result = OFFLINE_CALCULATIONS[endpoint](requestData);
+            
+            return new Response(JSON.stringify(result), {
+              status: 200,
+              headers: { 
+                'Content-Type': 'application/json',
+                'X-Offline-Mode': 'true'
+              }
+            });
           }
           
           // Return offline error
@@ -226,32 +226,45 @@ export default function AIAdvisor({ balance, apr, currentPayment, monthlyIncome
     
     // Try Gemini for complex questions or advice questions, fallback to local
     if (useGemini && (!isSimpleCalc || isAdviceQuestion)) {
+      // Stream tokens into one message as they arrive
+      const aiMessageId = (Date.now() + 1).toString();
+      let answer = '';
+      
       try {
-        const response = await apiClient.post('/api/ai-chat', {
+        await apiClient.stream('/api/ai-chat', {
           question: messageText,
           balance,
           apr,
           payment: currentPayment,
           monthly_income: monthlyIncome
+        }, (event, payload) => {
+          if (event !== 'token' || !payload.text) return;
+          
+          const isFirstToken = answer === '';
+          answer += payload.text;
+          const content = answer;
+          
+          if (isFirstToken) {
+            setIsTyping(false);
+            setMessages(prev => [...prev, {
+              id: aiMessageId,
+              type: 'ai',
+              content,
+              timestamp: new Date(),
+              isGemini: true
+            }]);
+          } else {
+            setMessages(prev => prev.map(msg => msg.id === aiMessageId ? { ...msg, content } : msg));
+          }
         });
-        
-        const data = await response.json();
-        
-        if (data.success && data.answer) {
-          const aiMessage: ChatMessage = {
-            id: (Date.now() + 1).toString(),
-            type: 'ai',
-            content: data.answer,
-            timestamp: new Date(),
-            isGemini: true
-          };
-          setMessages(prev => [...prev, aiMessage]);
-          setIsTyping(false);
-          return;
-        }
       } catch (error) {
         console.log('Gemini unavailable, using local analysis');
-        // Fall through to local analysis
+        // Fall through to local analysis unless part of the answer already arrived
+      }
+      
+      if (answer) {
+        setIsTyping(false);
+        return;
       }
     }
     
@@ -4,7 +4,7 @@ import { Tooltip, Legend, ResponsiveContainer, PieChart, Pie, Cell } from 'recha
 import { Download, Save, Sparkles, Calculator, Printer, ChevronDown, ChevronUp } from 'lucide-react'
 import { saveCalculation, saveToHistory } from '../utils/storage'
 import { useLanguage } from '../contexts/LanguageContext'
-import { apiClient } from '../utils/api'
+import { apiClient, toScheduleRows } from '../utils/api'
 import AIAdvisor from './AIAdvisor'
 import confetti from 'canvas-confetti'
 import CountUpNumber from './ui/CountUpNumber'
@@ -140,7 +140,7 @@ export default function CreditCardCalculator() {
 
     const payload = { balance: Number(balance), apr: Number(apr), monthly_payment: Number(monthlyPayment) }
     try {
-      const res = await apiClient.post('/api/calculate/credit-card', payload)
+      const res = await apiClient.get('/api/calculate/credit-card', { ...payload, schedule_format: 'columnar' })
       
       // Clone response to allow reading body twice if needed
       const resClone = res.clone()
@@ -181,6 +181,7 @@ export default function CreditCardCalculator() {
         return
       }
       
+      data.schedule = toScheduleRows(data.schedule)
       setResult(data)
       
       // Fire confetti
@@ -4,7 +4,7 @@ import { Tooltip, Legend, ResponsiveContainer, PieChart, Pie, Cell } from 'recha
 import { Download, Save, Sparkles, Calculator, Printer, ChevronDown, ChevronUp } from 'lucide-react'
 import { saveCalculation, saveToHistory } from '../utils/storage'
 import { useLanguage } from '../contexts/LanguageContext'
-import { apiClient } from '../utils/api'
+import { apiClient, toScheduleRows } from '../utils/api'
 import AIAdvisor from './AIAdvisor'
 import confetti from 'canvas-confetti'
 import CountUpNumber from './ui/CountUpNumber'
@@ -143,9 +143,10 @@ export default function StudentLoanCalculator() {
 
     const payload = { loan_amount: Number(principal), interest_rate: Number(apr), term_months: Math.max(1, Math.round(Number(years) * 12)) }
     try {
-      const res = await apiClient.post('/api/calculate/student-loan', payload)
+      const res = await apiClient.get('/api/calculate/student-loan', { ...payload, schedule_format: 'columnar' })
       const data = await res.json()
       if (!res.ok) throw new Error(data.error || 'ไม่สามารถคำนวณได้')
+      data.schedule = toScheduleRows(data.schedule)
       setResult(data)
       
       // Fire confetti
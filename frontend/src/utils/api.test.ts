@@ -1,4 +1,5 @@
 import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { parseSSE, scheduleCsvUrl, toScheduleRows } from './api';
 
 // Mock API_BASE_URL for testing
 vi.mock('../api', async () => {
@@ -142,4 +143,60 @@ describe('API Client', () => {
       expect(savedInterest).toBeGreaterThan(0);
     });
   });
+
+  describe('Server-Sent Events parsing', () => {
+    it('should dispatch complete events in order', () => {
+      const events: Array<[string, any]> = [];
+      const rest = parseSSE(
+        'event: context\ndata: {"balance": 50000}\n\nevent: token\ndata: {"text": "สวัสดี"}\n\n',
+        (event, payload) => events.push([event, payload])
+      );
+      
+      expect(rest).toBe('');
+      expect(events).toEqual([
+        ['context', { balance: 50000 }],
+        ['token', { text: 'สวัสดี' }]
+      ]);
+    });
+
+    it('should keep a partial event for the next chunk', () => {
+      const events: string[] = [];
+      const rest = parseSSE('event: token\ndata: {"text": "a"}\n\nevent: tok', (event) => events.push(event));
+      
+      expect(events).toEqual(['token']);
+      expect(rest).toBe('event: tok');
+    });
+  });
+
+  describe('Columnar schedules', () => {
+    it('should expand parallel arrays into rows', () => {
+      const rows = toScheduleRows({
+        month: [1, 2],
+        payment: [1000, 1000],
+        interest: [150, 136.5],
+        principal: [850, 863.5],
+        remaining: [9150, 8286.5]
+      });
+      
+      expect(rows).toEqual([
+        { month: 1, payment: 1000, interest: 150, principal: 850, remaining: 9150 },
+        { month: 2, payment: 1000, interest: 136.5, principal: 863.5, remaining: 8286.5 }
+      ]);
+    });
+
+    it('should pass row schedules through unchanged', () => {
+      const rows = [{ month: 1, payment: 1000, interest: 0, principal: 1000, remaining: 0 }];
+      expect(toScheduleRows(rows)).toBe(rows);
+    });
+  });
+
+  describe('Schedule CSV export', () => {
+    it('should put the calculator type and inputs in the query string', () => {
+      const url = new URL(scheduleCsvUrl('student-loan', { loan_amount: 300000, interest_rate: 6, term_months: 360 }));
+
+      expect(url.pathname).toBe('/api/export/schedule.csv');
+      expect(url.searchParams.get('type')).toBe('student-loan');
+      expect(url.searchParams.get('term_months')).toBe('360');
+    });
+  });
 });
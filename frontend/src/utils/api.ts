@@ -35,13 +35,138 @@ export const apiClient = {
     }
   },
 
-  async get(endpoint: string) {
+  /**
+   * POST and consume a Server-Sent Events response, calling `onEvent` for each
+   * event as it arrives. Falls back to a plain JSON body for older backends.
+   */
+  async stream(endpoint: string, data: any, onEvent: (event: string, payload: any) => void) {
     const url = API_BASE_URL ? `${API_BASE_URL}${endpoint}` : endpoint;
-    const response = await fetch(url, {
-      mode: 'cors',
-      cache: 'no-cache'
-    });
     
-    return response;
+    // Timeout only covers the wait for response headers (server wake-up)
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 30000);
+    
+    let response: Response;
+    try {
+      response = await fetch(url, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': 'text/event-stream'
+        },
+        body: JSON.stringify({ ...data, stream: true }),
+        mode: 'cors',
+        cache: 'no-cache',
+        signal: controller.signal
+      });
+    } catch (err: any) {
+      if (err.name === 'AbortError') {
+        throw new Error('⏳ เซิร์ฟเวอร์กำลังเริ่มต้น กรุณารอสักครู่แล้วลองใหม่');
+      }
+      throw err;
+    } finally {
+      clearTimeout(timeoutId);
+    }
+    
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    
+    if (!response.body || !response.headers.get('Content-Type')?.includes('text/event-stream')) {
+      const json = await response.json();
+      if (json.context) onEvent('context', json.context);
+      if (json.answer) onEvent('token', { text: json.answer });
+      onEvent(json.success ? 'done' : 'error', json);
+      return;
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      buffer = parseSSE(buffer, onEvent);
+    }
+  },
+
+  /**
+   * GET with optional query params. Parameterized requests (the calculators)
+   * use the normal HTTP cache so repeats are served by the browser/CDN.
+   */
+  async get(endpoint: string, params?: Record<string, string | number>) {
+    const query = params
+      ? '?' + new URLSearchParams(Object.entries(params).map(([key, value]) => [key, String(value)])).toString()
+      : '';
+    const url = (API_BASE_URL ? `${API_BASE_URL}${endpoint}` : endpoint) + query;
+    
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 30000); // 30s timeout
+    
+    try {
+      const response = await fetch(url, {
+        headers: { 'Accept': 'application/json' },
+        mode: 'cors',
+        cache: params ? 'default' : 'no-cache',
+        signal: controller.signal
+      });
+      
+      clearTimeout(timeoutId);
+      return response;
+    } catch (err: any) {
+      clearTimeout(timeoutId);
+      if (err.name === 'AbortError') {
+        throw new Error('⏳ เซิร์ฟเวอร์กำลังเริ่มต้น กรุณารอสักครู่แล้วลองใหม่');
+      }
+      throw err;
+    }
   }
 };
+
+/**
+ * Dispatch every complete event in `buffer` and return the unconsumed tail
+ */
+export function parseSSE(buffer: string, onEvent: (event: string, payload: any) => void): string {
+  let boundary: number;
+  while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+    const raw = buffer.slice(0, boundary);
+    buffer = buffer.slice(boundary + 2);
+    
+    let event = 'message';
+    const dataLines: string[] = [];
+    for (const line of raw.split('\n')) {
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    }
+    if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')));
+  }
+  return buffer;
+}
+
+/**
+ * Expand a columnar schedule ({ month: [...], payment: [...], ... }) into rows;
+ * row-format schedules (older backends, offline fallback) pass through
+ */
+export function toScheduleRows(schedule: any) {
+  if (!schedule || Array.isArray(schedule)) return schedule;
+  return schedule.month.map((month: number, i: number) => ({
+    month,
+    payment: schedule.payment[i],
+    interest: schedule.interest[i],
+    principal: schedule.principal[i],
+    remaining: schedule.remaining[i]
+  }));
+}
+
+/**
+ * Download URL for a calculator's schedule as CSV. The backend streams it, so
+ * a plain link saves long schedules to disk without holding them in the page
+ */
+export function scheduleCsvUrl(type: 'credit-card' | 'student-loan', params: Record<string, string | number>) {
+  const query = new URLSearchParams({ type, ...Object.fromEntries(
+    Object.entries(params).map(([key, value]) => [key, String(value)])
+  ) }).toString();
+  return `${API_BASE_URL}/api/export/schedule.csv?${query}`;
+}